@@ -3,7 +3,7 @@ Streamlit Web Application for AI Resume Screener
 """
 import streamlit as st
 from rag_pipeline import RAGResumeScreener
-from utils import extract_text_from_pdf, clean_text
+from utils import extract_pdf_text_isolated, clean_text, process_memory_mb
 import json
 import time
 
@@ -41,9 +41,22 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+
+@st.cache_resource(show_spinner=False)
+def get_screener():
+    """
+    Build the screener once per server process
+    
+    The embedding model, Chroma client and Gemini client are shared by every
+    browser session instead of being loaded per session.
+    """
+    start = time.perf_counter()
+    screener = RAGResumeScreener()
+    load_times = screener.warmup()
+    return screener, load_times, time.perf_counter() - start
+
+
 # Initialize session state
-if 'screener' not in st.session_state:
-    st.session_state.screener = None
 if 'results' not in st.session_state:
     st.session_state.results = None
 
@@ -74,6 +87,20 @@ with st.sidebar:
     4. View detailed results
     """)
     
+    st.markdown("---")
+    st.subheader("🖥️ Server Status")
+    try:
+        with st.spinner("Loading models (once per server)..."):
+            _, load_times, init_seconds = get_screener()
+        st.caption(f"Screener ready in {init_seconds:.1f}s (shared by all sessions)")
+        for component, seconds in load_times.items():
+            st.caption(f"• {component.replace('_', ' ')}: {seconds:.2f}s")
+    except Exception as e:
+        st.caption(f"Screener not loaded: {str(e)}")
+    memory_mb = process_memory_mb()
+    if memory_mb is not None:
+        st.caption(f"Process memory: {memory_mb:.0f} MB")
+    
     st.markdown("---")
     st.subheader("ℹ️ About")
     st.markdown("""
@@ -106,11 +133,14 @@ with col1:
             if job_file.type == "application/pdf" or job_file.name.endswith('.pdf'):
                 # Reset file pointer
                 job_file.seek(0)
-                job_description = extract_text_from_pdf(job_file)
-                if job_description:
+                extraction = extract_pdf_text_isolated(job_file)
+                job_description = extraction['text'] or ""
+                if extraction['ok']:
                     st.success("✅ Job description loaded from PDF")
+                    if extraction['truncated']:
+                        st.warning(f"⚠️ Only the first {extraction['pages']} pages / {len(job_description)} characters were read")
                 else:
-                    st.error("❌ Failed to extract text from PDF")
+                    st.error(f"❌ Failed to extract text from PDF: {extraction['error']}")
             else:
                 job_file.seek(0)
                 job_description = job_file.read().decode('utf-8')
@@ -147,11 +177,14 @@ with col2:
             if resume_file.type == "application/pdf" or resume_file.name.endswith('.pdf'):
                 # Reset file pointer
                 resume_file.seek(0)
-                resume_text = extract_text_from_pdf(resume_file)
-                if resume_text:
+                extraction = extract_pdf_text_isolated(resume_file)
+                resume_text = extraction['text'] or ""
+                if extraction['ok']:
                     st.success("✅ Resume loaded from PDF")
+                    if extraction['truncated']:
+                        st.warning(f"⚠️ Only the first {extraction['pages']} pages / {len(resume_text)} characters were read")
                 else:
-                    st.error("❌ Failed to extract text from PDF")
+                    st.error(f"❌ Failed to extract text from PDF: {extraction['error']}")
             else:
                 resume_file.seek(0)
                 resume_text = resume_file.read().decode('utf-8')
@@ -186,20 +219,18 @@ if screen_button and job_description and resume_text:
     job_description = clean_text(job_description)
     resume_text = clean_text(resume_text)
     
-    # Initialize screener if not already done
-    if st.session_state.screener is None:
-        with st.spinner("Initializing AI Resume Screener..."):
-            try:
-                st.session_state.screener = RAGResumeScreener()
-                st.success("✅ Screener initialized successfully!")
-            except Exception as e:
-                st.error(f"❌ Error initializing screener: {str(e)}")
-                st.stop()
+    # Shared screener (built once per server process)
+    with st.spinner("Initializing AI Resume Screener..."):
+        try:
+            screener, _, _ = get_screener()
+        except Exception as e:
+            st.error(f"❌ Error initializing screener: {str(e)}")
+            st.stop()
     
     # Perform screening
     with st.spinner("🔄 Screening resume... This may take a moment."):
         try:
-            result = st.session_state.screener.screen_resume(resume_text, job_description)
+            result = screener.screen_resume(resume_text, job_description)
             st.session_state.results = result
         except Exception as e:
             st.error(f"❌ Error during screening: {str(e)}")
@@ -231,7 +262,8 @@ if screen_button and job_description and resume_text:
     with col_score3:
         st.metric(
             "LLM Score",
-            f"{result['llm_score']:.1%}",
+            f"{result['llm_score']:.1%}" if result['llm_score'] is not None else
+            ("Skipped" if result['llm_skipped'] else "Unavailable"),
             delta=f"Weight: {result['weights']['llm']:.0%}"
         )
     
@@ -251,6 +283,8 @@ if screen_button and job_description and resume_text:
                "🔴" if "Weak" in result['recommendation'] else "⚫"
     
     st.info(f"{rec_icon} **Recommendation:** {result['recommendation']}")
+    if result.get('llm_degraded'):
+        st.warning("⚠️ The LLM evaluation failed; the final score is based on semantic similarity only")
     
     # Detailed Analysis
     st.markdown("---")
@@ -286,13 +320,15 @@ if screen_button and job_description and resume_text:
     
     import pandas as pd
     
+    llm_score = result['llm_score'] or 0.0
+    
     score_data = pd.DataFrame({
         'Component': ['Semantic Search', 'LLM Evaluation'],
-        'Score': [result['semantic_score'], result['llm_score']],
+        'Score': [result['semantic_score'], llm_score],
         'Weight': [result['weights']['semantic_search'], result['weights']['llm']],
         'Weighted Score': [
             result['semantic_score'] * result['weights']['semantic_search'],
-            result['llm_score'] * result['weights']['llm']
+            llm_score * result['weights']['llm']
         ]
     })
     
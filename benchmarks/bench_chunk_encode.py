@@ -0,0 +1,64 @@
+"""
+Benchmark embedding encode throughput against resume chunk size
+
+Usage:
+    python benchmarks/bench_chunk_encode.py --sizes 64 128 160 256 --words 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils import split_into_chunks
+
+
+VOCABULARY = (
+    "python java sql docker kubernetes aws machine learning data pipelines api design "
+    "led team of engineers built scalable services improved latency by percent "
+    "bachelor master degree computer science experience years senior developer"
+).split()
+
+
+def synthetic_text(n_words: int, seed: int = 0) -> str:
+    """Random resume-like text with n_words words"""
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(n_words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode throughput vs. chunk size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[32, 64, 128, 160, 256],
+                        help="Chunk sizes in words")
+    parser.add_argument("--overlap", type=float, default=0.2,
+                        help="Fraction of each chunk shared with the next one")
+    parser.add_argument("--words", type=int, default=20000, help="Total words to encode")
+    parser.add_argument("--batch-size", type=int, default=config.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size (best is reported)")
+    args = parser.parse_args()
+    
+    from embedding_engine import load_embedding_model
+    model = load_embedding_model()
+    text = synthetic_text(args.words)
+    model.encode(["warmup"])
+    
+    print(f"{'chunk words':>12} {'stride':>7} {'chunks':>7} {'chunks/s':>10} {'words/s':>10}")
+    for size in args.sizes:
+        stride = max(1, int(size * (1 - args.overlap)))
+        chunks = [c['text'] for c in split_into_chunks(text, size, stride)]
+        
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            model.encode(chunks, batch_size=args.batch_size)
+            best = min(best, time.perf_counter() - start)
+        
+        print(f"{size:>12} {stride:>7} {len(chunks):>7} "
+              f"{len(chunks) / best:>10.1f} {args.words / best:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark embedding inference engines: parity with full-precision PyTorch and throughput
+
+For every engine the script embeds the same resume-like sentences, reports
+the cosine drift against the "torch" reference (mean, worst case and top-10
+neighbour overlap) and the encode throughput in sentences per second. It
+exits with status 1 if any engine drifts more than --max-drift, so it can
+gate a change of EMBEDDING_ENGINE.
+
+Usage:
+    python benchmarks/bench_embedding_engines.py --engines torch torch-int8 onnx --threads 4
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import config
+from embedding_engine import ENGINES, load_embedding_model
+from utils import split_into_chunks
+
+VOCABULARY = (
+    "python java sql docker kubernetes aws machine learning data pipelines api design "
+    "led team of engineers built scalable services improved latency by percent "
+    "bachelor master degree computer science experience years senior developer "
+    "react frontend backend microservices terraform ci cd testing mentoring"
+).split()
+
+
+def synthetic_sentences(n: int, seed: int = 0):
+    """Resume-like sentences of varying length, chunked like real resumes"""
+    rng = random.Random(seed)
+    sentences = []
+    while len(sentences) < n:
+        text = ' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(8, 400)))
+        sentences.extend(c['text'] for c in split_into_chunks(text, config.RESUME_CHUNK_SIZE, config.RESUME_CHUNK_STRIDE))
+    return sentences[:n]
+
+
+def encode(model, sentences, batch_size: int) -> np.ndarray:
+    return np.asarray(
+        model.encode(sentences, batch_size=batch_size, normalize_embeddings=True), dtype=np.float32
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parity and throughput per embedding engine")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES)
+    parser.add_argument("--model", default=config.EMBEDDING_MODEL)
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=config.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--threads", type=int, default=config.EMBEDDING_THREADS)
+    parser.add_argument("--repeat", type=int, default=3, help="Throughput runs per engine (best is reported)")
+    parser.add_argument("--max-drift", type=float, default=config.EMBEDDING_MAX_DRIFT,
+                        help="Largest allowed mean cosine drift (1 - cos) from the torch reference")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    
+    sentences = synthetic_sentences(args.sentences)
+    queries = synthetic_sentences(50, seed=1)
+    reference = load_embedding_model(args.model, "torch", args.threads)
+    ref_vectors = encode(reference, sentences, args.batch_size)
+    ref_top = np.argsort(-(encode(reference, queries, args.batch_size) @ ref_vectors.T), axis=1)[:, :10]
+    
+    results, failed = [], []
+    print(f"{'engine':<12} {'mean drift':>11} {'max drift':>10} {'top10 overlap':>14} {'sent/s':>9}")
+    for engine in args.engines:
+        try:
+            model = load_embedding_model(args.model, engine, args.threads)
+        except Exception as e:
+            print(f"{engine:<12} unavailable: {e}")
+            continue
+        
+        vectors = encode(model, sentences[:args.batch_size], args.batch_size)  # warm up
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            vectors = encode(model, sentences, args.batch_size)
+            best = min(best, time.perf_counter() - start)
+        
+        drift = 1.0 - np.sum(vectors * ref_vectors, axis=1)
+        top = np.argsort(-(encode(model, queries, args.batch_size) @ vectors.T), axis=1)[:, :10]
+        overlap = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(top, ref_top)])
+        result = {
+            'engine': engine,
+            'mean_drift': float(drift.mean()),
+            'max_drift': float(drift.max()),
+            'top10_overlap': float(overlap),
+            'sentences_per_second': len(sentences) / best,
+        }
+        results.append(result)
+        if result['mean_drift'] > args.max_drift:
+            failed.append(engine)
+        print(f"{engine:<12} {result['mean_drift']:>11.5f} {result['max_drift']:>10.5f} "
+              f"{overlap:>14.3f} {result['sentences_per_second']:>9.1f}")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if failed:
+        print(f"\nCosine drift above {args.max_drift} for: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
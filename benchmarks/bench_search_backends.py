@@ -0,0 +1,126 @@
+"""
+Benchmark vector search backends: recall@k, query latency and memory
+
+Synthetic clustered unit vectors stand in for resume chunk embeddings. Each
+backend is built and queried in a fresh interpreter so resident memory
+numbers are not shared between backends; recall is measured against exact
+float32 search.
+
+Usage:
+    python benchmarks/bench_search_backends.py --rows 100000 --queries 200 --k 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+BACKENDS = ['chroma', 'numpy-float16', 'numpy-int8']
+
+
+def synthetic_vectors(n: int, dim: int, seed: int, clusters: int = 256) -> np.ndarray:
+    """Unit vectors scattered around random cluster centres"""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def open_collection(backend: str, path: str):
+    if backend == 'chroma':
+        import chromadb
+        from chromadb.config import Settings
+        client = chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
+        return client.get_or_create_collection(name="bench", metadata={"hnsw:space": "cosine"})
+    from numpy_index import NumpyCollection
+    return NumpyCollection(os.path.join(path, "bench"), "bench", dtype=backend.split('-')[1])
+
+
+def run_backend(backend: str, rows: int, dim: int, n_queries: int, k: int, batch: int) -> dict:
+    """Build, query and measure one backend (runs inside a worker process)"""
+    from utils import process_memory_mb
+    
+    data = synthetic_vectors(rows, dim, seed=0)
+    queries = synthetic_vectors(n_queries, dim, seed=1)
+    exact = np.argsort(-(queries @ data.T), axis=1)[:, :k]
+    ids = [f"doc{i}" for i in range(rows)]
+    
+    with tempfile.TemporaryDirectory() as path:
+        rss_before = process_memory_mb()
+        collection = open_collection(backend, path)
+        start = time.perf_counter()
+        for i in range(0, rows, batch):
+            collection.add(ids=ids[i:i + batch], embeddings=data[i:i + batch],
+                           metadatas=[{'n': j} for j in range(i, min(i + batch, rows))])
+        build_seconds = time.perf_counter() - start
+        
+        latencies, hits = [], 0
+        for q in range(n_queries):
+            start = time.perf_counter()
+            result = collection.query(query_embeddings=queries[q:q + 1], n_results=k)
+            latencies.append(time.perf_counter() - start)
+            found = {int(doc_id[3:]) for doc_id in result['ids'][0]}
+            hits += len(found & set(exact[q].tolist()))
+        rss_after = process_memory_mb()
+        disk_mb = sum(os.path.getsize(os.path.join(root, f))
+                      for root, _, files in os.walk(path) for f in files) / 2 ** 20
+    
+    return {
+        'backend': backend,
+        'recall_at_k': hits / (n_queries * k),
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'build_seconds': build_seconds,
+        'rss_delta_mb': (rss_after - rss_before) if rss_before is not None else None,
+        'disk_mb': disk_mb,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall, latency and memory per vector backend")
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--rows", type=int, default=100000, help="Indexed vectors")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=5000, help="Vectors per add() call")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, args.rows, args.dim, args.queries, args.k, args.batch)))
+        return
+    
+    results = []
+    print(f"{'backend':<15} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8} {'build s':>8} {'rss MB':>8} {'disk MB':>8}")
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", backend,
+             "--rows", str(args.rows), "--dim", str(args.dim), "--queries", str(args.queries),
+             "--k", str(args.k), "--batch", str(args.batch)],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(f"{backend:<15} failed: {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append(r)
+        rss = f"{r['rss_delta_mb']:>8.1f}" if r['rss_delta_mb'] is not None else f"{'n/a':>8}"
+        print(f"{backend:<15} {r['recall_at_k']:>9.3f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['build_seconds']:>8.1f} {rss} {r['disk_mb']:>8.1f}")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark startup cost: module import times and first-call latency per component
+
+Each measurement runs in a fresh interpreter so import caches do not hide
+regressions.
+
+Usage:
+    python benchmarks/bench_startup.py [--json results.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Project modules first, then the heavy dependencies they load lazily
+MODULES = [
+    'config', 'utils', 'vector_store', 'llm_evaluator', 'rag_pipeline', 'main',
+    'numpy', 'chromadb', 'sentence_transformers', 'langchain_google_genai'
+]
+
+FIRST_CALL_SCRIPT = """
+import json, time
+t = time.perf_counter()
+from vector_store import VectorStore
+store = VectorStore()
+timings = {'vector_store_init': time.perf_counter() - t}
+t = time.perf_counter(); store.embedding_model
+timings['embedding_model_load'] = time.perf_counter() - t
+t = time.perf_counter(); store.embedding_model.encode(['first call'])
+timings['first_encode'] = time.perf_counter() - t
+t = time.perf_counter(); store.embedding_model.encode(['second call'])
+timings['second_encode'] = time.perf_counter() - t
+t = time.perf_counter(); store.collection.count()
+timings['chroma_open'] = time.perf_counter() - t
+import config
+if config.GEMINI_API_KEY:
+    from llm_evaluator import LLMEvaluator
+    t = time.perf_counter(); LLMEvaluator().warmup()
+    timings['llm_client_init'] = time.perf_counter() - t
+print(json.dumps(timings))
+"""
+
+
+def run_python(code: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def import_time(module: str, repeat: int) -> float:
+    """Best-of-N seconds to import module in a fresh interpreter"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    return min(float(run_python(code)) for _ in range(repeat))
+
+
+def help_time(repeat: int) -> float:
+    """Best-of-N wall time of `python main.py --help`"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", "--help"], cwd=REPO_ROOT,
+                       capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup and first-call latency")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    parser.add_argument("--skip-first-call", action="store_true",
+                        help="Only measure imports (no model load)")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    
+    results = {'imports': {}, 'first_call': {}}
+    
+    print(f"{'import':<24} {'seconds':>8}")
+    for module in MODULES:
+        try:
+            seconds = import_time(module, args.repeat)
+        except subprocess.CalledProcessError:
+            print(f"{module:<24} {'failed':>8}")
+            continue
+        results['imports'][module] = seconds
+        print(f"{module:<24} {seconds:>8.3f}")
+    
+    results['main_help'] = help_time(args.repeat)
+    print(f"\n{'main.py --help':<24} {results['main_help']:>8.3f}")
+    
+    if not args.skip_first_call:
+        results['first_call'] = json.loads(run_python(FIRST_CALL_SCRIPT))
+        print(f"\n{'first call':<24} {'seconds':>8}")
+        for step, seconds in results['first_call'].items():
+            print(f"{step:<24} {seconds:>8.3f}")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare two benchmark result files written by run_all.py
+
+Metrics ending in _per_second are better when higher; latencies (_ms) and
+durations (seconds) are better when lower. Other numbers are shown but never
+flagged. Exits with status 1 if any metric regressed by more than
+--threshold.
+
+Usage:
+    python benchmarks/compare.py baseline.json current.json [--threshold 0.10]
+"""
+import argparse
+import json
+import sys
+
+
+def flatten(results: dict, prefix: str = '') -> dict:
+    """{'a': {'b': 1}} -> {'a.b': 1}, numbers only, run metadata excluded"""
+    metrics = {}
+    for key, value in results.items():
+        if not prefix and key == 'meta':
+            continue
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten(value, path + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[path] = float(value)
+    return metrics
+
+
+def direction(metric: str) -> int:
+    """+1 if higher is better, -1 if lower is better, 0 if neutral"""
+    name = metric.rsplit('.', 1)[-1]
+    if name.endswith('_per_second'):
+        return 1
+    if name.endswith('_ms') or name == 'seconds':
+        return -1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative change counted as a regression")
+    args = parser.parse_args()
+    
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    
+    print(f"baseline: {baseline.get('meta', {}).get('commit')}  current: {current.get('meta', {}).get('commit')}\n")
+    old, new = flatten(baseline), flatten(current)
+    regressions = []
+    print(f"{'metric':<52} {'baseline':>12} {'current':>12} {'change':>8}")
+    for metric in sorted(set(old) & set(new)):
+        change = (new[metric] - old[metric]) / old[metric] if old[metric] else 0.0
+        better = direction(metric) * change
+        flag = ''
+        if better < -args.threshold:
+            flag = '  REGRESSION'
+            regressions.append(metric)
+        elif better > args.threshold:
+            flag = '  improved'
+        print(f"{metric:<52} {old[metric]:>12.3f} {new[metric]:>12.3f} {change:>+8.1%}{flag}")
+    
+    only = sorted(set(old) ^ set(new))
+    if only:
+        print(f"\nMetrics in only one file: {', '.join(only)}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
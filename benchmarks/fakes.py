@@ -0,0 +1,172 @@
+"""
+Local stand-ins for Gemini and the embedding model
+
+FakeChatModel answers every prompt the evaluator sends (single, packed and
+job profile prompts) with deterministic JSON after a configurable latency,
+so pipelines can be benchmarked without a network or API key.
+FakeEmbeddingModel is a hashing bag-of-words encoder with the
+SentenceTransformer encode() signature.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from skill_matcher import get_skill_matcher
+
+
+class FakeMessage:
+    """Minimal chat model reply (the evaluator only reads .content)"""
+    
+    def __init__(self, content: str, input_tokens: int = 0, output_tokens: int = 0):
+        self.content = content
+        self.usage_metadata = {
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'total_tokens': input_tokens + output_tokens
+        }
+
+
+def _stable_score(text: str) -> float:
+    """Deterministic pseudo-score in [0.2, 0.95] for a piece of text"""
+    digest = hashlib.sha256(text.encode('utf-8')).digest()
+    return round(0.2 + 0.75 * int.from_bytes(digest[:4], 'big') / 2 ** 32, 3)
+
+
+class FakeAPIError(RuntimeError):
+    """Injected API failure carrying an HTTP status and optional retry-after hint"""
+    
+    def __init__(self, status_code: int, retry_after: float = None):
+        super().__init__(f"Injected fake model error ({status_code})")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class FakeChatModel:
+    """Chat model stand-in with configurable latency, jitter, slow tail and failure rate"""
+    
+    def __init__(self, latency: float = 0.5, jitter: float = 0.1, error_rate: float = 0.0, seed: int = 0,
+                 slow_rate: float = 0.0, slow_latency: float = 5.0, error_status: int = 503,
+                 retry_after: float = None):
+        """
+        Args:
+            latency: Mean seconds per request
+            jitter: Standard deviation of the latency, in seconds
+            error_rate: Fraction of requests that raise an error
+            seed: Seed for latency and error sampling
+            slow_rate: Fraction of requests that take slow_latency instead (tail latency)
+            slow_latency: Seconds taken by a slow request
+            error_status: HTTP status of injected errors (e.g. 429 or 503)
+            retry_after: Retry-after hint attached to injected errors, in seconds
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+    
+    def _sample(self):
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self._rng.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            if self.slow_rate and self._rng.random() < self.slow_rate:
+                delay = self.slow_latency
+            failed = self._rng.random() < self.error_rate
+        return delay, failed
+    
+    def _error(self) -> FakeAPIError:
+        return FakeAPIError(self.error_status, self.retry_after)
+    
+    def _reply(self, messages) -> FakeMessage:
+        system = messages[0].content if len(messages) > 1 else ''
+        human = messages[-1].content
+        matcher = get_skill_matcher()
+        
+        if 'Extract the requirements' in system:
+            skills = matcher.extract(human)
+            content = json.dumps({
+                'title': human.strip().splitlines()[-1][:60] if human.strip() else '',
+                'required_skills': skills[:6],
+                'nice_to_have_skills': skills[6:9],
+                'seniority': 'senior' if 'senior' in human.lower() else 'mid',
+                'min_years_experience': 3,
+                'education': ''
+            })
+        else:
+            resumes = re.findall(r'<resume id="([^"]+)">\n(.*?)\n</resume>', human, re.DOTALL)
+            if resumes:
+                content = json.dumps([
+                    {'id': resume_id, 'score': _stable_score(text), 'reasoning': 'Synthetic evaluation',
+                     'matched_skills': matcher.extract(text)[:5], 'missing_skills': []}
+                    for resume_id, text in resumes
+                ])
+            else:
+                content = json.dumps({
+                    'score': _stable_score(human),
+                    'reasoning': 'Synthetic evaluation',
+                    'matched_skills': matcher.extract(human)[:5],
+                    'missing_skills': []
+                })
+        
+        input_tokens = sum(len(message.content) for message in messages) // 4
+        return FakeMessage(content, input_tokens, len(content) // 4)
+    
+    def invoke(self, messages, **kwargs) -> FakeMessage:
+        delay, failed = self._sample()
+        time.sleep(delay)
+        if failed:
+            raise self._error()
+        return self._reply(messages)
+    
+    async def ainvoke(self, messages, **kwargs) -> FakeMessage:
+        delay, failed = self._sample()
+        await asyncio.sleep(delay)
+        if failed:
+            raise self._error()
+        return self._reply(messages)
+
+
+class FakeEmbeddingModel:
+    """Hashing bag-of-words encoder with the SentenceTransformer encode() signature"""
+    
+    def __init__(self, dimension: int = 384, seconds_per_text: float = 0.0):
+        """
+        Args:
+            dimension: Embedding dimension
+            seconds_per_text: Simulated model cost per text
+        """
+        self.dimension = dimension
+        self.seconds_per_text = seconds_per_text
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+    
+    def encode(self, texts, batch_size: int = 32, normalize_embeddings: bool = False, **kwargs):
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        if self.seconds_per_text:
+            time.sleep(self.seconds_per_text * len(texts))
+        
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in re.findall(r"[a-z0-9+#.]+", text.lower()):
+                digest = int(hashlib.blake2b(word.encode('utf-8'), digest_size=8).hexdigest(), 16)
+                vectors[i, digest % self.dimension] += 1.0 if digest & (1 << 63) else -1.0
+        vectors += 1e-6
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
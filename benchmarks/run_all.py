@@ -0,0 +1,241 @@
+"""
+Offline benchmark suite: screening latency, batch throughput, ingest rate and search latency
+
+Runs entirely locally: Gemini is replaced by benchmarks/fakes.FakeChatModel
+(configurable latency and jitter) and, unless --real-embeddings is given, the
+embedding model by a hashing encoder. All state lives in a temporary
+directory. Results are written as JSON for benchmarks/compare.py.
+
+Usage:
+    python benchmarks/run_all.py --out results.json [--quick] [--suites screen batch ingest search]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import numpy as np
+import config
+from fakes import FakeChatModel, FakeEmbeddingModel
+from synthetic import generate_job_description, generate_resumes
+
+SUITES = ['screen', 'batch', 'ingest', 'search']
+
+
+def percentiles(samples) -> dict:
+    samples = np.asarray(samples) * 1000
+    return {
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p95_ms': float(np.percentile(samples, 95)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'mean_ms': float(samples.mean())
+    }
+
+
+def isolate(directory: str):
+    """Point every on-disk path at a scratch directory and disable the LLM cache"""
+    config.VECTOR_DB_PATH = os.path.join(directory, "vector_db")
+    config.NUMPY_INDEX_PATH = os.path.join(directory, "vector_db_numpy")
+    config.EMBEDDING_CACHE_DIR = os.path.join(directory, "embeddings")
+    config.INGEST_CHECKPOINT_PATH = os.path.join(directory, "ingest_checkpoint.jsonl")
+    config.DEDUP_INDEX_PATH = os.path.join(directory, "dedup.sqlite3")
+    config.LLM_CACHE_ENABLED = False
+
+
+def make_screener(args):
+    from llm_evaluator import LLMEvaluator
+    from rag_pipeline import RAGResumeScreener
+    from vector_store import VectorStore
+    
+    embedding_model = None if args.real_embeddings else FakeEmbeddingModel(args.dim)
+    llm = FakeChatModel(latency=args.llm_latency, jitter=args.llm_jitter, seed=args.seed,
+                        error_rate=args.llm_error_rate, slow_rate=args.llm_slow_rate,
+                        slow_latency=args.llm_slow_latency)
+    evaluator = LLMEvaluator(llm=llm, requests_per_minute=args.rpm, tokens_per_minute=10 ** 9,
+                             use_cache=False)
+    return RAGResumeScreener(VectorStore(embedding_model=embedding_model), evaluator)
+
+
+def bench_screen(args) -> dict:
+    """Latency percentiles of single screen_resume calls"""
+    screener = make_screener(args)
+    job_description = generate_job_description(args.seed)
+    resumes = generate_resumes(args.screen_calls, args.words, seed=args.seed)
+    screener.screen_resume(resumes[0]['text'], job_description)  # warm up
+    
+    latencies = []
+    degraded = 0
+    for resume in resumes:
+        start = time.perf_counter()
+        result = screener.screen_resume(resume['text'], job_description)
+        latencies.append(time.perf_counter() - start)
+        degraded += bool(result.get('llm_degraded'))
+    return {'calls': len(resumes), 'degraded': degraded, **percentiles(latencies)}
+
+
+def bench_batch(args) -> dict:
+    """Throughput of batch_screen_resumes for several batch sizes"""
+    screener = make_screener(args)
+    job_description = generate_job_description(args.seed)
+    results = {}
+    for size in args.batch_sizes:
+        resumes = generate_resumes(size, args.words, seed=args.seed + size)
+        requests_before = screener.llm_evaluator.get_stats()['requests']
+        start = time.perf_counter()
+        batch = screener.batch_screen_resumes(resumes, job_description)
+        elapsed = time.perf_counter() - start
+        results[str(size)] = {
+            'seconds': elapsed,
+            'resumes_per_second': size / elapsed,
+            'llm_requests': screener.llm_evaluator.get_stats()['requests'] - requests_before,
+            'degraded': sum(bool(result.get('llm_degraded')) for result in batch)
+        }
+    return results
+
+
+def bench_ingest(args, directory: str) -> dict:
+    """Indexing rate of VectorStore.add_resumes and of ingest_directory over text files"""
+    from ingest import ingest_directory
+    
+    resumes = generate_resumes(args.ingest_docs, args.words, seed=args.seed)
+    
+    screener = make_screener(args)
+    screener.vector_store.clear_collection()
+    start = time.perf_counter()
+    chunks = screener.vector_store.add_resumes(resumes)
+    elapsed = time.perf_counter() - start
+    results = {'add_resumes': {
+        'docs': len(resumes),
+        'seconds': elapsed,
+        'docs_per_second': len(resumes) / elapsed,
+        'chunks_per_second': (chunks or 0) / elapsed
+    }}
+    
+    files_dir = os.path.join(directory, "resumes")
+    os.makedirs(files_dir, exist_ok=True)
+    for resume in resumes:
+        with open(os.path.join(files_dir, resume['id'] + ".txt"), 'w', encoding='utf-8') as f:
+            f.write(resume['text'])
+    screener.vector_store.clear_collection()
+    summary = ingest_directory(files_dir, vector_store=screener.vector_store,
+                               checkpoint_path=config.INGEST_CHECKPOINT_PATH)
+    results['ingest_directory'] = {
+        'docs': summary['files_ingested'],
+        'seconds': summary['elapsed_seconds'],
+        'docs_per_second': summary['files_per_second'],
+        'chunks_per_second': summary['embeds_per_second']
+    }
+    return results
+
+
+def bench_search(args) -> dict:
+    """semantic_search and score_indexed_resumes latency against collection size"""
+    screener = make_screener(args)
+    store = screener.vector_store
+    store.clear_collection()
+    queries = [generate_job_description(args.seed + i) for i in range(args.search_queries)]
+    
+    results = {}
+    indexed = 0
+    for size in sorted(args.search_sizes):
+        store.add_resumes(generate_resumes(size - indexed, args.words, seed=args.seed + indexed))
+        indexed = size
+        
+        top_k, full_scan = [], []
+        for query in queries:
+            start = time.perf_counter()
+            store.semantic_search(query, top_k=10)
+            top_k.append(time.perf_counter() - start)
+        for query in queries[:max(1, len(queries) // 5)]:
+            start = time.perf_counter()
+            store.score_indexed_resumes(query)
+            full_scan.append(time.perf_counter() - start)
+        results[str(size)] = {
+            'chunks': store.collection.count(),
+            'semantic_search': percentiles(top_k),
+            'score_indexed_resumes': percentiles(full_scan)
+        }
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    parser.add_argument("--suites", nargs="+", default=SUITES, choices=SUITES)
+    parser.add_argument("--out", help="Write results to this JSON file")
+    parser.add_argument("--quick", action="store_true", help="Small sizes for a fast smoke run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--words", type=int, default=400, help="Words per synthetic resume")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fake LLM mean latency (s)")
+    parser.add_argument("--llm-jitter", type=float, default=0.05, help="Fake LLM latency std dev (s)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0,
+                        help="Fraction of fake LLM requests that fail with a 503")
+    parser.add_argument("--llm-slow-rate", type=float, default=0.0,
+                        help="Fraction of fake LLM requests that take --llm-slow-latency")
+    parser.add_argument("--llm-slow-latency", type=float, default=5.0, help="Slow fake LLM request (s)")
+    parser.add_argument("--rpm", type=int, default=100000, help="LLM requests per minute limit")
+    parser.add_argument("--dim", type=int, default=384, help="Fake embedding dimension")
+    parser.add_argument("--real-embeddings", action="store_true",
+                        help="Use the configured embedding model instead of the hashing encoder")
+    parser.add_argument("--screen-calls", type=int, default=50)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--ingest-docs", type=int, default=1000)
+    parser.add_argument("--search-sizes", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--search-queries", type=int, default=20)
+    args = parser.parse_args()
+    
+    if args.quick:
+        args.screen_calls, args.batch_sizes, args.ingest_docs = 10, [10, 50], 100
+        args.search_sizes, args.search_queries = [100, 500], 5
+    
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'vector_backend': config.VECTOR_BACKEND,
+            'args': vars(args)
+        }
+    }
+    
+    with tempfile.TemporaryDirectory() as directory:
+        isolate(directory)
+        for suite in args.suites:
+            print(f"Running {suite}...", flush=True)
+            start = time.perf_counter()
+            if suite == 'screen':
+                results[suite] = bench_screen(args)
+            elif suite == 'batch':
+                results[suite] = bench_batch(args)
+            elif suite == 'ingest':
+                results[suite] = bench_ingest(args, directory)
+            else:
+                results[suite] = bench_search(args)
+            print(f"  done in {time.perf_counter() - start:.1f}s")
+            print(json.dumps(results[suite], indent=2))
+    
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Deterministic synthetic resumes and job descriptions for benchmarks
+
+Documents are assembled from skill names in the taxonomy and filler
+vocabulary, with section headings, so chunking, skill matching and scoring
+see realistic structure. The same seed always yields the same text.
+"""
+import json
+import os
+import random
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+FILLER = (
+    "designed built shipped maintained owned improved reduced latency cost throughput reliability "
+    "service platform pipeline feature team customers stakeholders production incident migration "
+    "architecture scalable distributed internal external product roadmap data model api release "
+    "mentored collaborated delivered launched automated monitored optimized refactored tested"
+).split()
+
+TITLES = ["Backend Engineer", "Data Scientist", "Frontend Developer", "DevOps Engineer",
+          "Machine Learning Engineer", "Full Stack Developer", "Data Engineer", "Mobile Developer"]
+SENIORITY = ["Junior", "Mid-level", "Senior", "Staff", "Lead"]
+DEGREES = ["Bachelor of Science in Computer Science", "Master of Science in Data Science",
+           "Bachelor of Engineering", "BSc Mathematics", "Self-taught, bootcamp graduate"]
+
+
+def load_skills() -> List[str]:
+    with open(config.SKILL_TAXONOMY_PATH, encoding='utf-8') as f:
+        return list(json.load(f))
+
+
+def _sentence(rng: random.Random, skills: List[str], n_words: int) -> str:
+    words = [rng.choice(FILLER) for _ in range(n_words)]
+    for _ in range(rng.randint(0, 2)):
+        words.insert(rng.randrange(len(words) + 1), rng.choice(skills))
+    return ' '.join(words).capitalize() + '.'
+
+
+def generate_resume(seed: int, words: int = 400, skills: List[str] = None) -> str:
+    """A resume of roughly `words` words with summary, skills, experience and education sections"""
+    rng = random.Random(seed)
+    skills = skills or load_skills()
+    own_skills = rng.sample(skills, rng.randint(4, 12))
+    
+    lines = [f"Candidate {seed}", f"{rng.choice(SENIORITY)} {rng.choice(TITLES)}", "", "SUMMARY",
+             _sentence(rng, own_skills, 25), "", "SKILLS", ', '.join(own_skills), "", "EXPERIENCE"]
+    written = sum(len(line.split()) for line in lines)
+    while written < words - 20:
+        sentence = _sentence(rng, own_skills, rng.randint(10, 25))
+        lines.append(f"- {sentence}")
+        written += len(sentence.split())
+    lines += ["", "EDUCATION", rng.choice(DEGREES)]
+    return '\n'.join(lines)
+
+
+def generate_job_description(seed: int, skills: List[str] = None) -> str:
+    """A job description with required and nice-to-have skills"""
+    rng = random.Random(10 ** 6 + seed)
+    skills = skills or load_skills()
+    required = rng.sample(skills, rng.randint(3, 6))
+    nice = rng.sample([skill for skill in skills if skill not in required], 3)
+    
+    lines = [f"{rng.choice(SENIORITY)} {rng.choice(TITLES)}", "", _sentence(rng, required, 30), "",
+             "Requirements:"]
+    lines += [f"- {rng.randint(2, 8)}+ years of experience with {skill}" for skill in required]
+    lines += ["", "Nice to have:"] + [f"- {skill}" for skill in nice]
+    lines += ["", f"Education: {rng.choice(DEGREES)}"]
+    return '\n'.join(lines)
+
+
+def generate_resumes(n: int, words: int = 400, seed: int = 0) -> List[Dict]:
+    """n resumes as {'id', 'text'} dictionaries"""
+    skills = load_skills()
+    return [{'id': f"resume_{seed + i}", 'text': generate_resume(seed + i, words, skills)} for i in range(n)]
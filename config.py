@@ -12,14 +12,125 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 # Scoring Weights
 SEMANTIC_SEARCH_WEIGHT = 0.6
 LLM_WEIGHT = 0.4
+SKILL_MATCH_WEIGHT = 0.0  # Optional third component (taxonomy skill overlap); weights are renormalized when > 0
+
+# Skill Matching: local skill extraction over a skill/alias taxonomy
+SKILL_MATCHING_ENABLED = False  # Adds skill_score and skill_overlap to results
+SKILL_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills_taxonomy.json")
+SKILL_CONTEXT_WINDOW = 8  # Tokens around an ambiguous skill name (e.g. "Rust") searched for another skill
+SKILL_CONTEXT_WORDS = ["programming", "language", "languages", "developer", "developers", "engineer", "engineers"]
+SKILL_FILTER_REQUIRED = False  # Skip the LLM for resumes missing a required skill of the job profile
+
+# Bounded Evaluation: skip the LLM when the semantic score alone fixes the recommendation
+BOUNDED_EVALUATION = False
 
 # Vector Database Configuration
 VECTOR_DB_PATH = "./vector_db"
-COLLECTION_NAME = "resumes"
+VECTOR_BACKEND = "chroma"  # "chroma" (HNSW) or "numpy" (exact search over a memory-mapped matrix)
+NUMPY_INDEX_PATH = "./vector_db_numpy"
+NUMPY_INDEX_DTYPE = "float16"  # "float16" or "int8" (per-row scale, a quarter of float32 memory)
+NUMPY_SEARCH_BLOCK_ROWS = 65536  # Rows dequantized per block during a search
+RESUME_COLLECTION_NAME = "resumes"
+JOB_COLLECTION_NAME = "jobs"  # Job descriptions are kept apart so resume queries never return them
+COLLECTION_NAME = RESUME_COLLECTION_NAME  # Backwards-compatible alias
+
+# Candidate Ranking (retrieve-then-rerank)
+RANK_SHORTLIST_K = 50  # Top semantic matches sent to the LLM
+MATRIX_TOP_K_PER_JOB = 10  # screen_matrix: resumes per job sent to the LLM
+MATRIX_TOP_K_PER_CANDIDATE = None  # screen_matrix: jobs per resume sent to the LLM (None = off)
 
 # Embedding Model
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"  # Lightweight and efficient
+EMBEDDING_BATCH_SIZE = 64  # Texts per encode call in batch scoring
+EMBEDDING_ENGINE = "torch"  # "torch", "torch-int8" (dynamic int8 quantization) or "onnx" (ONNX Runtime, CPU)
+EMBEDDING_THREADS = None  # Intra-op CPU threads for the embedding engine (None = library default)
+EMBEDDING_ONNX_FILE = None  # ONNX file inside the model repo, e.g. "onnx/model_qint8_avx512_vnni.onnx"
+EMBEDDING_MAX_DRIFT = 0.02  # Largest mean cosine drift (1 - cos) of an engine from full-precision torch
+EMBEDDING_CHECK_PARITY = False  # Check the drift when loading a non-torch engine (loads the torch model once)
+
+# Resume Chunking (the embedding model truncates inputs at ~256 word pieces)
+RESUME_CHUNK_SIZE = 160  # Words per chunk
+RESUME_CHUNK_STRIDE = 128  # Words between chunk starts (overlap = size - stride)
+RESUME_MAX_CHUNKS = 32  # Chunks kept per resume
+CHUNK_AGGREGATION = "max"  # "max" or "top_n_mean"
+CHUNK_TOP_N = 3  # Chunks averaged per resume with "top_n_mean"
+
+# PDF Extraction Limits
+PDF_MAX_PAGES = 50  # Pages read per document
+PDF_MAX_CHARS = 200000  # Characters kept per document
+PDF_TIMEOUT_SECONDS = 30  # Wall-clock limit per document
+
+# Bulk Ingestion (python main.py ingest <dir>)
+INGEST_WORKERS = None  # Extraction processes (None = one per CPU)
+INGEST_EMBED_BATCH = 256  # Resumes embedded and written per batch
+INGEST_ADD_BATCH_SIZE = 1000  # Entries per collection.add call
+INGEST_CHECKPOINT_PATH = "./cache/ingest_checkpoint.jsonl"
+
+# Near-Duplicate Detection (MinHash/LSH over word shingles of the resume text)
+DEDUP_ENABLED = True
+DEDUP_INDEX_PATH = "./cache/dedup.sqlite3"
+DEDUP_THRESHOLD = 0.8  # Estimated Jaccard similarity at which resumes are collapsed
+DEDUP_SHINGLE_SIZE = 3  # Words per shingle
+DEDUP_NUM_PERM = 128  # MinHash signature length
+DEDUP_BANDS = 32  # LSH bands (DEDUP_NUM_PERM / DEDUP_BANDS rows each)
+
+# Embedding Cache (memory-mapped vectors shared across processes)
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_DIR = "./cache/embeddings"
 
 # LLM Configuration
 LLM_MODEL = "gemini-2.0-flash"  # Available model (or use "gemini-pro-latest" for latest stable)
 TEMPERATURE = 0.3  # Lower temperature for more consistent matching
+
+# LLM Concurrency and Rate Limits (match these to your Gemini quota)
+LLM_MAX_CONCURRENCY = 8  # Max in-flight requests during batch evaluation
+LLM_REQUESTS_PER_MINUTE = 60
+LLM_TOKENS_PER_MINUTE = 1000000
+LLM_COMPLETION_TOKEN_ESTIMATE = 300  # Tokens reserved per request for the reply
+LLM_PACKED_EVALUATION = False  # Evaluate several resumes for the same job description per request
+LLM_PACKED_TOKEN_BUDGET = 12000  # Estimated prompt + completion tokens per packed request
+LLM_PACKED_MAX_RESUMES = 8  # Upper bound on resumes per packed request
+CONTEXT_TRIMMING = False  # Send the LLM only the resume passages most relevant to the job description
+CONTEXT_TOKEN_BUDGET = 600  # Estimated resume tokens kept when trimming
+CONTEXT_PASSAGE_WORDS = 60  # Words per passage considered for the trimmed context
+JOB_PROFILE_ENABLED = False  # Compile each job description once and screen resumes against the profile
+JOB_PROFILE_SKILL_THRESHOLD = 0.55  # Skill-to-resume-chunk similarity that counts as a skill match
+
+# LLM Resilience (timeouts, retries, hedging and circuit breaker)
+LLM_ATTEMPT_TIMEOUT_SECONDS = 30  # Per request attempt
+LLM_CALL_DEADLINE_SECONDS = 90  # For all attempts of one evaluation together
+LLM_MAX_RETRIES = 3  # Retries after the first attempt (timeouts, 429s and server errors only)
+LLM_BACKOFF_BASE_SECONDS = 1.0  # Jittered exponential backoff; a longer retry-after hint wins
+LLM_BACKOFF_MAX_SECONDS = 20.0
+LLM_HEDGE_ENABLED = False  # Send a duplicate request when an attempt is slower than the recent p95
+LLM_HEDGE_PERCENTILE = 0.95
+LLM_HEDGE_MIN_SAMPLES = 20  # Successful requests observed before hedging starts
+LLM_BREAKER_FAILURE_THRESHOLD = 5  # Consecutive failed attempts that open the circuit breaker
+LLM_BREAKER_RESET_SECONDS = 30  # Fail fast this long before probing the API again
+LLM_DEGRADE_ON_FAILURE = True  # Fall back to a flagged semantic-only score instead of raising
+
+# LLM Evaluation Cache
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = "./cache/llm_cache.sqlite3"
+LLM_CACHE_MAX_ENTRIES = 100000  # Oldest entries are evicted beyond this
+LLM_CACHE_MAX_AGE_DAYS = 30  # Entries older than this are ignored and evicted
+
+# Metrics (per-stage latency histograms, counters and per-result timings)
+METRICS_ENABLED = True
+
+# Durable Work Queue (python main.py enqueue / worker / status)
+WORK_QUEUE_PATH = "./cache/work_queue.sqlite3"
+WORK_QUEUE_CLAIM_SIZE = 16  # Tasks leased (and screened as one batch) at a time
+WORK_QUEUE_LEASE_SECONDS = 300  # Renewed while the worker is alive; expired leases are claimed again
+WORK_QUEUE_MAX_ATTEMPTS = 3  # Attempts per task before it is marked failed
+WORK_QUEUE_RETRY_DELAY_SECONDS = 30  # Multiplied by the attempt number
+WORK_QUEUE_POLL_SECONDS = 2.0  # Idle workers check for new tasks this often
+
+# HTTP Screening Service (python main.py serve)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+SERVER_WORKERS = 8  # Screening calls run at once; the rest wait in the queue
+SERVER_MAX_QUEUE = 64  # Admitted requests (running + waiting) before new ones get 503
+SERVER_MAX_BATCH_RESUMES = 500  # Largest /batch request accepted
+SERVER_ENCODE_WAIT_MS = 2  # How long an embedding request waits to be batched with others
+SERVER_ENCODE_MAX_BATCH = 256  # Texts per merged encode call
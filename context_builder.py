@@ -0,0 +1,119 @@
+"""
+Context assembly for LLM evaluation
+
+Instead of the whole resume, the evaluator can be given only the resume
+passages most relevant to the job description's requirements, ranked with
+the embedding model and kept in their original order up to a token budget.
+"""
+import re
+from typing import Dict, List
+import numpy as np
+import config
+from utils import estimate_tokens, split_into_chunks
+
+# Marks the place of passages left out of a trimmed resume
+OMISSION_MARKER = "[...]"
+
+
+def split_requirements(job_description: str) -> List[str]:
+    """
+    Split a job description into requirement lines
+    
+    Bullets and sentences with at least three words count as requirements;
+    the whole job description is used when none are found.
+    """
+    requirements = []
+    for line in job_description.splitlines():
+        line = re.sub(r'^\s*([-*•·]|\d+[.)])\s*', '', line).strip()
+        for sentence in re.split(r'(?<=[.;])\s+', line):
+            if len(sentence.split()) >= 3:
+                requirements.append(sentence)
+    return requirements or [job_description]
+
+
+def trim_contexts(resume_texts: List[str], job_description: str, vector_store,
+                  token_budget: int = None) -> List[Dict]:
+    """
+    Keep the passages of each resume most relevant to the job description
+    
+    Each resume is split into section-aware passages of
+    config.CONTEXT_PASSAGE_WORDS words. A passage's relevance is its best
+    cosine similarity to any requirement line of the job description.
+    Passages are taken in order of relevance while they fit the budget and
+    returned in their original order. All passages of all resumes are
+    embedded in one batched call.
+    
+    Args:
+        resume_texts: List of resume texts
+        job_description: The job description text
+        vector_store: VectorStore used to embed passages and requirements
+        token_budget: Estimated tokens kept per resume (defaults to config.CONTEXT_TOKEN_BUDGET)
+        
+    Returns:
+        List of dictionaries (one per resume) containing:
+        - text: The trimmed resume (unchanged if it already fits the budget)
+        - tokens_before / tokens_after: Estimated tokens of the resume and of the trimmed text
+        - passages_kept / passages_total: Passages in the trimmed text and in the resume
+    """
+    token_budget = token_budget or config.CONTEXT_TOKEN_BUDGET
+    passage_words = config.CONTEXT_PASSAGE_WORDS
+    
+    contexts = []
+    to_trim = []
+    for resume_text in resume_texts:
+        passages = split_into_chunks(resume_text, passage_words, passage_words)
+        tokens = estimate_tokens(resume_text)
+        contexts.append({
+            'text': resume_text,
+            'tokens_before': tokens,
+            'tokens_after': tokens,
+            'passages_kept': len(passages),
+            'passages_total': len(passages)
+        })
+        if tokens > token_budget and len(passages) > 1:
+            to_trim.append((len(contexts) - 1, passages))
+    
+    if not to_trim:
+        return contexts
+    
+    requirement_embeddings = vector_store.embed(split_requirements(job_description))
+    passage_embeddings = vector_store.embed([p['text'] for _, passages in to_trim for p in passages])
+    relevance = (passage_embeddings @ requirement_embeddings.T).max(axis=1)
+    
+    offset = 0
+    for i, passages in to_trim:
+        scores = relevance[offset:offset + len(passages)]
+        offset += len(passages)
+        
+        kept, used = [], 0
+        for n in np.argsort(-scores, kind='stable'):
+            tokens = estimate_tokens(passages[n]['text'])
+            if used + tokens > token_budget and kept:
+                continue
+            kept.append(n)
+            used += tokens
+        kept.sort()
+        
+        pieces = []
+        for position, n in enumerate(kept):
+            previous_end = passages[kept[position - 1]]['word_end'] if position else 0
+            if passages[n]['word_start'] > previous_end:
+                pieces.append(OMISSION_MARKER)
+            pieces.append(passages[n]['text'])
+        if passages[kept[-1]]['word_end'] < passages[-1]['word_end']:
+            pieces.append(OMISSION_MARKER)
+        
+        text = '\n'.join(pieces)
+        contexts[i].update({
+            'text': text,
+            'tokens_after': estimate_tokens(text),
+            'passages_kept': len(kept)
+        })
+    
+    return contexts
+
+
+def trim_context(resume_text: str, job_description: str, vector_store,
+                 token_budget: int = None) -> Dict:
+    """Trim a single resume (see trim_contexts)"""
+    return trim_contexts([resume_text], job_description, vector_store, token_budget)[0]
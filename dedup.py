@@ -0,0 +1,275 @@
+"""
+Near-duplicate resume detection (MinHash signatures with an LSH index)
+
+Each resume is reduced to the set of word shingles of its clean_text and
+summarised by a MinHash signature; the fraction of equal signature slots
+estimates the Jaccard similarity of two resumes. Signatures are split into
+bands and every band is hashed into a bucket, so a lookup only compares the
+resumes sharing at least one bucket instead of the whole index.
+
+The index is stored in SQLite (config.DEDUP_INDEX_PATH) and remembers which
+resumes were collapsed onto which original, so results for the original can
+be repeated for its copies.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Set
+import numpy as np
+import config
+from utils import clean_text
+
+# Modulus of the universal hash family used to permute shingle hashes
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def shingles(text: str, size: int = None) -> Set[str]:
+    """
+    Word shingles of a text after clean_text and lower-casing
+    
+    Args:
+        text: Resume text
+        size: Words per shingle (defaults to config.DEDUP_SHINGLE_SIZE)
+    
+    Returns:
+        Set of shingles; texts shorter than one shingle give a single shingle
+    """
+    size = size or config.DEDUP_SHINGLE_SIZE
+    words = clean_text(text).lower().split()
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def estimate_similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """Jaccard similarity estimated from two MinHash signatures"""
+    return float(np.mean(signature_a == signature_b))
+
+
+def bucket_keys(signature: np.ndarray, bands: int) -> List[str]:
+    """LSH bucket key of each band of a signature"""
+    rows = len(signature) // bands
+    return [
+        f"{band}:" + hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()
+        for band in range(bands)
+    ]
+
+
+class MinHasher:
+    """MinHash signatures with a fixed, seeded set of hash permutations"""
+    
+    def __init__(self, num_perm: int = None, shingle_size: int = None, seed: int = 1):
+        self.num_perm = num_perm or config.DEDUP_NUM_PERM
+        self.shingle_size = shingle_size or config.DEDUP_SHINGLE_SIZE
+        rng = np.random.RandomState(seed)
+        # Kept below 2**32 so that a * hash + b stays within 64 bits
+        self._a = rng.randint(1, 1 << 32, size=self.num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.randint(0, 1 << 32, size=self.num_perm, dtype=np.uint64)[:, None]
+    
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        MinHash signature of a text
+        
+        Returns:
+            uint32 array of num_perm values, or None for a text without words
+        """
+        text_shingles = shingles(text, self.shingle_size)
+        if not text_shingles:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in text_shingles),
+            dtype=np.uint64, count=len(text_shingles)
+        )
+        permuted = ((self._a * hashes[None, :] + self._b) % MERSENNE_PRIME) & MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+class DedupIndex:
+    """
+    Persistent LSH index of resume signatures
+    
+    Only originals are bucketed; a resume found to be a near-duplicate is
+    stored with a link to its original, so chains of copies all point at
+    the first one seen. Use path=':memory:' for a throwaway index.
+    
+    Callers look a resume up with find(), store the original (e.g. in the
+    vector store) and only then add() it, so the index never holds an
+    original whose vectors were not written.
+    """
+    
+    def __init__(self, path: str = None, threshold: float = None, num_perm: int = None,
+                 bands: int = None, shingle_size: int = None):
+        """
+        Args:
+            path: SQLite file (defaults to config.DEDUP_INDEX_PATH)
+            threshold: Estimated Jaccard similarity at which a resume counts as a
+                duplicate (defaults to config.DEDUP_THRESHOLD)
+            num_perm: Signature length (defaults to config.DEDUP_NUM_PERM)
+            bands: LSH bands; num_perm must be a multiple (defaults to config.DEDUP_BANDS)
+            shingle_size: Words per shingle (defaults to config.DEDUP_SHINGLE_SIZE)
+        """
+        self.path = path or config.DEDUP_INDEX_PATH
+        self.threshold = threshold if threshold is not None else config.DEDUP_THRESHOLD
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.bands = bands or config.DEDUP_BANDS
+        if self.hasher.num_perm % self.bands:
+            raise ValueError(f"num_perm ({self.hasher.num_perm}) must be a multiple of bands ({self.bands})")
+        self.rows = self.hasher.num_perm // self.bands
+        
+        directory = os.path.dirname(self.path)
+        if directory and self.path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "doc_id TEXT PRIMARY KEY, signature BLOB NOT NULL, duplicate_of TEXT, "
+            "similarity REAL, created_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS buckets (bucket TEXT NOT NULL, doc_id TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS buckets_bucket ON buckets (bucket);"
+            "CREATE INDEX IF NOT EXISTS buckets_doc_id ON buckets (doc_id);"
+        )
+        # Added after the first release, for indexes created before it
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(documents)")}
+        if 'metadata' not in columns:
+            self._conn.execute("ALTER TABLE documents ADD COLUMN metadata TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS documents_duplicate_of ON documents (duplicate_of)")
+        self._check_settings()
+        self._conn.commit()
+    
+    def _check_settings(self):
+        """Start over when the stored signatures were computed with other parameters"""
+        settings = {
+            'num_perm': str(self.hasher.num_perm),
+            'bands': str(self.bands),
+            'shingle_size': str(self.hasher.shingle_size)
+        }
+        stored = dict(self._conn.execute("SELECT name, value FROM settings").fetchall())
+        if stored == settings:
+            return
+        if stored:
+            # Signatures of different lengths or shingles cannot be compared
+            print(f"Dedup settings changed ({stored} -> {settings}); resetting {self.path}")
+            self._conn.execute("DELETE FROM buckets")
+            self._conn.execute("DELETE FROM documents")
+            self._conn.execute("DELETE FROM settings")
+        self._conn.executemany("INSERT INTO settings (name, value) VALUES (?, ?)", settings.items())
+    
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of a text (None when it has no words)"""
+        return self.hasher.signature(text)
+    
+    def find(self, signature: Optional[np.ndarray], exclude_id: str = None) -> Optional[Dict]:
+        """
+        Best indexed original at or above the threshold
+        
+        Args:
+            signature: Signature from signature() (None never matches)
+            exclude_id: Document to ignore, e.g. the one being re-indexed
+        
+        Returns:
+            {'duplicate_of': original id, 'similarity': estimated Jaccard}, or None
+        """
+        if signature is None:
+            return None
+        keys = bucket_keys(signature, self.bands)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT d.doc_id, d.signature FROM documents d WHERE d.doc_id IN ("
+                f"SELECT doc_id FROM buckets WHERE bucket IN ({','.join('?' * len(keys))}))",
+                keys
+            ).fetchall()
+        best = None
+        for doc_id, blob in rows:
+            if doc_id == exclude_id:
+                continue
+            similarity = estimate_similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if similarity >= self.threshold and (best is None or similarity > best['similarity']):
+                best = {'duplicate_of': doc_id, 'similarity': similarity}
+        return best
+    
+    def add(self, doc_id: str, signature: np.ndarray, duplicate: Dict = None, metadata: Dict = None):
+        """
+        Store a document, as an original or (with duplicate) as a link to one
+        
+        Args:
+            doc_id: Resume ID
+            signature: Signature from signature()
+            duplicate: Result of find() when the document is a near-duplicate
+            metadata: Metadata of a near-duplicate, returned by duplicates_of()
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM buckets WHERE doc_id = ?", (doc_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (doc_id, signature, duplicate_of, similarity, created_at, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_id, signature.tobytes(), duplicate['duplicate_of'] if duplicate else None,
+                 duplicate['similarity'] if duplicate else None, time.time(),
+                 json.dumps(metadata) if metadata else None)
+            )
+            if not duplicate:
+                self._conn.executemany(
+                    "INSERT INTO buckets (bucket, doc_id) VALUES (?, ?)",
+                    [(key, doc_id) for key in bucket_keys(signature, self.bands)]
+                )
+            self._conn.commit()
+    
+    def duplicates_of(self, doc_ids: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Near-duplicates linked to each of some originals
+        
+        Returns:
+            {original id: [{'id', 'similarity', 'metadata'}, ...]} for the
+            originals that have any, in the order the copies were added
+        """
+        links = {}
+        doc_ids = list(doc_ids)
+        with self._lock:
+            for start in range(0, len(doc_ids), 500):
+                chunk = doc_ids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT doc_id, duplicate_of, similarity, metadata FROM documents "
+                    f"WHERE duplicate_of IN ({','.join('?' * len(chunk))}) ORDER BY created_at",
+                    chunk
+                ).fetchall()
+                for doc_id, original, similarity, metadata in rows:
+                    links.setdefault(original, []).append({
+                        'id': doc_id,
+                        'similarity': similarity,
+                        'metadata': json.loads(metadata) if metadata else {}
+                    })
+        return links
+    
+    def original_of(self, doc_id: str) -> Optional[str]:
+        """ID of the original a resume was collapsed onto, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT duplicate_of FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def clear(self):
+        """Remove every indexed document"""
+        with self._lock:
+            self._conn.execute("DELETE FROM buckets")
+            self._conn.execute("DELETE FROM documents")
+            self._conn.commit()
+    
+    def stats(self) -> Dict:
+        """Number of indexed originals and of collapsed duplicates"""
+        with self._lock:
+            originals, duplicates = self._conn.execute(
+                "SELECT SUM(duplicate_of IS NULL), SUM(duplicate_of IS NOT NULL) FROM documents"
+            ).fetchone()
+        return {'originals': originals or 0, 'duplicates': duplicates or 0}
+    
+    def close(self):
+        self._conn.close()
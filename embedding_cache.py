@@ -0,0 +1,172 @@
+"""
+Persistent embedding cache backed by a memory-mapped vector file
+"""
+import os
+import re
+import sqlite3
+import threading
+from typing import Callable, Dict, List
+import numpy as np
+import config
+import metrics
+from llm_cache import content_hash
+
+
+class EmbeddingCache:
+    """
+    Append-only store of float32 embeddings keyed by text hash
+    
+    Vectors are appended to `<model>.f32` and read back through a memory map;
+    a SQLite index maps each text hash to its row. Writers serialize on the
+    SQLite write lock, so several processes can share one cache directory.
+    """
+    
+    # SQLite's default limit on bound parameters per statement
+    QUERY_CHUNK = 500
+    
+    def __init__(self, model_name: str, directory: str = None):
+        self.directory = directory or config.EMBEDDING_CACHE_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        
+        name = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.vectors_path = os.path.join(self.directory, f"{name}.f32")
+        self.index_path = os.path.join(self.directory, f"{name}.sqlite3")
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.index_path, timeout=60, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (hash TEXT PRIMARY KEY, row INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'dimension'").fetchone()
+        self.dimension = int(row[0]) if row else None
+        
+        self._vectors = None
+        self.hits = 0
+        self.misses = 0
+    
+    def _map(self, min_rows: int = 0) -> np.ndarray:
+        """Memory map of the vector file, remapped if it has grown past min_rows"""
+        if self._vectors is None or len(self._vectors) < min_rows:
+            rows = os.path.getsize(self.vectors_path) // (self.dimension * 4) \
+                if os.path.exists(self.vectors_path) else 0
+            if rows == 0:
+                return np.empty((0, self.dimension or 0), dtype=np.float32)
+            self._vectors = np.memmap(
+                self.vectors_path, dtype=np.float32, mode='r', shape=(rows, self.dimension)
+            )
+        return self._vectors
+    
+    def _lookup(self, hashes: List[str]) -> Dict[str, int]:
+        rows = {}
+        for start in range(0, len(hashes), self.QUERY_CHUNK):
+            chunk = hashes[start:start + self.QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows.update(self._conn.execute(
+                f"SELECT hash, row FROM embeddings WHERE hash IN ({placeholders})", chunk
+            ).fetchall())
+        return rows
+    
+    def get_many(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for the given text hashes (missing hashes are omitted)"""
+        with self._lock:
+            if self.dimension is None:
+                return {}
+            rows = self._lookup(hashes)
+            if not rows:
+                return {}
+            vectors = self._map(max(rows.values()) + 1)
+            return {h: np.array(vectors[row]) for h, row in rows.items()}
+    
+    def put_many(self, hashes: List[str], vectors: np.ndarray):
+        """Append vectors for hashes that are not cached yet"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            # BEGIN IMMEDIATE takes the database write lock, serializing appends across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.dimension is None:
+                    self.dimension = vectors.shape[1]
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO meta (key, value) VALUES ('dimension', ?)",
+                        (str(self.dimension),)
+                    )
+                existing = self._lookup(hashes)
+                new = []
+                for i, h in enumerate(hashes):
+                    if h not in existing:
+                        existing[h] = -1  # Also skips repeats within this call
+                        new.append(i)
+                if new:
+                    first_row = self._truncate_to_index()
+                    with open(self.vectors_path, 'ab') as f:
+                        f.write(vectors[new].tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._conn.executemany(
+                        "INSERT INTO embeddings (hash, row) VALUES (?, ?)",
+                        [(hashes[i], first_row + n) for n, i in enumerate(new)]
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+    
+    def _truncate_to_index(self) -> int:
+        """
+        Cut the vector file back to the rows the index knows about (call under the write lock)
+        
+        A torn write leaves a partial row and a rolled-back append leaves
+        orphan rows; appending after either would misalign every later vector.
+        
+        Returns:
+            Row number of the next vector to append
+        """
+        rows = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM embeddings").fetchone()[0]
+        size = rows * self.dimension * 4
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) > size:
+            with open(self.vectors_path, 'r+b') as f:
+                f.truncate(size)
+        return rows
+    
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Embed texts, computing only the ones not cached yet
+        
+        Args:
+            texts: Texts to embed
+            encode_fn: Function embedding a list of texts into a 2-D array
+            
+        Returns:
+            float32 array with one row per text, in input order
+        """
+        hashes = [content_hash(text) for text in texts]
+        cached = self.get_many(hashes)
+        
+        missing = list(dict.fromkeys(h for h in hashes if h not in cached))
+        hits = sum(1 for h in hashes if h in cached)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(missing)
+        metrics.count('embedding_cache', hits, result='hit')
+        metrics.count('embedding_cache', len(missing), result='miss')
+        if missing:
+            text_by_hash = dict(zip(hashes, texts))
+            computed = np.asarray(encode_fn([text_by_hash[h] for h in missing]), dtype=np.float32)
+            self.put_many(missing, computed)
+            cached.update(zip(missing, computed))
+        
+        if not texts:
+            return np.empty((0, self.dimension or 0), dtype=np.float32)
+        return np.stack([cached[h] for h in hashes])
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and number of stored vectors"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
@@ -0,0 +1,211 @@
+"""
+Bulk ingestion of resume files into the vector store
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Set, Tuple
+import config
+from dedup import DedupIndex
+from utils import extract_pdf_text, read_text_file
+
+
+RESUME_EXTENSIONS = ('.pdf', '.txt')
+
+
+def find_resume_files(directory: str) -> List[str]:
+    """Absolute paths of all PDF and TXT files under directory, sorted"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(RESUME_EXTENSIONS):
+                paths.append(os.path.abspath(os.path.join(root, name)))
+    return sorted(paths)
+
+
+def resume_id_for(path: str, directory: str) -> str:
+    """
+    Resume ID of a file: its path relative to directory, with '/' separators
+    
+    The extension is kept so that e.g. jane.pdf and jane.txt stay two resumes.
+    """
+    return os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def extract_resume_file(path: str) -> Tuple[str, Dict]:
+    """
+    Extract the text of one resume file (runs in a worker process)
+    
+    PDFs are read within the configured page, character and time budgets.
+    
+    Returns:
+        Tuple of (path, extraction result as returned by utils.extract_pdf_text)
+    """
+    if path.lower().endswith('.pdf'):
+        return path, extract_pdf_text(path)
+    text = read_text_file(path)
+    return path, {
+        'ok': bool(text and text.strip()),
+        'text': text,
+        'pages': 1,
+        'truncated': False,
+        'error': None if text and text.strip() else "Empty or unreadable text file",
+        'elapsed_seconds': 0.0
+    }
+
+
+def load_checkpoint(checkpoint_path: str) -> Set[str]:
+    """Paths already handled by an earlier (possibly interrupted) run"""
+    done = set()
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)['path'])
+                except (ValueError, KeyError):
+                    continue  # Partially written last line
+    return done
+
+
+def _append_checkpoint(checkpoint_path: str, entries: List[Dict]):
+    with open(checkpoint_path, 'a', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def ingest_directory(directory: str, vector_store=None, workers: int = None,
+                     embed_batch: int = None, add_batch_size: int = None,
+                     checkpoint_path: str = None, dedup_index=None) -> Dict:
+    """
+    Extract, embed and index every resume file in a directory
+    
+    Text extraction runs in a process pool; extracted resumes are embedded
+    and written in batches. Each written batch is recorded in a checkpoint
+    file, so an interrupted run picks up where it stopped. Resumes that are
+    near-duplicates of an indexed resume (or of an earlier one in the run)
+    are linked to it in the dedup index instead of being embedded again.
+    Originals enter the dedup index only after their batch is written.
+    
+    Args:
+        directory: Directory to scan (recursively) for PDF and TXT files
+        vector_store: VectorStore to write to (a new one is created if omitted)
+        workers: Extraction processes (defaults to config.INGEST_WORKERS or the CPU count)
+        embed_batch: Resumes embedded per batch (defaults to config.INGEST_EMBED_BATCH)
+        add_batch_size: Entries per collection.add call (defaults to config.INGEST_ADD_BATCH_SIZE)
+        checkpoint_path: Checkpoint file (defaults to config.INGEST_CHECKPOINT_PATH)
+        dedup_index: DedupIndex to check resumes against (defaults to the vector
+            store's, see VectorStore.dedup_index)
+    
+    Returns:
+        Summary with file/chunk/duplicate counts, elapsed time and throughput
+    """
+    if vector_store is None:
+        from vector_store import VectorStore
+        vector_store = VectorStore()
+    if dedup_index is None:
+        dedup_index = vector_store.dedup_index
+    workers = workers or config.INGEST_WORKERS or os.cpu_count()
+    embed_batch = embed_batch or config.INGEST_EMBED_BATCH
+    checkpoint_path = checkpoint_path or config.INGEST_CHECKPOINT_PATH
+    
+    checkpoint_dir = os.path.dirname(checkpoint_path)
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+    
+    all_paths = find_resume_files(directory)
+    done = load_checkpoint(checkpoint_path)
+    paths = [path for path in all_paths if path not in done]
+    
+    summary = {
+        'files_found': len(all_paths),
+        'files_skipped': len(all_paths) - len(paths),
+        'files_ingested': 0,
+        'files_failed': 0,
+        'files_truncated': 0,
+        'chunks_embedded': 0,
+        'duplicates_collapsed': 0,
+        'duplicates': [],
+        'errors': []
+    }
+    print(f"Found {len(all_paths)} resume files, {len(paths)} to ingest "
+          f"({summary['files_skipped']} already in checkpoint)")
+    
+    start = time.perf_counter()
+    buffer = []
+    checkpoint_entries = []
+    # Signatures of the buffered originals, and links of the duplicates found since the last flush
+    originals = {}
+    links = []
+    pending_index = DedupIndex(
+        ':memory:', threshold=dedup_index.threshold, num_perm=dedup_index.hasher.num_perm,
+        bands=dedup_index.bands, shingle_size=dedup_index.hasher.shingle_size
+    ) if dedup_index else None
+    
+    def flush():
+        summary['chunks_embedded'] += vector_store.add_resumes(buffer, batch_size=add_batch_size)
+        summary['files_ingested'] += len(buffer)
+        if dedup_index:
+            vector_store.delete_resumes([link['id'] for link in links])
+            for resume_id, signature in originals.items():
+                dedup_index.add(resume_id, signature)
+            for link in links:
+                dedup_index.add(link['id'], link['signature'], link['duplicate'], link['metadata'])
+            pending_index.clear()
+        _append_checkpoint(checkpoint_path, checkpoint_entries)
+        buffer.clear()
+        checkpoint_entries.clear()
+        originals.clear()
+        links.clear()
+        processed = summary['files_ingested'] + summary['files_failed'] + summary['duplicates_collapsed']
+        print(f"  {processed}/{len(paths)} files processed")
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for path, result in executor.map(extract_resume_file, paths, chunksize=8):
+            relative_path = os.path.relpath(path, directory)
+            if not result['ok']:
+                summary['files_failed'] += 1
+                summary['errors'].append({'path': relative_path, 'error': result['error']})
+                checkpoint_entries.append({'path': path, 'status': 'failed', 'error': result['error']})
+                continue
+            if result['truncated']:
+                summary['files_truncated'] += 1
+            
+            resume_id = resume_id_for(path, directory)
+            signature = dedup_index.signature(result['text']) if dedup_index else None
+            duplicate = None
+            if signature is not None:
+                duplicate = (pending_index.find(signature, exclude_id=resume_id)
+                             or dedup_index.find(signature, exclude_id=resume_id))
+            if duplicate:
+                summary['duplicates_collapsed'] += 1
+                summary['duplicates'].append({'path': relative_path, **duplicate})
+                links.append({'id': resume_id, 'signature': signature, 'duplicate': duplicate,
+                              'metadata': {'source': relative_path}})
+                checkpoint_entries.append({'path': path, 'status': 'duplicate', **duplicate})
+                continue
+            if signature is not None:
+                pending_index.add(resume_id, signature)
+                originals[resume_id] = signature
+            
+            buffer.append({
+                'id': resume_id,
+                'text': result['text'],
+                'metadata': {'source': relative_path}
+            })
+            checkpoint_entries.append({'path': path, 'status': 'ok'})
+            if len(buffer) >= embed_batch:
+                flush()
+    
+    if buffer or checkpoint_entries:
+        flush()
+    if pending_index:
+        pending_index.close()
+    
+    elapsed = time.perf_counter() - start
+    summary['elapsed_seconds'] = round(elapsed, 2)
+    summary['files_per_second'] = round(len(paths) / elapsed, 2) if elapsed else 0.0
+    summary['embeds_per_second'] = round(summary['chunks_embedded'] / elapsed, 2) if elapsed else 0.0
+    return summary
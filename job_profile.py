@@ -0,0 +1,144 @@
+"""
+Job description compilation into a reusable requirements profile
+
+A job description is read by the LLM once (see LLMEvaluator.compile_job_profile)
+and turned into a profile of required and nice-to-have skills, seniority and
+education. The profile also carries the job and skill embeddings, so every
+resume screened against the job gets a shorter prompt and a local skill match.
+"""
+import re
+from typing import Dict, List
+import numpy as np
+import config
+from llm_cache import content_hash
+from skill_matcher import get_skill_matcher
+from utils import clean_text
+from vector_store import aggregate_chunk_scores
+
+# Profile fields produced by the LLM (the JSON part of a profile)
+PROFILE_FIELDS = ('title', 'required_skills', 'nice_to_have_skills', 'seniority',
+                  'min_years_experience', 'education')
+
+
+def job_hash(job_description: str) -> str:
+    """Hash identifying a job description (whitespace-insensitive)"""
+    return content_hash(clean_text(job_description))
+
+
+def normalize_profile(raw: Dict) -> Dict:
+    """Profile fields with consistent types from a parsed LLM reply"""
+    def skills(value) -> List[str]:
+        if not isinstance(value, list):
+            return []
+        seen, result = set(), []
+        for skill in value:
+            skill = str(skill).strip()
+            if skill and skill.lower() not in seen:
+                seen.add(skill.lower())
+                result.append(skill)
+        return result
+    
+    try:
+        min_years = float(raw.get('min_years_experience')) if raw.get('min_years_experience') is not None else None
+    except (TypeError, ValueError):
+        min_years = None
+    
+    required = skills(raw.get('required_skills'))
+    required_lower = {skill.lower() for skill in required}
+    return {
+        'title': str(raw.get('title') or ''),
+        'required_skills': required,
+        'nice_to_have_skills': [
+            skill for skill in skills(raw.get('nice_to_have_skills')) if skill.lower() not in required_lower
+        ],
+        'seniority': str(raw.get('seniority') or ''),
+        'min_years_experience': min_years,
+        'education': str(raw.get('education') or '')
+    }
+
+
+def profile_prompt_text(profile: Dict) -> str:
+    """Compact text form of a profile used in per-resume prompts"""
+    lines = []
+    if profile['title']:
+        lines.append(f"Role: {profile['title']}")
+    if profile['seniority']:
+        lines.append(f"Seniority: {profile['seniority']}")
+    if profile['min_years_experience'] is not None:
+        lines.append(f"Minimum experience: {profile['min_years_experience']:g} years")
+    if profile['education']:
+        lines.append(f"Education: {profile['education']}")
+    lines.append(f"Required skills: {', '.join(profile['required_skills']) or 'none listed'}")
+    lines.append(f"Nice-to-have skills: {', '.join(profile['nice_to_have_skills']) or 'none listed'}")
+    return '\n'.join(lines)
+
+
+def add_embeddings(profile: Dict, job_description: str, vector_store) -> Dict:
+    """Attach the job embedding and one embedding per profile skill"""
+    skills = profile['required_skills'] + profile['nice_to_have_skills']
+    profile['job_embedding'] = vector_store.embed([job_description])[0]
+    profile['skill_embeddings'] = (
+        vector_store.embed(skills) if skills
+        else np.empty((0, len(profile['job_embedding'])), dtype=np.float32)
+    )
+    return profile
+
+
+def _mentions(text: str, skill: str) -> bool:
+    """Whether a skill name appears in lowercased text as whole words"""
+    return re.search(r'(?<!\w)' + re.escape(skill.lower()) + r'(?!\w)', text) is not None
+
+
+def match_skills(resume_texts: List[str], profile: Dict, vector_store) -> List[Dict]:
+    """
+    Match resumes against the skills of a job profile, without the LLM
+    
+    A skill counts as present when the resume mentions it or one of its
+    taxonomy aliases (see skill_matcher), or when its embedding is at least
+    config.JOB_PROFILE_SKILL_THRESHOLD similar to one of the resume's chunks.
+    
+    Args:
+        resume_texts: List of resume texts
+        profile: Compiled job profile (with skill embeddings)
+        vector_store: VectorStore used to embed resume chunks
+        
+    Returns:
+        List of dictionaries (one per resume) containing:
+        - matched_skills / missing_skills: Required skills found / not found
+        - nice_to_have_matched: Nice-to-have skills found
+        - required_coverage: Fraction of required skills found (1.0 if none are required)
+    """
+    skills = profile['required_skills'] + profile['nice_to_have_skills']
+    n_required = len(profile['required_skills'])
+    if not resume_texts:
+        return []
+    
+    if skills and len(profile['skill_embeddings']):
+        chunk_embeddings, parent_index = vector_store.embed_resumes(resume_texts)
+        similarity = aggregate_chunk_scores(
+            chunk_embeddings @ profile['skill_embeddings'].T, parent_index, len(resume_texts), method="max"
+        )
+    else:
+        similarity = np.zeros((len(resume_texts), len(skills)), dtype=np.float32)
+    
+    matcher = get_skill_matcher() if config.SKILL_MATCHING_ENABLED else None
+    canonical = [matcher.canonical(skill) for skill in skills] if matcher else [None] * len(skills)
+    
+    matches = []
+    for i, resume_text in enumerate(resume_texts):
+        text = resume_text.lower()
+        resume_skills = set(matcher.extract(resume_text)) if matcher else set()
+        present = [
+            (canonical[n] is not None and canonical[n] in resume_skills)
+            or _mentions(text, skill)
+            or similarity[i, n] >= config.JOB_PROFILE_SKILL_THRESHOLD
+            for n, skill in enumerate(skills)
+        ]
+        matched = [skill for skill, found in zip(skills[:n_required], present) if found]
+        matches.append({
+            'matched_skills': matched,
+            'missing_skills': [skill for skill, found in zip(skills[:n_required], present) if not found],
+            'nice_to_have_matched': [skill for skill, found in zip(skills[n_required:], present[n_required:]) if found],
+            'required_coverage': len(matched) / n_required if n_required else 1.0
+        })
+    return matches
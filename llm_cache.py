@@ -0,0 +1,124 @@
+"""
+Persistent, content-addressed cache for LLM evaluations
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+import config
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of a text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of LLM evaluation results
+    
+    Entries are keyed by a hash of everything that determines the model's
+    answer, so a hit can be returned without touching the network. Old
+    entries are evicted by age and the table is capped at a maximum size
+    (oldest first).
+    """
+    
+    # Run eviction after this many writes
+    EVICT_EVERY = 500
+    
+    def __init__(self, path: str = None, max_entries: int = None, max_age_days: float = None):
+        self.path = path or config.LLM_CACHE_PATH
+        self.max_entries = max_entries if max_entries is not None else config.LLM_CACHE_MAX_ENTRIES
+        max_age_days = max_age_days if max_age_days is not None else config.LLM_CACHE_MAX_AGE_DAYS
+        self.max_age_seconds = max_age_days * 86400 if max_age_days else None
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS evaluations ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS evaluations_created_at ON evaluations (created_at)"
+        )
+        self._conn.commit()
+        
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self.evict()
+    
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Build a cache key from the parts that determine an evaluation"""
+        return content_hash("\x1f".join(str(part) for part in parts))
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached result for key, or None on a miss"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM evaluations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (
+                self.max_age_seconds and time.time() - row[1] > self.max_age_seconds
+            ):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+    
+    def set(self, key: str, result: Dict):
+        """Store a result under key"""
+        payload = json.dumps(result)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO evaluations (key, result, created_at) VALUES (?, ?, ?)",
+                (key, payload, time.time())
+            )
+            self._conn.commit()
+            self._writes += 1
+            evict_now = self._writes % self.EVICT_EVERY == 0
+        if evict_now:
+            self.evict()
+    
+    def evict(self):
+        """Drop entries older than the max age, then the oldest entries beyond the max size"""
+        with self._lock:
+            if self.max_age_seconds:
+                self._conn.execute(
+                    "DELETE FROM evaluations WHERE created_at < ?",
+                    (time.time() - self.max_age_seconds,)
+                )
+            if self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM evaluations WHERE key IN ("
+                    "SELECT key FROM evaluations ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+    
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM evaluations")
+            self._conn.commit()
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries
+        }
@@ -1,30 +1,25 @@
 """
 LLM-based Resume Evaluation using Gemini
+
+LangChain and the Gemini client are imported on first use, so importing
+this module stays fast.
 """
-from langchain_google_genai import ChatGoogleGenerativeAI
-try:
-    from langchain_core.prompts import ChatPromptTemplate
-except ImportError:
-    from langchain.prompts import ChatPromptTemplate
+import asyncio
+import json
+import re
+import threading
+import time
 import config
-from typing import Dict
+import metrics
+from job_profile import PROFILE_FIELDS, job_hash, normalize_profile, profile_prompt_text
+from llm_cache import LLMCache, content_hash
+from rate_limiter import RateLimiter
+from resilience import LLMUnavailableError, ResilientCaller
+from utils import clean_text, estimate_tokens
+from typing import Dict, List, Optional, Tuple
 
 
-class LLMEvaluator:
-    """Evaluates resume-job description match using Gemini LLM"""
-    
-    def __init__(self):
-        if not config.GEMINI_API_KEY:
-            raise ValueError("GEMINI_API_KEY not found in environment variables. Please set it in .env file.")
-        
-        self.llm = ChatGoogleGenerativeAI(
-            model=config.LLM_MODEL,
-            google_api_key=config.GEMINI_API_KEY,
-            temperature=config.TEMPERATURE
-        )
-        
-        self.evaluation_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert resume screener. Your task is to evaluate how well a candidate's resume matches a job description.
+EVALUATION_SYSTEM_PROMPT = """You are an expert resume screener. Your task is to evaluate how well a candidate's resume matches a job description.
             
             Analyze the following aspects:
             1. Required skills match
@@ -45,71 +40,780 @@ class LLMEvaluator:
                 "reasoning": "<brief explanation>",
                 "matched_skills": ["<skill1>", "<skill2>", ...],
                 "missing_skills": ["<skill1>", "<skill2>", ...]
-            }}"""),
-            ("human", """Job Description:
+            }}"""
+
+EVALUATION_HUMAN_PROMPT = """Job Description:
 {job_description}
 
 Resume:
 {resume_text}
 
-Evaluate the match and provide your assessment.""")
-        ])
+Evaluate the match and provide your assessment."""
+
+PACKED_SYSTEM_PROMPT = """You are an expert resume screener. Your task is to evaluate how well each of several candidates' resumes matches one job description.
+            
+            Evaluate every resume independently on:
+            1. Required skills match
+            2. Experience relevance
+            3. Education and qualifications
+            4. Overall fit for the role
+            
+            Provide a score between 0 and 1 for each resume, where:
+            - 0.9-1.0: Excellent match, highly qualified
+            - 0.7-0.89: Good match, qualified
+            - 0.5-0.69: Moderate match, some qualifications
+            - 0.3-0.49: Weak match, few qualifications
+            - 0.0-0.29: Poor match, not qualified
+            
+            Respond with ONLY a JSON array containing one object per resume:
+            [
+                {{
+                    "id": "<resume id>",
+                    "score": <float between 0 and 1>,
+                    "reasoning": "<brief explanation>",
+                    "matched_skills": ["<skill1>", "<skill2>", ...],
+                    "missing_skills": ["<skill1>", "<skill2>", ...]
+                }},
+                ...
+            ]"""
+
+PACKED_HUMAN_PROMPT = """Job Description:
+{job_description}
+
+Resumes:
+{resumes}
+
+Evaluate each resume against the job description and provide your assessments."""
+
+PROFILE_COMPILE_SYSTEM_PROMPT = """You are an expert technical recruiter. Extract the requirements of a job description.
+            
+            Respond with ONLY a JSON object containing:
+            {{
+                "title": "<job title>",
+                "required_skills": ["<skill1>", "<skill2>", ...],
+                "nice_to_have_skills": ["<skill1>", "<skill2>", ...],
+                "seniority": "<e.g. junior, mid, senior, lead>",
+                "min_years_experience": <number or null>,
+                "education": "<required education, or empty>"
+            }}
+            
+            List skills as short canonical names (e.g. "Python", "Kubernetes", "SQL")."""
+
+PROFILE_COMPILE_HUMAN_PROMPT = """Job Description:
+{job_description}"""
+
+PROFILE_EVALUATION_SYSTEM_PROMPT = """You are an expert resume screener. Score how well a candidate's resume matches a role's requirements.
+            
+            Weigh required skills, experience relevance and seniority, and education.
+            
+            Provide a score between 0 and 1, where:
+            - 0.9-1.0: Excellent match, highly qualified
+            - 0.7-0.89: Good match, qualified
+            - 0.5-0.69: Moderate match, some qualifications
+            - 0.3-0.49: Weak match, few qualifications
+            - 0.0-0.29: Poor match, not qualified
+            
+            Respond with ONLY a JSON object containing:
+            {{
+                "score": <float between 0 and 1>,
+                "reasoning": "<brief explanation>"
+            }}"""
+
+PROFILE_EVALUATION_HUMAN_PROMPT = """Role requirements:
+{profile}
+
+Resume:
+{resume_text}
+
+Evaluate the match and provide your assessment."""
+
+
+def model_identity(llm) -> str:
+    """Identity of an injected chat model for cache keys: class plus model name when it has one"""
+    name = getattr(llm, 'model', None) or getattr(llm, 'model_name', None)
+    identity = f"{type(llm).__module__}.{type(llm).__qualname__}"
+    return f"{identity}:{name}" if isinstance(name, str) else identity
+
+
+class LLMEvaluator:
+    """Evaluates resume-job description match using Gemini LLM"""
+    
+    def __init__(self, llm=None, max_concurrency: int = None,
+                 requests_per_minute: int = None, tokens_per_minute: int = None,
+                 use_cache: bool = None, resilience: ResilientCaller = None):
+        """
+        Args:
+            llm: Chat model to use instead of Gemini (any LangChain chat model,
+                e.g. a local fake model for tests)
+            max_concurrency: Max in-flight requests in evaluate_many (defaults to config.LLM_MAX_CONCURRENCY)
+            requests_per_minute: Request quota (defaults to config.LLM_REQUESTS_PER_MINUTE)
+            tokens_per_minute: Token quota (defaults to config.LLM_TOKENS_PER_MINUTE)
+            use_cache: Cache evaluations on disk (defaults to config.LLM_CACHE_ENABLED)
+            resilience: Timeout/retry/hedging/circuit breaker policy for model requests
+                (defaults to a ResilientCaller configured from config)
+        """
+        if llm is None and not config.GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY not found in environment variables. Please set it in .env file.")
+        # The Gemini client and prompt template are built on first use (see warmup)
+        self._llm = llm
+        # Part of every cache key, so results of an injected model are never served as Gemini's
+        self.model_id = config.LLM_MODEL if llm is None else model_identity(llm)
+        self._evaluation_prompt = None
+        self._init_lock = threading.Lock()
+        self.load_times = {}
+        
+        self.max_concurrency = max_concurrency or config.LLM_MAX_CONCURRENCY
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=requests_per_minute or config.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=tokens_per_minute or config.LLM_TOKENS_PER_MINUTE
+        )
+        
+        self.prompt_hash = content_hash(EVALUATION_SYSTEM_PROMPT + EVALUATION_HUMAN_PROMPT)
+        self.packed_prompt_hash = content_hash(PACKED_SYSTEM_PROMPT + PACKED_HUMAN_PROMPT)
+        self._packed_prompt = None
+        self.profile_compile_prompt_hash = content_hash(PROFILE_COMPILE_SYSTEM_PROMPT + PROFILE_COMPILE_HUMAN_PROMPT)
+        self.profile_prompt_hash = content_hash(PROFILE_EVALUATION_SYSTEM_PROMPT + PROFILE_EVALUATION_HUMAN_PROMPT)
+        self._profile_compile_prompt = None
+        self._profile_prompt = None
+        
+        # Model requests made and their estimated prompt tokens
+        self.stats = {'requests': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                      'packed_requests': 0, 'packed_fallbacks': 0}
+        self._stats_lock = threading.Lock()
+        
+        self.cache = LLMCache() if (config.LLM_CACHE_ENABLED if use_cache is None else use_cache) else None
+        self.resilience = resilience or ResilientCaller()
+    
+    @property
+    def llm(self):
+        """Chat model, created on first use"""
+        if self._llm is None:
+            with self._init_lock:
+                if self._llm is None:
+                    start = time.perf_counter()
+                    from langchain_google_genai import ChatGoogleGenerativeAI
+                    self._llm = ChatGoogleGenerativeAI(
+                        model=config.LLM_MODEL,
+                        google_api_key=config.GEMINI_API_KEY,
+                        temperature=config.TEMPERATURE,
+                        # Retries and timeouts are handled by self.resilience
+                        max_retries=1,
+                        timeout=config.LLM_ATTEMPT_TIMEOUT_SECONDS
+                    )
+                    self.load_times['llm_client'] = time.perf_counter() - start
+        return self._llm
+    
+    @property
+    def evaluation_prompt(self):
+        """Evaluation prompt template, built on first use"""
+        if self._evaluation_prompt is None:
+            with self._init_lock:
+                if self._evaluation_prompt is None:
+                    start = time.perf_counter()
+                    try:
+                        from langchain_core.prompts import ChatPromptTemplate
+                    except ImportError:
+                        from langchain.prompts import ChatPromptTemplate
+                    self._evaluation_prompt = ChatPromptTemplate.from_messages([
+                        ("system", EVALUATION_SYSTEM_PROMPT),
+                        ("human", EVALUATION_HUMAN_PROMPT)
+                    ])
+                    self.load_times['prompt_template'] = time.perf_counter() - start
+        return self._evaluation_prompt
+    
+    @staticmethod
+    def _make_prompt(system_prompt: str, human_prompt: str):
+        try:
+            from langchain_core.prompts import ChatPromptTemplate
+        except ImportError:
+            from langchain.prompts import ChatPromptTemplate
+        return ChatPromptTemplate.from_messages([("system", system_prompt), ("human", human_prompt)])
+    
+    @property
+    def packed_prompt(self):
+        """Packed (several resumes per request) prompt template, built on first use"""
+        if self._packed_prompt is None:
+            with self._init_lock:
+                if self._packed_prompt is None:
+                    self._packed_prompt = self._make_prompt(PACKED_SYSTEM_PROMPT, PACKED_HUMAN_PROMPT)
+        return self._packed_prompt
+    
+    @property
+    def profile_compile_prompt(self):
+        """Job description compilation prompt template, built on first use"""
+        if self._profile_compile_prompt is None:
+            with self._init_lock:
+                if self._profile_compile_prompt is None:
+                    self._profile_compile_prompt = self._make_prompt(
+                        PROFILE_COMPILE_SYSTEM_PROMPT, PROFILE_COMPILE_HUMAN_PROMPT
+                    )
+        return self._profile_compile_prompt
+    
+    @property
+    def profile_prompt(self):
+        """Per-resume prompt template for compiled job profiles, built on first use"""
+        if self._profile_prompt is None:
+            with self._init_lock:
+                if self._profile_prompt is None:
+                    self._profile_prompt = self._make_prompt(
+                        PROFILE_EVALUATION_SYSTEM_PROMPT, PROFILE_EVALUATION_HUMAN_PROMPT
+                    )
+        return self._profile_prompt
+    
+    def _count(self, **amounts):
+        """Increment counters in self.stats"""
+        with self._stats_lock:
+            for name, amount in amounts.items():
+                self.stats[name] += amount
+    
+    def get_stats(self) -> Dict:
+        """Counters for model requests and prompt/completion tokens"""
+        with self._stats_lock:
+            return dict(self.stats)
+    
+    def _invoke(self, messages):
+        """
+        Call the model, recording latency and token usage
+        
+        Waits for the rate limiter like the async path; timeouts, retries,
+        hedging and the circuit breaker are applied by self.resilience, which
+        raises LLMUnavailableError when it gives up.
+        """
+        prompt_tokens = sum(estimate_tokens(message.content) for message in messages)
+        reserved_tokens = prompt_tokens + config.LLM_COMPLETION_TOKEN_ESTIMATE
+        llm = self.llm
+        self.rate_limiter.acquire_blocking(reserved_tokens)
+        with metrics.span('llm_call'):
+            response = self.resilience.call(
+                lambda: llm.invoke(messages),
+                before_retry=lambda: self.rate_limiter.acquire_blocking(reserved_tokens),
+                can_hedge=lambda: self.rate_limiter.try_acquire(reserved_tokens)
+            )
+        self._record_usage(response, prompt_tokens)
+        return response
     
-    def evaluate_match(self, resume_text: str, job_description: str) -> Dict:
+    async def _ainvoke(self, messages, prompt_tokens: int, reserved_tokens: int = None):
+        """
+        Async version of _invoke
+        
+        Args:
+            messages: Prompt messages
+            prompt_tokens: Estimated prompt tokens
+            reserved_tokens: Tokens taken from the rate limiter for every retry or
+                hedged request (defaults to prompt_tokens plus one completion)
+        """
+        if reserved_tokens is None:
+            reserved_tokens = prompt_tokens + config.LLM_COMPLETION_TOKEN_ESTIMATE
+        llm = self.llm
+        with metrics.span('llm_call'):
+            response = await self.resilience.acall(
+                lambda: llm.ainvoke(messages),
+                before_retry=lambda: self.rate_limiter.acquire(reserved_tokens),
+                can_hedge=lambda: self.rate_limiter.try_acquire(reserved_tokens)
+            )
+        self._record_usage(response, prompt_tokens)
+        return response
+    
+    def _record_usage(self, response, prompt_tokens: int):
+        """
+        Count a request and its tokens
+        
+        Uses the usage metadata reported by the model when available and
+        falls back to estimates from the text otherwise.
+        """
+        usage = getattr(response, 'usage_metadata', None) or {}
+        prompt_tokens = usage.get('input_tokens') or prompt_tokens
+        completion_tokens = usage.get('output_tokens') or estimate_tokens(response.content)
+        self._count(requests=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        metrics.count('llm_requests')
+        metrics.count('llm_tokens', prompt_tokens, kind='prompt')
+        metrics.count('llm_tokens', completion_tokens, kind='completion')
+    
+    def _cache_lookup(self, cache_key: str) -> Optional[Dict]:
+        """Cached result for cache_key, counting hits and misses"""
+        cached = self.cache.get(cache_key)
+        metrics.count('llm_cache', result='miss' if cached is None else 'hit')
+        return cached
+    
+    def warmup(self):
+        """Create the chat model and prompt template now instead of on first use"""
+        self.llm
+        self.evaluation_prompt
+        return dict(self.load_times)
+    
+    def evaluate_match(self, resume_text: str, job_description: str,
+                       bypass_cache: bool = False) -> Dict:
         """
         Evaluate resume-job description match using LLM
         Returns a dictionary with score and reasoning
+        
+        Results are served from the evaluation cache when possible. With
+        bypass_cache=True the model is always called and the cache refreshed.
         """
+        cache_key = self._cache_key(resume_text, job_description)
+        if cache_key and not bypass_cache:
+            cached = self._cache_lookup(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
             messages = self.evaluation_prompt.format_messages(
                 job_description=job_description,
                 resume_text=resume_text
             )
             
-            response = self.llm.invoke(messages)
+            response = self._invoke(messages)
             
-            # Parse the response
-            response_text = response.content.strip()
+            result, parsed = self._parse_response(response.content.strip())
+        
+        except Exception as e:
+            return self._error_result(e)
+        
+        if cache_key and parsed:
+            self.cache.set(cache_key, result)
+        return result
+    
+    async def evaluate_match_async(self, resume_text: str, job_description: str,
+                                   bypass_cache: bool = False) -> Dict:
+        """
+        Async version of evaluate_match
+        
+        Waits for room in the requests/tokens-per-minute quota before calling
+        the model, so many evaluations can be in flight at once.
+        """
+        cache_key = self._cache_key(resume_text, job_description)
+        if cache_key and not bypass_cache:
+            cached = self._cache_lookup(cache_key)
+            if cached is not None:
+                return cached
+        
+        try:
+            messages = self.evaluation_prompt.format_messages(
+                job_description=job_description,
+                resume_text=resume_text
+            )
             
-            # Try to extract JSON from response
-            import json
-            import re
+            prompt_tokens = sum(estimate_tokens(message.content) for message in messages)
+            await self.rate_limiter.acquire(prompt_tokens + config.LLM_COMPLETION_TOKEN_ESTIMATE)
             
-            # Find JSON in the response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                return {
-                    'score': float(result.get('score', 0.0)),
-                    'reasoning': result.get('reasoning', ''),
-                    'matched_skills': result.get('matched_skills', []),
-                    'missing_skills': result.get('missing_skills', [])
-                }
+            response = await self._ainvoke(messages, prompt_tokens)
+            
+            result, parsed = self._parse_response(response.content.strip())
+        
+        except Exception as e:
+            return self._error_result(e)
+        
+        if cache_key and parsed:
+            self.cache.set(cache_key, result)
+        return result
+    
+    def compile_job_profile(self, job_description: str, bypass_cache: bool = False) -> Optional[Dict]:
+        """
+        Extract a requirements profile from a job description with one LLM call
+        
+        Profiles are cached by job description hash, so each job description
+        is sent to the model once.
+        
+        Returns:
+            Dictionary with 'job_hash' and the PROFILE_FIELDS, or None if the
+            model call or parsing fails
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = LLMCache.make_key(
+                'job_profile', job_hash(job_description), self.model_id,
+                config.TEMPERATURE, self.profile_compile_prompt_hash
+            )
+            if not bypass_cache:
+                cached = self._cache_lookup(cache_key)
+                if cached is not None:
+                    return cached
+        
+        try:
+            messages = self.profile_compile_prompt.format_messages(job_description=job_description)
+            response = self._invoke(messages)
+            
+            with metrics.span('llm_parse'):
+                json_match = re.search(r'\{.*\}', response.content.strip(), re.DOTALL)
+                profile = normalize_profile(json.loads(json_match.group()))
+        
+        except Exception as e:
+            if isinstance(e, LLMUnavailableError) and not config.LLM_DEGRADE_ON_FAILURE:
+                raise
+            print(f"Error compiling job description: {str(e)}")
+            return None
+        
+        profile['job_hash'] = job_hash(job_description)
+        if cache_key:
+            self.cache.set(cache_key, profile)
+        return profile
+    
+    def _profile_messages(self, resume_text: str, profile: Dict):
+        return self.profile_prompt.format_messages(
+            profile=profile_prompt_text(profile),
+            resume_text=resume_text
+        )
+    
+    def _profile_cache_key(self, resume_text: str, profile: Dict) -> str:
+        """Cache key for a profile-based evaluation, or None when caching is disabled"""
+        if self.cache is None:
+            return None
+        return LLMCache.make_key(
+            content_hash(clean_text(resume_text)),
+            content_hash(json.dumps({field: profile[field] for field in PROFILE_FIELDS}, sort_keys=True)),
+            self.model_id,
+            config.TEMPERATURE,
+            self.profile_prompt_hash
+        )
+    
+    def evaluate_with_profile(self, resume_text: str, profile: Dict,
+                              bypass_cache: bool = False) -> Dict:
+        """
+        Evaluate a resume against a compiled job profile
+        
+        The prompt carries the compact profile instead of the job description
+        and asks only for a score and reasoning; skills are matched locally
+        (see job_profile.match_skills).
+        """
+        cache_key = self._profile_cache_key(resume_text, profile)
+        if cache_key and not bypass_cache:
+            cached = self._cache_lookup(cache_key)
+            if cached is not None:
+                return cached
+        
+        try:
+            messages = self._profile_messages(resume_text, profile)
+            response = self._invoke(messages)
+            result, parsed = self._parse_response(response.content.strip())
+        
+        except Exception as e:
+            return self._error_result(e)
+        
+        if cache_key and parsed:
+            self.cache.set(cache_key, result)
+        return result
+    
+    async def evaluate_with_profile_async(self, resume_text: str, profile: Dict,
+                                          bypass_cache: bool = False) -> Dict:
+        """Async version of evaluate_with_profile (waits for rate limits like evaluate_match_async)"""
+        cache_key = self._profile_cache_key(resume_text, profile)
+        if cache_key and not bypass_cache:
+            cached = self._cache_lookup(cache_key)
+            if cached is not None:
+                return cached
+        
+        try:
+            messages = self._profile_messages(resume_text, profile)
+            
+            prompt_tokens = sum(estimate_tokens(message.content) for message in messages)
+            await self.rate_limiter.acquire(prompt_tokens + config.LLM_COMPLETION_TOKEN_ESTIMATE)
+            
+            response = await self._ainvoke(messages, prompt_tokens)
+            
+            result, parsed = self._parse_response(response.content.strip())
+        
+        except Exception as e:
+            return self._error_result(e)
+        
+        if cache_key and parsed:
+            self.cache.set(cache_key, result)
+        return result
+    
+    async def evaluate_many(self, pairs: List[Tuple[str, str]], max_concurrency: int = None,
+                            bypass_cache: bool = False, packed: bool = None,
+                            profiles: Dict[str, Dict] = None) -> List[Dict]:
+        """
+        Evaluate many (resume_text, job_description) pairs concurrently
+        
+        Args:
+            pairs: List of (resume_text, job_description) tuples
+            max_concurrency: Max in-flight requests (defaults to self.max_concurrency)
+            bypass_cache: Always call the model and refresh the cache
+            packed: Evaluate several resumes for the same job description per
+                request (defaults to config.LLM_PACKED_EVALUATION)
+            profiles: Compiled job profiles by job description; pairs whose job
+                description has one are evaluated with evaluate_with_profile
+        
+        Returns:
+            List of evaluation results, in the same order as pairs
+        """
+        if packed is None:
+            packed = config.LLM_PACKED_EVALUATION
+        profiles = profiles or {}
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        
+        async def evaluate(resume_text: str, job_description: str) -> Dict:
+            async with semaphore:
+                if job_description in profiles:
+                    return await self.evaluate_with_profile_async(
+                        resume_text, profiles[job_description], bypass_cache=bypass_cache
+                    )
+                return await self.evaluate_match_async(
+                    resume_text, job_description, bypass_cache=bypass_cache
+                )
+        
+        if not packed:
+            return await asyncio.gather(*[
+                evaluate(resume_text, job_description) for resume_text, job_description in pairs
+            ])
+        
+        # Packed requests per job description; profile-based pairs stay single
+        results = [None] * len(pairs)
+        groups = {}
+        singles = []
+        for i, (resume_text, job_description) in enumerate(pairs):
+            if job_description in profiles:
+                singles.append(i)
             else:
-                # Fallback: try to extract score from text
-                score_match = re.search(r'"score":\s*([0-9.]+)', response_text)
-                if score_match:
-                    score = float(score_match.group(1))
-                    return {
-                        'score': score,
-                        'reasoning': response_text,
-                        'matched_skills': [],
-                        'missing_skills': []
-                    }
-                else:
-                    # Default fallback
-                    return {
-                        'score': 0.5,
-                        'reasoning': response_text,
-                        'matched_skills': [],
-                        'missing_skills': []
-                    }
+                groups.setdefault(job_description, []).append(i)
+        
+        async def evaluate_single(i: int):
+            results[i] = await evaluate(*pairs[i])
+        
+        async def evaluate_group(job_description: str, indices: List[int]):
+            group_results = await self._evaluate_packed(
+                [pairs[i][0] for i in indices], job_description, semaphore, bypass_cache
+            )
+            for i, result in zip(indices, group_results):
+                results[i] = result
+        
+        await asyncio.gather(
+            *[evaluate_group(job_description, indices) for job_description, indices in groups.items()],
+            *[evaluate_single(i) for i in singles]
+        )
+        return results
+    
+    async def evaluate_packed(self, resume_texts: List[str], job_description: str,
+                              max_concurrency: int = None, bypass_cache: bool = False) -> List[Dict]:
+        """
+        Evaluate many resumes against one job description, several per request
+        
+        The job description and instructions are sent once per request
+        together with as many resumes as fit in config.LLM_PACKED_TOKEN_BUDGET
+        (at most config.LLM_PACKED_MAX_RESUMES). Resumes missing from a reply,
+        or whose entry cannot be parsed, are re-evaluated one at a time.
+        
+        Args:
+            resume_texts: List of resume texts
+            job_description: The job description text
+            max_concurrency: Max in-flight requests (defaults to self.max_concurrency)
+            bypass_cache: Always call the model and refresh the cache
+        
+        Returns:
+            List of evaluation results, in the same order as resume_texts
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        return await self._evaluate_packed(resume_texts, job_description, semaphore, bypass_cache)
+    
+    async def _evaluate_packed(self, resume_texts: List[str], job_description: str,
+                               semaphore: asyncio.Semaphore, bypass_cache: bool) -> List[Dict]:
+        results = [None] * len(resume_texts)
+        cache_keys = [self._cache_key(text, job_description, self.packed_prompt_hash) for text in resume_texts]
+        if not bypass_cache:
+            for i, cache_key in enumerate(cache_keys):
+                if cache_key:
+                    # Single evaluations (e.g. earlier fallbacks) are as good as packed ones
+                    results[i] = self.cache.get(cache_key) or self.cache.get(
+                        self._cache_key(resume_texts[i], job_description)
+                    )
+                    metrics.count('llm_cache', result='miss' if results[i] is None else 'hit')
+        
+        pending = [i for i, result in enumerate(results) if result is None]
+        
+        async def evaluate_pack(indices: List[int]):
+            async with semaphore:
+                if len(indices) == 1:
+                    results[indices[0]] = await self.evaluate_match_async(
+                        resume_texts[indices[0]], job_description, bypass_cache=bypass_cache
+                    )
+                    return
+                parsed = await self._request_packed([resume_texts[i] for i in indices], job_description)
+            
+            retry = []
+            for n, i in enumerate(indices):
+                result = parsed.get(n)
+                if result is None:
+                    retry.append(i)
+                    continue
+                results[i] = result
+                if cache_keys[i]:
+                    self.cache.set(cache_keys[i], result)
+            
+            if retry:
+                self._count(packed_fallbacks=len(retry))
+                metrics.count('llm_parse', len(retry), path='packed_fallback')
+                for i in retry:
+                    async with semaphore:
+                        results[i] = await self.evaluate_match_async(
+                            resume_texts[i], job_description, bypass_cache=bypass_cache
+                        )
+        
+        await asyncio.gather(*[
+            evaluate_pack(indices) for indices in self._pack(
+                [resume_texts[i] for i in pending], job_description, pending
+            )
+        ])
+        return results
+    
+    def _pack(self, resume_texts: List[str], job_description: str, indices: List[int]) -> List[List[int]]:
+        """Greedily group resumes into requests that fit the packed token budget"""
+        overhead = estimate_tokens(PACKED_SYSTEM_PROMPT + PACKED_HUMAN_PROMPT + job_description)
+        budget = config.LLM_PACKED_TOKEN_BUDGET - overhead
+        max_resumes = config.LLM_PACKED_MAX_RESUMES
+        
+        packs, current, used = [], [], 0
+        for index, resume_text in zip(indices, resume_texts):
+            tokens = estimate_tokens(resume_text) + config.LLM_COMPLETION_TOKEN_ESTIMATE
+            if current and (used + tokens > budget or len(current) >= max_resumes):
+                packs.append(current)
+                current, used = [], 0
+            current.append(index)
+            used += tokens
+        if current:
+            packs.append(current)
+        return packs
+    
+    async def _request_packed(self, resume_texts: List[str], job_description: str) -> Dict[int, Dict]:
+        """
+        Send one packed request
+        
+        Returns:
+            Parsed results by position in resume_texts (positions that could
+            not be parsed are missing)
+        """
+        resumes = "\n\n".join(
+            f'<resume id="R{n + 1}">\n{text}\n</resume>' for n, text in enumerate(resume_texts)
+        )
+        try:
+            messages = self.packed_prompt.format_messages(
+                job_description=job_description,
+                resumes=resumes
+            )
+            
+            prompt_tokens = sum(estimate_tokens(message.content) for message in messages)
+            reserved_tokens = prompt_tokens + config.LLM_COMPLETION_TOKEN_ESTIMATE * len(resume_texts)
+            await self.rate_limiter.acquire(reserved_tokens)
+            
+            self._count(packed_requests=1)
+            response = await self._ainvoke(messages, prompt_tokens, reserved_tokens)
         
         except Exception as e:
-            print(f"Error in LLM evaluation: {str(e)}")
+            if isinstance(e, LLMUnavailableError) and not config.LLM_DEGRADE_ON_FAILURE:
+                raise
+            print(f"Error in packed LLM evaluation: {str(e)}")
+            return {}
+        
+        parsed = self._parse_packed_response(response.content.strip())
+        return {
+            n: parsed[f"R{n + 1}"] for n in range(len(resume_texts)) if f"R{n + 1}" in parsed
+        }
+    
+    def _cache_key(self, resume_text: str, job_description: str, prompt_hash: str = None) -> str:
+        """Cache key for an evaluation, or None when caching is disabled"""
+        if self.cache is None:
+            return None
+        return LLMCache.make_key(
+            content_hash(clean_text(resume_text)),
+            content_hash(clean_text(job_description)),
+            self.model_id,
+            config.TEMPERATURE,
+            prompt_hash or self.prompt_hash
+        )
+    
+    def _result_from_json(self, result: Dict) -> Dict:
+        """Evaluation result from a parsed JSON object"""
+        return {
+            'score': float(result.get('score', 0.0)),
+            'reasoning': result.get('reasoning', ''),
+            'matched_skills': result.get('matched_skills', []),
+            'missing_skills': result.get('missing_skills', [])
+        }
+    
+    def _parse_packed_response(self, response_text: str) -> Dict[str, Dict]:
+        """
+        Parse a packed reply into evaluation results keyed by resume id
+        
+        If the array as a whole is not valid JSON, each object in it is
+        parsed on its own so one malformed entry does not lose the others.
+        """
+        with metrics.span('llm_parse'):
+            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
+            try:
+                entries = json.loads(json_match.group()) if json_match else []
+                metrics.count('llm_parse', path='packed_json')
+            except ValueError:
+                metrics.count('llm_parse', path='packed_objects')
+                entries = []
+                for obj_match in re.finditer(r'\{[^{}]*\}', response_text):
+                    try:
+                        entries.append(json.loads(obj_match.group()))
+                    except ValueError:
+                        continue
+            
+            results = {}
+            for entry in entries:
+                if not isinstance(entry, dict) or 'id' not in entry or 'score' not in entry:
+                    continue
+                try:
+                    results[str(entry['id'])] = self._result_from_json(entry)
+                except (TypeError, ValueError):
+                    continue
+            return results
+    
+    def _parse_response(self, response_text: str) -> Tuple[Dict, bool]:
+        """
+        Parse the model's reply into an evaluation result
+        
+        Returns:
+            Tuple of (result, whether it was parsed from JSON); results of the
+            text fallbacks are not worth caching
+        """
+        with metrics.span('llm_parse'):
+            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+            if json_match:
+                metrics.count('llm_parse', path='json')
+                return self._result_from_json(json.loads(json_match.group())), True
+            return self._parse_response_text(response_text), False
+    
+    def _parse_response_text(self, response_text: str) -> Dict:
+        """Best-effort result from a reply without a JSON object"""
+        score_match = re.search(r'"score":\s*([0-9.]+)', response_text)
+        if score_match:
+            metrics.count('llm_parse', path='score_regex')
+            score = float(score_match.group(1))
             return {
-                'score': 0.0,
-                'reasoning': f'Error: {str(e)}',
+                'score': score,
+                'reasoning': response_text,
                 'matched_skills': [],
                 'missing_skills': []
             }
+        else:
+            # Default fallback
+            metrics.count('llm_parse', path='default')
+            return {
+                'score': 0.5,
+                'reasoning': response_text,
+                'matched_skills': [],
+                'missing_skills': []
+            }
+    
+    def _error_result(self, error: Exception) -> Dict:
+        """
+        Result returned when the evaluation fails
+        
+        The score is None so callers can fall back to a semantic-only score
+        instead of ranking the candidate as a 0. With
+        config.LLM_DEGRADE_ON_FAILURE = False an unavailable model is raised
+        as LLMUnavailableError instead.
+        """
+        if isinstance(error, LLMUnavailableError) and not config.LLM_DEGRADE_ON_FAILURE:
+            raise error
+        metrics.count('llm_errors')
+        print(f"Error in LLM evaluation: {str(error)}")
+        return {
+            'score': None,
+            'reasoning': f'Error: {str(error)}',
+            'matched_skills': [],
+            'missing_skills': [],
+            'error': str(error)
+        }
@@ -1,17 +1,32 @@
 """
 Main script for AI Resume Screener
+
+Pipeline modules are imported inside each command so that `--help` and
+lightweight commands do not pay for loading torch, chromadb or LangChain.
 """
-from rag_pipeline import RAGResumeScreener
+import argparse
 import json
+import os
 import sys
+import time
 
 
-def main():
-    """Main function for AI Resume Screener"""
+def print_load_times(load_times):
+    """Print component load times reported by warmup()"""
+    print("\n[WARMUP]")
+    for component, seconds in load_times.items():
+        print(f"  {component}: {seconds:.2f}s")
+
+
+def screen_interactive(warmup: bool = False):
+    """Screen one resume against one job description entered at the prompt"""
+    from rag_pipeline import RAGResumeScreener
     
     # Initialize the RAG pipeline
     print("Initializing AI Resume Screener...")
     screener = RAGResumeScreener()
+    if warmup:
+        print_load_times(screener.warmup())
     
     # Get job description
     print("\nEnter job description (press Enter twice to finish):")
@@ -63,7 +78,14 @@ def main():
     
     print(f"\n[SCORE BREAKDOWN]")
     print(f"  Semantic Search Score: {result['semantic_score']:.1%} (Weight: {result['weights']['semantic_search']})")
-    print(f"  LLM Evaluation Score: {result['llm_score']:.1%} (Weight: {result['weights']['llm']})")
+    if result['llm_skipped']:
+        print(f"  LLM Evaluation Score: skipped (Weight: {result['weights']['llm']})")
+    elif result.get('llm_degraded'):
+        print(f"  LLM Evaluation Score: unavailable, final score is semantic-only (Weight: {result['weights']['llm']})")
+    else:
+        print(f"  LLM Evaluation Score: {result['llm_score']:.1%} (Weight: {result['weights']['llm']})")
+    if result.get('skill_score') is not None:
+        print(f"  Skill Overlap: {result['skill_score']:.1%} (Weight: {result['weights'].get('skill_match', 0)})")
     
     if result['llm_details'].get('reasoning'):
         print(f"\n[LLM REASONING]")
@@ -79,6 +101,11 @@ def main():
         for skill in result['llm_details']['missing_skills']:
             print(f"  - {skill}")
     
+    if result.get('timings'):
+        print("\n[TIMINGS]")
+        for stage, seconds in result['timings'].items():
+            print(f"  {stage}: {seconds:.3f}s")
+    
     print("\n" + "="*60)
     
     # Save results to JSON
@@ -89,5 +116,213 @@ def main():
     print(f"\n[SUCCESS] Results saved to '{output_file}'")
 
 
+def run_ingest(args):
+    """Bulk-load a directory of resumes into the vector store"""
+    from ingest import ingest_directory
+    from vector_store import VectorStore
+    
+    vector_store = VectorStore()
+    if args.warmup:
+        print_load_times(vector_store.warmup())
+    
+    summary = ingest_directory(
+        args.directory,
+        vector_store=vector_store,
+        workers=args.workers,
+        embed_batch=args.embed_batch,
+        add_batch_size=args.add_batch_size,
+        checkpoint_path=args.checkpoint
+    )
+    
+    print("\n[INGEST SUMMARY]")
+    print(f"  Files ingested: {summary['files_ingested']}")
+    print(f"  Files failed: {summary['files_failed']}")
+    print(f"  Files truncated (page/character limits): {summary['files_truncated']}")
+    print(f"  Files skipped (checkpoint): {summary['files_skipped']}")
+    print(f"  Chunks embedded: {summary['chunks_embedded']}")
+    print(f"  Duplicates collapsed: {summary['duplicates_collapsed']}")
+    print(f"  Elapsed: {summary['elapsed_seconds']:.1f}s")
+    print(f"  Throughput: {summary['files_per_second']:.1f} files/sec, "
+          f"{summary['embeds_per_second']:.1f} embeds/sec")
+    
+    if summary['duplicates']:
+        print("\n[NEAR-DUPLICATES]")
+        for duplicate in summary['duplicates'][:20]:
+            print(f"  - {duplicate['path']} -> {duplicate['duplicate_of']} "
+                  f"(similarity {duplicate['similarity']:.2f})")
+        if len(summary['duplicates']) > 20:
+            print(f"  ... and {len(summary['duplicates']) - 20} more")
+    
+    if summary['errors']:
+        print("\n[FAILED FILES]")
+        for failure in summary['errors'][:20]:
+            print(f"  - {failure['path']}: {failure['error']}")
+        if len(summary['errors']) > 20:
+            print(f"  ... and {len(summary['errors']) - 20} more")
+
+
+def run_enqueue(args):
+    """Queue a batch screening of a directory of resumes (or a JSONL file)"""
+    from ingest import find_resume_files, resume_id_for
+    from work_queue import WorkQueue
+    
+    with open(args.job, 'r', encoding='utf-8') as f:
+        job_description = f.read()
+    
+    if os.path.isdir(args.resumes):
+        resumes = [
+            {'id': resume_id_for(path, args.resumes), 'path': path}
+            for path in find_resume_files(args.resumes)
+        ]
+    else:
+        # JSON lines with 'id' and 'text'
+        with open(args.resumes, 'r', encoding='utf-8') as f:
+            resumes = [json.loads(line) for line in f if line.strip()]
+        seen, unique = set(), []
+        for resume in resumes:
+            if str(resume['id']) in seen:
+                print(f"Warning: duplicate resume id '{resume['id']}', only the first one is queued")
+                continue
+            seen.add(str(resume['id']))
+            unique.append(resume)
+        resumes = unique
+    
+    options = {}
+    if args.bounded:
+        options['bounded'] = True
+    if args.min_score is not None:
+        options['min_score'] = args.min_score
+    if args.packed:
+        options['packed'] = True
+    
+    queued = WorkQueue(args.queue).enqueue(resumes, job_description, batch_id=args.batch_id, options=options)
+    print(f"Batch {queued['batch_id']}: {queued['added']} resumes added ({queued['total']} in total, "
+          f"{queued['duplicates']} near-duplicates linked to an earlier copy)")
+    if queued['skipped']:
+        print(f"  {queued['skipped']} resume id(s) were already in the batch and were left as they are")
+    print(f"Run `python main.py worker -n {os.cpu_count()}` to process it")
+
+
+def run_worker_pool(args):
+    """Process queued screening tasks with N worker processes"""
+    from work_queue import WorkQueue, run_workers
+    
+    print(f"Starting {args.n or os.cpu_count()} worker(s)...")
+    start = time.perf_counter()
+    run_workers(args.n, queue_path=args.queue, batch_id=args.batch_id, exit_when_empty=not args.forever)
+    print(f"Workers finished in {time.perf_counter() - start:.1f}s")
+    print_queue_status(WorkQueue(args.queue).status(args.batch_id))
+
+
+def print_queue_status(batches):
+    if not batches:
+        print("No batches queued")
+    for batch in batches:
+        eta = f", ETA {batch['eta_seconds']}s" if batch['eta_seconds'] is not None else ""
+        print(f"\n[BATCH {batch['batch_id']}] {batch['progress']:.1%} complete")
+        print(f"  Done: {batch['done']}  Failed: {batch['failed']}  "
+              f"In progress: {batch['leased']}  Pending: {batch['pending']}  Total: {batch['total']}")
+        if batch['duplicates']:
+            print(f"  Near-duplicates: {batch['duplicates']} ({batch['waiting']} waiting for their first copy)")
+        print(f"  Throughput: {batch['tasks_per_second']:.2f} resumes/sec overall, "
+              f"{batch['recent_tasks_per_second']:.2f} in the last minute{eta}")
+
+
+def run_status(args):
+    """Show queue progress, optionally exporting a batch's results"""
+    from work_queue import WorkQueue
+    
+    work_queue = WorkQueue(args.queue)
+    if args.retry_failed:
+        print(f"Reset {work_queue.retry_failed(args.batch_id)} failed task(s)")
+    print_queue_status(work_queue.status(args.batch_id))
+    if args.export:
+        if not args.batch_id:
+            print("Error: --export needs a batch id")
+            sys.exit(1)
+        with open(args.export, 'w') as f:
+            json.dump(work_queue.results(args.batch_id), f, indent=2)
+        print(f"\n[SUCCESS] Results saved to '{args.export}'")
+
+
+def main():
+    """Main function for AI Resume Screener"""
+    parser = argparse.ArgumentParser(description="AI Resume Screener")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Load the embedding model and clients before running the command")
+    parser.add_argument("--metrics", default=None, metavar="FILE",
+                        help="Write stage timings and counters on exit (.prom for Prometheus text, else JSON)")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    subparsers.add_parser("screen", help="Screen one resume interactively (default)")
+    
+    ingest_parser = subparsers.add_parser("ingest", help="Bulk-load a directory of PDF/TXT resumes")
+    ingest_parser.add_argument("directory", help="Directory containing resume files")
+    ingest_parser.add_argument("--workers", type=int, default=None,
+                               help="Text extraction processes (default: one per CPU)")
+    ingest_parser.add_argument("--embed-batch", type=int, default=None,
+                               help="Resumes embedded per batch")
+    ingest_parser.add_argument("--add-batch-size", type=int, default=None,
+                               help="Entries per collection.add call")
+    ingest_parser.add_argument("--checkpoint", default=None,
+                               help="Checkpoint file used to resume interrupted runs")
+    
+    enqueue_parser = subparsers.add_parser("enqueue", help="Queue a batch screening for the worker pool")
+    enqueue_parser.add_argument("resumes", help="Directory of PDF/TXT resumes, or a JSONL file of {id, text}")
+    enqueue_parser.add_argument("--job", required=True, help="Text file with the job description")
+    enqueue_parser.add_argument("--batch-id", default=None,
+                                help="Batch to create or extend (re-running adds only new resumes)")
+    enqueue_parser.add_argument("--bounded", action="store_true", help="Use bounded evaluation")
+    enqueue_parser.add_argument("--min-score", type=float, default=None,
+                                help="Skip the LLM for resumes that cannot reach this score")
+    enqueue_parser.add_argument("--packed", action="store_true", help="Send several resumes per LLM request")
+    enqueue_parser.add_argument("--queue", default=None, help="Queue database (default: config.WORK_QUEUE_PATH)")
+    
+    worker_parser = subparsers.add_parser("worker", help="Process queued screenings with N worker processes")
+    worker_parser.add_argument("-n", type=int, default=None, help="Worker processes (default: one per CPU)")
+    worker_parser.add_argument("--batch-id", default=None, help="Only process this batch")
+    worker_parser.add_argument("--forever", action="store_true",
+                               help="Keep polling for new batches instead of exiting when the queue is empty")
+    worker_parser.add_argument("--queue", default=None, help="Queue database (default: config.WORK_QUEUE_PATH)")
+    
+    status_parser = subparsers.add_parser("status", help="Show progress and throughput of queued batches")
+    status_parser.add_argument("batch_id", nargs="?", default=None, help="Batch to show (default: all)")
+    status_parser.add_argument("--export", default=None, metavar="FILE",
+                               help="Write the batch's finished results to a JSON file")
+    status_parser.add_argument("--retry-failed", action="store_true",
+                               help="Give failed tasks a fresh set of attempts")
+    status_parser.add_argument("--queue", default=None, help="Queue database (default: config.WORK_QUEUE_PATH)")
+    
+    serve_parser = subparsers.add_parser("serve", help="Run the HTTP screening service")
+    serve_parser.add_argument("--host", default=None, help="Bind address (default: config.SERVER_HOST)")
+    serve_parser.add_argument("--port", type=int, default=None, help="Port (default: config.SERVER_PORT)")
+    serve_parser.add_argument("--workers", type=int, default=None,
+                              help="Screening calls run at once (default: config.SERVER_WORKERS)")
+    serve_parser.add_argument("--max-queue", type=int, default=None,
+                              help="Admitted requests before the server answers 503")
+    
+    args = parser.parse_args()
+    
+    try:
+        if args.command == "ingest":
+            run_ingest(args)
+        elif args.command == "enqueue":
+            run_enqueue(args)
+        elif args.command == "worker":
+            run_worker_pool(args)
+        elif args.command == "status":
+            run_status(args)
+        elif args.command == "serve":
+            from server import serve
+            serve(args.host, args.port, args.workers, args.max_queue)
+        else:
+            screen_interactive(warmup=args.warmup)
+    finally:
+        if args.metrics:
+            import metrics
+            metrics.dump(args.metrics)
+            print(f"\n[METRICS] Written to '{args.metrics}'")
+
+
 if __name__ == "__main__":
     main()
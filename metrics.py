@@ -0,0 +1,275 @@
+"""
+Lightweight per-stage timing and counters for the screening pipeline
+
+Stages are timed with `span(name)` and events counted with `count(name)`.
+Everything is recorded in a process-wide registry, which can be exported as
+Prometheus text or JSON, and stage times are also collected per request
+through `collect_timings()` (a context variable, so concurrent requests and
+asyncio tasks do not mix). With config.METRICS_ENABLED = False, span() and
+count() return immediately.
+"""
+import bisect
+import contextvars
+import functools
+import json
+import threading
+import time
+from typing import Dict, Optional
+import config
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_PREFIX = "resume_screener"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+    
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None when empty)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by name and labels"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+    
+    @staticmethod
+    def _key(name: str, labels: Dict) -> tuple:
+        return (name, tuple(sorted(labels.items())))
+    
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+    
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+    
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+    
+    def to_dict(self) -> Dict:
+        """Snapshot as plain data: counters and histogram summaries"""
+        with self._lock:
+            return {
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                'histograms': [
+                    {'name': name, 'labels': dict(labels), 'count': h.count, 'sum': round(h.sum, 6),
+                     'p50_le': h.quantile(0.5), 'p95_le': h.quantile(0.95), 'p99_le': h.quantile(0.99)}
+                    for (name, labels), h in sorted(self.histograms.items())
+                ]
+            }
+    
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        def fmt_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+        
+        lines = []
+        with self._lock:
+            seen = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                metric = f"{METRIC_PREFIX}_{name}_total"
+                if metric not in seen:
+                    seen.add(metric)
+                    lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric}{fmt_labels(labels)} {value}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                metric = f"{METRIC_PREFIX}_{name}"
+                if metric not in seen:
+                    seen.add(metric)
+                    lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, bucket_count in zip(h.buckets, h.counts):
+                    cumulative += bucket_count
+                    lines.append(f"{metric}_bucket{fmt_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{metric}_bucket{fmt_labels(labels, [('le', '+Inf')])} {h.count}")
+                lines.append(f"{metric}_sum{fmt_labels(labels)} {h.sum}")
+                lines.append(f"{metric}_count{fmt_labels(labels)} {h.count}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# Stage seconds of the current request (see collect_timings)
+_timings = contextvars.ContextVar('timings', default=None)
+
+
+def _record(stage: str, seconds: float):
+    REGISTRY.observe('stage_seconds', seconds, stage=stage)
+    timings = _timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+class _Span:
+    __slots__ = ('stage', 'start')
+    
+    def __init__(self, stage: str):
+        self.stage = stage
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        _record(self.stage, time.perf_counter() - self.start)
+        if exc_type is not None:
+            REGISTRY.inc('stage_errors', stage=self.stage)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(stage: str):
+    """Context manager timing a pipeline stage (latency histogram + request timings)"""
+    if not config.METRICS_ENABLED:
+        return _NOOP_SPAN
+    return _Span(stage)
+
+
+def observe(stage: str, seconds: float):
+    """Record a stage duration measured by the caller"""
+    if config.METRICS_ENABLED:
+        _record(stage, seconds)
+
+
+def count(name: str, amount: float = 1, **labels):
+    """Increment a counter, e.g. count('llm_cache', result='hit')"""
+    if config.METRICS_ENABLED and amount:
+        REGISTRY.inc(name, amount, **labels)
+
+
+class collect_timings:
+    """
+    Collect the stage timings of one request
+    
+        with collect_timings() as timings:
+            ...
+        result['timings'] = timings.as_dict()
+    """
+    
+    def __init__(self):
+        self.stages = {} if config.METRICS_ENABLED else None
+        self._token = None
+        self._start = None
+        self.total = None
+    
+    def __enter__(self):
+        if self.stages is not None:
+            self._token = _timings.set(self.stages)
+            self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self.stages is not None:
+            self.total = time.perf_counter() - self._start
+            _timings.reset(self._token)
+            # A request made from inside another one also counts towards the outer one
+            outer = _timings.get()
+            if outer is not None:
+                for stage, seconds in self.stages.items():
+                    outer[stage] = outer.get(stage, 0.0) + seconds
+        return False
+    
+    def as_dict(self) -> Optional[Dict]:
+        """Seconds per stage plus 'total', or None when metrics are disabled"""
+        if self.stages is None:
+            return None
+        timings = {stage: round(seconds, 4) for stage, seconds in self.stages.items()}
+        if self.total is not None:
+            timings['total'] = round(self.total, 4)
+        return timings
+
+
+def timed(operation: str):
+    """
+    Decorator recording a screening call's latency and attaching its timings
+    
+    The stage timings are stored under 'timings' in the returned dict, or in
+    every dict of a returned list (batch calls share the timings of the batch).
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not config.METRICS_ENABLED:
+                return function(*args, **kwargs)
+            with collect_timings() as timings:
+                result = function(*args, **kwargs)
+            REGISTRY.observe('request_seconds', timings.total, operation=operation)
+            stage_timings = timings.as_dict()
+            if isinstance(result, dict):
+                result['timings'] = stage_timings
+            elif isinstance(result, list):
+                for item in result:
+                    if isinstance(item, dict):
+                        item['timings'] = dict(stage_timings)
+            return result
+        return wrapper
+    return decorator
+
+
+def to_prometheus() -> str:
+    return REGISTRY.to_prometheus()
+
+
+def to_dict() -> Dict:
+    return REGISTRY.to_dict()
+
+
+def dump(path: str):
+    """Write the registry to a file: Prometheus text for .prom/.txt, JSON otherwise"""
+    with open(path, 'w') as f:
+        if path.endswith(('.prom', '.txt')):
+            f.write(to_prometheus())
+        else:
+            json.dump(to_dict(), f, indent=2)
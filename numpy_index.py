@@ -0,0 +1,400 @@
+"""
+Exact NumPy search backend with memory-mapped, quantized embeddings
+
+NumpyClient and NumpyCollection implement the subset of the Chroma client
+and collection API used by VectorStore, so the backend can be switched with
+config.VECTOR_BACKEND. Search is brute force over a contiguous matrix, which
+is exact, and for up to a few hundred thousand vectors it is faster than an
+HNSW round trip.
+"""
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from typing import Dict, List
+import numpy as np
+import config
+
+
+class NumpyCollection:
+    """
+    A collection stored as quantized unit vectors in a memory-mapped file
+    
+    Files in the collection directory:
+    - vectors.bin: one row per entry (float16, or int8 with a per-row scale)
+    - scales.bin: float32 scale per row (int8 only)
+    - records.sqlite3: id, document and metadata of each row
+    
+    Deletes leave tombstones that are skipped by searches and removed by
+    compact(). One process should write to a collection at a time.
+    
+    compact() writes the new files as vectors.bin.gen<N> (and
+    scales.bin.gen<N>), commits the renumbered records together with
+    generation N, and only then renames the files into place; opening the
+    collection finishes or discards an interrupted compaction.
+    """
+    
+    def __init__(self, directory: str, name: str, dtype: str = None):
+        self.name = name
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        
+        self.vectors_path = os.path.join(directory, "vectors.bin")
+        self.scales_path = os.path.join(directory, "scales.bin")
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            os.path.join(directory, "records.sqlite3"), check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "row INTEGER PRIMARY KEY, id TEXT NOT NULL, document TEXT, metadata TEXT, "
+            "deleted INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS records_id ON records (id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        
+        # An existing collection keeps the dtype it was created with
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        self.generation = int(meta.get('generation', 0))
+        self.dimension = int(meta['dimension']) if 'dimension' in meta else None
+        self.dtype = np.dtype(meta.get('dtype') or dtype or config.NUMPY_INDEX_DTYPE)
+        if self.dtype not in (np.float16, np.int8):
+            raise ValueError(f"Unsupported NUMPY_INDEX_DTYPE: {self.dtype}")
+        
+        # In-memory row state: ids and tombstones (vectors stay on disk)
+        rows = self._conn.execute("SELECT id, deleted FROM records ORDER BY row").fetchall()
+        self._ids = [r[0] for r in rows]
+        self._deleted = np.array([bool(r[1]) for r in rows], dtype=bool)
+        self._row_by_id = {doc_id: i for i, doc_id in enumerate(self._ids) if not self._deleted[i]}
+        self._vectors = None
+        self._scales = None
+        self._recover_compaction()
+        self._truncate_to_index()
+    
+    # Storage
+    
+    def _generation_path(self, path: str, generation: int) -> str:
+        return f"{path}.gen{generation}"
+    
+    def _recover_compaction(self):
+        """
+        Finish or discard a compaction interrupted by a crash
+        
+        Files of the committed generation are renamed into place (the records
+        already use their numbering); files of any other generation were
+        written by a compaction that never committed and are removed.
+        """
+        for path in (self.vectors_path, self.scales_path):
+            prefix = os.path.basename(path) + ".gen"
+            for name in os.listdir(self.directory):
+                if not name.startswith(prefix):
+                    continue
+                staged = os.path.join(self.directory, name)
+                if name == os.path.basename(self._generation_path(path, self.generation)):
+                    os.replace(staged, path)
+                else:
+                    os.remove(staged)
+    
+    def _truncate_to_index(self):
+        """
+        Cut the vector and scale files back to the rows recorded in SQLite
+        
+        Rows are appended to the files before their records are committed, so
+        a crash or a failed commit in between leaves orphan rows at the end;
+        without this, every later row would be read at the wrong offset.
+        """
+        rows = len(self._ids)
+        row_bytes = (self.dimension or 0) * self.dtype.itemsize
+        for path, size in ((self.vectors_path, rows * row_bytes), (self.scales_path, rows * 4)):
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+    
+    def _map(self):
+        """Memory maps of the vector (and scale) files covering every row"""
+        if self._vectors is None:
+            self._recover_compaction()
+        rows = len(self._ids)
+        if self._vectors is None or len(self._vectors) != rows:
+            if rows == 0:
+                return np.empty((0, self.dimension or 0), dtype=self.dtype), None
+            self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode='r',
+                                      shape=(rows, self.dimension))
+            if self.dtype == np.int8:
+                self._scales = np.memmap(self.scales_path, dtype=np.float32, mode='r', shape=(rows,))
+        return self._vectors, self._scales
+    
+    def _quantize(self, embeddings: np.ndarray):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        if self.dtype == np.float16:
+            return embeddings.astype(np.float16), None
+        scales = np.maximum(np.abs(embeddings).max(axis=1), 1e-12) / 127.0
+        return np.round(embeddings / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+    
+    def _dequantize(self, rows) -> np.ndarray:
+        """float32 vectors for a slice or an index array of rows"""
+        vectors, scales = self._map()
+        block = np.asarray(vectors[rows], dtype=np.float32)
+        if scales is not None:
+            block *= scales[rows][:, None]
+        return block
+    
+    # Chroma-compatible API
+    
+    def count(self) -> int:
+        return len(self._row_by_id)
+    
+    def add(self, ids: List[str], embeddings, documents: List[str] = None, metadatas: List[Dict] = None):
+        """Append entries; ids that already exist are ignored (as in Chroma)"""
+        with self._lock:
+            keep = []
+            seen = set()
+            for i, doc_id in enumerate(ids):
+                if doc_id not in self._row_by_id and doc_id not in seen:
+                    seen.add(doc_id)
+                    keep.append(i)
+            if not keep:
+                return
+            
+            embeddings = np.asarray(embeddings, dtype=np.float32)[keep]
+            new_collection = self.dimension is None
+            if new_collection:
+                self.dimension = embeddings.shape[1]
+                self._conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                                       [('dimension', str(self.dimension)), ('dtype', self.dtype.name)])
+            quantized, scales = self._quantize(embeddings)
+            
+            first_row = len(self._ids)
+            self._truncate_to_index()
+            with open(self.vectors_path, 'ab') as f:
+                f.write(quantized.tobytes())
+            if scales is not None:
+                with open(self.scales_path, 'ab') as f:
+                    f.write(scales.tobytes())
+            
+            try:
+                self._conn.executemany(
+                    "INSERT INTO records (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                    [(first_row + n, ids[i],
+                      documents[i] if documents else None,
+                      json.dumps(metadatas[i]) if metadatas and metadatas[i] else None)
+                     for n, i in enumerate(keep)]
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                self._truncate_to_index()
+                if new_collection:
+                    self.dimension = None
+                raise
+            
+            for n, i in enumerate(keep):
+                self._ids.append(ids[i])
+                self._row_by_id[ids[i]] = first_row + n
+            self._deleted = np.concatenate([self._deleted, np.zeros(len(keep), dtype=bool)])
+    
+    def upsert(self, ids: List[str], embeddings, documents: List[str] = None, metadatas: List[Dict] = None):
+        """Insert entries, replacing existing entries with the same ids"""
+        with self._lock:
+            self.delete(ids=ids)
+            self.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+    
+    def _rows_matching(self, where: Dict) -> List[int]:
+        """Live rows whose metadata match a Chroma-style where filter ({key: value} or {key: {'$in': [...]}})"""
+        clauses, params = [], []
+        for key, condition in where.items():
+            if not re.fullmatch(r'[A-Za-z0-9_]+', key):
+                raise ValueError(f"Unsupported metadata key in where filter: {key}")
+            if isinstance(condition, dict):
+                values = condition.get('$in')
+                if values is None:
+                    raise ValueError(f"Unsupported where operator: {condition}")
+                if not values:
+                    return []
+                clauses.append(f"json_extract(metadata, '$.{key}') IN ({','.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                clauses.append(f"json_extract(metadata, '$.{key}') = ?")
+                params.append(condition)
+        query = "SELECT row FROM records WHERE deleted = 0"
+        if clauses:
+            query += " AND " + " AND ".join(clauses)
+        return [r[0] for r in self._conn.execute(query, params).fetchall()]
+    
+    def delete(self, ids: List[str] = None, where: Dict = None):
+        """Tombstone entries by id or metadata filter"""
+        with self._lock:
+            rows = set(self._rows_matching(where)) if where else set()
+            if ids:
+                rows.update(self._row_by_id[doc_id] for doc_id in ids if doc_id in self._row_by_id)
+            if not rows:
+                return
+            rows = sorted(rows)
+            self._conn.executemany("UPDATE records SET deleted = 1 WHERE row = ?", [(r,) for r in rows])
+            self._conn.commit()
+            self._deleted[rows] = True
+            for r in rows:
+                self._row_by_id.pop(self._ids[r], None)
+            
+            if self._deleted.sum() > max(1000, len(self._ids) // 2):
+                self.compact()
+    
+    def _records(self, rows: List[int]) -> Dict[int, tuple]:
+        records = {}
+        for start in range(0, len(rows), 500):
+            chunk = rows[start:start + 500]
+            records.update((r[0], r[1:]) for r in self._conn.execute(
+                f"SELECT row, document, metadata FROM records WHERE row IN ({','.join('?' * len(chunk))})",
+                chunk
+            ))
+        return records
+    
+    def query(self, query_embeddings, n_results: int = 10, where: Dict = None) -> Dict:
+        """
+        Exact top-k search by cosine similarity
+        
+        Rows are scored block by block (config.NUMPY_SEARCH_BLOCK_ROWS) so the
+        quantized matrix is never expanded to float32 all at once; top-k
+        selection uses argpartition.
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        
+        with self._lock:
+            n_rows = len(self._ids)
+            live = ~self._deleted
+            if where:
+                live = np.zeros(n_rows, dtype=bool)
+                live[self._rows_matching(where)] = True
+            ids = list(self._ids)
+        
+        result = {'ids': [], 'distances': [], 'documents': [], 'metadatas': []}
+        if n_rows == 0 or not live.any():
+            for _ in range(len(queries)):
+                for key in result:
+                    result[key].append([])
+            return result
+        
+        scores = np.empty((len(queries), n_rows), dtype=np.float32)
+        block_rows = config.NUMPY_SEARCH_BLOCK_ROWS
+        for start in range(0, n_rows, block_rows):
+            stop = min(start + block_rows, n_rows)
+            scores[:, start:stop] = queries @ self._dequantize(slice(start, stop)).T
+        scores[:, ~live] = -np.inf
+        
+        k = min(n_results, int(live.sum()))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        records = self._records(sorted(set(top.ravel().tolist())))
+        
+        for q in range(len(queries)):
+            order = top[q][np.argsort(-scores[q, top[q]])]
+            result['ids'].append([ids[r] for r in order])
+            result['distances'].append([float(1 - scores[q, r]) for r in order])
+            result['documents'].append([records[r][0] for r in order])
+            result['metadatas'].append([json.loads(records[r][1]) if records[r][1] else None for r in order])
+        return result
+    
+    def get(self, ids: List[str] = None, where: Dict = None, include: List[str] = None) -> Dict:
+        """Fetch live entries (all of them, or by id / metadata filter)"""
+        include = include or ['documents', 'metadatas']
+        with self._lock:
+            if ids is not None:
+                rows = [self._row_by_id[doc_id] for doc_id in ids if doc_id in self._row_by_id]
+            elif where:
+                rows = self._rows_matching(where)
+            else:
+                rows = np.flatnonzero(~self._deleted).tolist()
+            rows = sorted(rows)
+            
+            result = {'ids': [self._ids[r] for r in rows]}
+            records = self._records(rows) if ('documents' in include or 'metadatas' in include) else {}
+            if 'documents' in include:
+                result['documents'] = [records[r][0] for r in rows]
+            if 'metadatas' in include:
+                result['metadatas'] = [json.loads(records[r][1]) if records[r][1] else None for r in rows]
+            if 'embeddings' in include:
+                result['embeddings'] = (
+                    self._dequantize(np.asarray(rows, dtype=np.int64))
+                    if rows else np.empty((0, self.dimension or 0), dtype=np.float32)
+                )
+        return result
+    
+    def compact(self):
+        """
+        Rewrite the collection files without deleted rows
+        
+        The records are renumbered in the same transaction that bumps the
+        generation, after the new files are written and before they replace
+        the old ones, so the records never point at the wrong vectors.
+        """
+        with self._lock:
+            live = np.flatnonzero(~self._deleted)
+            vectors, scales = self._map()
+            live_vectors = np.array(vectors[live]) if len(live) else None
+            live_scales = np.array(scales[live]) if scales is not None and len(live) else None
+            generation = self.generation + 1
+            
+            staged = []
+            try:
+                for path, data in ((self.vectors_path, live_vectors), (self.scales_path, live_scales)):
+                    if data is not None or os.path.exists(path):
+                        staged.append(self._generation_path(path, generation))
+                        with open(staged[-1], 'wb') as f:
+                            if data is not None:
+                                f.write(data.tobytes())
+                            f.flush()
+                            os.fsync(f.fileno())
+                
+                records = self._conn.execute(
+                    "SELECT id, document, metadata FROM records WHERE deleted = 0 ORDER BY row"
+                ).fetchall()
+                self._conn.execute("DELETE FROM records")
+                self._conn.executemany(
+                    "INSERT INTO records (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                    [(i,) + tuple(record) for i, record in enumerate(records)]
+                )
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('generation', ?)",
+                                   (str(generation),))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                for path in staged:
+                    if os.path.exists(path):
+                        os.remove(path)
+                raise
+            
+            self.generation = generation
+            self._ids = [self._ids[r] for r in live]
+            self._deleted = np.zeros(len(self._ids), dtype=bool)
+            self._row_by_id = {doc_id: i for i, doc_id in enumerate(self._ids)}
+            # Renames the staged files; if this fails, the next read (or open) retries it
+            self._vectors = self._scales = None
+            self._recover_compaction()
+
+
+class NumpyClient:
+    """Chroma-style client managing NumpyCollections under one directory"""
+    
+    def __init__(self, path: str = None):
+        self.path = path or config.NUMPY_INDEX_PATH
+        self._collections = {}
+        self._lock = threading.Lock()
+    
+    def get_or_create_collection(self, name: str, metadata: Dict = None) -> NumpyCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = NumpyCollection(os.path.join(self.path, name), name)
+            return self._collections[name]
+    
+    def delete_collection(self, name: str):
+        with self._lock:
+            collection = self._collections.pop(name, None)
+            if collection is not None:
+                collection._conn.close()
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
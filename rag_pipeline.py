@@ -3,28 +3,102 @@ RAG Pipeline combining Semantic Search and LLM Evaluation
 """
 from vector_store import VectorStore
 from llm_evaluator import LLMEvaluator
+from context_builder import trim_contexts
+from dedup import DedupIndex
+from job_profile import add_embeddings, job_hash, match_skills
+from skill_matcher import get_skill_matcher
+from utils import run_sync
 import config
-from typing import Dict, List
+import metrics
+import copy
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Skip reason for candidates filtered out by hard skill requirements
+MISSING_SKILLS_REASON = "missing required skills"
 
 
 class RAGResumeScreener:
     """
     Main RAG Pipeline for Resume Screening
     Combines semantic search (0.6 weight) and LLM evaluation (0.4 weight)
+    
+    Safe to share between threads (e.g. every session of a Streamlit server).
     """
     
-    def __init__(self):
-        self.vector_store = VectorStore()
-        self.llm_evaluator = LLMEvaluator()
+    def __init__(self, vector_store: VectorStore = None, llm_evaluator: LLMEvaluator = None,
+                 dedup_index: DedupIndex = None):
+        """
+        Args:
+            vector_store: Vector store to use (defaults to a new VectorStore)
+            llm_evaluator: Evaluator to use (defaults to a Gemini LLMEvaluator, which
+                needs GEMINI_API_KEY)
+            dedup_index: Near-duplicate index of the indexed resumes (defaults to the
+                vector store's, see VectorStore.dedup_index)
+        """
+        self.vector_store = vector_store or VectorStore()
+        self.llm_evaluator = llm_evaluator or LLMEvaluator()
+        self._dedup_index = dedup_index
+        self.stats = {
+            'llm_calls': 0,
+            'llm_calls_skipped': 0,
+            'llm_degraded': 0,
+            'jobs_compiled': 0,
+            'duplicates_collapsed': 0
+        }
+        self._stats_lock = threading.Lock()
+        # Compiled job profiles by job description hash
+        self._job_profiles = {}
+        self._profiles_lock = threading.Lock()
+    
+    @property
+    def dedup_index(self) -> Optional[DedupIndex]:
+        """Near-duplicate index checked by batch screening and add_resume_to_index"""
+        return self._dedup_index or self.vector_store.dedup_index
+    
+    def _count(self, name: str, amount: int = 1):
+        """Increment a counter in self.stats"""
+        with self._stats_lock:
+            self.stats[name] += amount
     
-    def screen_resume(self, resume_text: str, job_description: str) -> Dict:
+    def warmup(self) -> Dict:
+        """
+        Load the embedding model, Chroma client and LLM client up front
+        
+        Returns:
+            Seconds spent loading each component
+        """
+        load_times = self.vector_store.warmup()
+        load_times.update(self.llm_evaluator.warmup())
+        return load_times
+    
+    @metrics.timed('screen')
+    def screen_resume(self, resume_text: str, job_description: str,
+                      bounded: bool = None, min_score: float = None,
+                      trim_context: bool = None, use_profile: bool = None,
+                      required_skills: List[str] = None) -> Dict:
         """
         Screen a resume against a job description using RAG pipeline
         
+        In bounded mode the LLM is skipped when the semantic score alone
+        decides the outcome: every reachable final score falls in the same
+        recommendation bucket, or none reaches `min_score`. Resumes missing a
+        required skill are never sent to the LLM.
+        
         Args:
             resume_text: The candidate's resume text
             job_description: The job description text
-            
+            bounded: Enable bounded evaluation (defaults to config.BOUNDED_EVALUATION)
+            min_score: Skip the LLM when the final score cannot reach this cutoff
+                (implies bounded evaluation)
+            trim_context: Give the LLM only the resume passages most relevant to
+                the job description (defaults to config.CONTEXT_TRIMMING)
+            use_profile: Evaluate against the compiled job profile (see compile_job;
+                defaults to config.JOB_PROFILE_ENABLED)
+            required_skills: Hard skill requirements (taxonomy names or aliases); with
+                config.SKILL_FILTER_REQUIRED the job profile's required skills are used
+        
         Returns:
             Dictionary containing:
             - final_score: Weighted combination of semantic and LLM scores
@@ -32,60 +106,656 @@ class RAGResumeScreener:
             - llm_score: Score from LLM evaluation (0-1)
             - llm_details: Detailed LLM evaluation results
             - recommendation: Overall recommendation
+            - llm_skipped: Whether bounded evaluation skipped the LLM
+            - llm_degraded: Present and True when the LLM call failed; the final score
+              is then semantic-only (plus the weighted skill overlap) and llm_score is None
+            - context: Prompt tokens before/after trimming (only when trimming)
+            - skill_match: Local skill match against the job profile (only with profiles)
+            - skill_score / skill_overlap: Taxonomy skill overlap (when skill matching is enabled)
+            - timings: Seconds spent per stage (when config.METRICS_ENABLED)
         """
-        # Step 1: Semantic Search Evaluation (0.6 weight)
-        semantic_score = self.vector_store.calculate_semantic_score(
-            resume_text, job_description
-        )
-        
-        # Step 2: LLM Evaluation (0.4 weight)
-        llm_result = self.llm_evaluator.evaluate_match(resume_text, job_description)
-        llm_score = llm_result['score']
+        # Step 1: Semantic Search Evaluation (0.6 weight) and local skill overlap;
+        # the resume's own chunks are scored, exactly as in batch_screen_resumes
+        semantic_score = self.vector_store.calculate_semantic_scores([resume_text], job_description)[0]
+        profile = self._profiles_for([job_description], use_profile).get(job_description)
+        skill = self._skill_overlaps(
+            [resume_text], job_description, self._required_skills(required_skills, profile)
+        )[0]
         
-        # Step 3: Weighted Combination
-        final_score = (
-            semantic_score * config.SEMANTIC_SEARCH_WEIGHT +
-            llm_score * config.LLM_WEIGHT
-        )
+        skip_reason = self._llm_skip_reason(semantic_score, bounded, min_score, skill)
+        if skip_reason:
+            return self._skipped_result(semantic_score, skip_reason, min_score, skill)
         
-        # Step 4: Generate Recommendation
-        recommendation = self._generate_recommendation(final_score)
+        # Step 2: LLM Evaluation (0.4 weight), on the trimmed resume if enabled
+        contexts = self._llm_contexts([resume_text], job_description, trim_context)
+        llm_text = contexts[0]['text'] if contexts else resume_text
+        self._count('llm_calls')
+        if profile:
+            llm_result = self.llm_evaluator.evaluate_with_profile(llm_text, profile)
+            self._apply_skill_matches([resume_text], [llm_result], profile)
+        else:
+            llm_result = self.llm_evaluator.evaluate_match(llm_text, job_description)
         
-        return {
-            'final_score': round(final_score, 3),
-            'semantic_score': round(semantic_score, 3),
-            'llm_score': round(llm_score, 3),
-            'llm_details': llm_result,
-            'recommendation': recommendation,
-            'weights': {
-                'semantic_search': config.SEMANTIC_SEARCH_WEIGHT,
-                'llm': config.LLM_WEIGHT
-            }
-        }
+        # Steps 3-4: Weighted Combination and Recommendation
+        result = self._build_result(semantic_score, llm_result, skill)
+        if contexts:
+            result['context'] = self._context_summary(contexts[0])
+        if profile:
+            result['skill_match'] = result['llm_details'].pop('skill_match')
+        return result
     
-    def batch_screen_resumes(self, resumes: List[Dict], job_description: str) -> List[Dict]:
+    @metrics.timed('batch')
+    def batch_screen_resumes(self, resumes: List[Dict], job_description: str,
+                             batch_size: int = None, bounded: bool = None,
+                             min_score: float = None, packed: bool = None,
+                             trim_context: bool = None, use_profile: bool = None,
+                             required_skills: List[str] = None, dedup: bool = None) -> List[Dict]:
         """
         Screen multiple resumes against a job description
         
+        Semantic scores for the whole batch are computed in one pass: the job
+        description is embedded once and the resumes are embedded in batches.
+        LLM evaluations run concurrently within the configured rate limits.
+        Near-duplicate resumes in the batch are screened once and share the
+        result (see dedup.py).
+        
         Args:
             resumes: List of dictionaries with 'id' and 'text' keys
             job_description: The job description text
-            
+            batch_size: Number of resumes per embedding batch (defaults to config.EMBEDDING_BATCH_SIZE)
+            bounded: Enable bounded evaluation (see screen_resume)
+            min_score: Skip the LLM for resumes that cannot reach this final score
+            packed: Send several resumes per LLM request (defaults to config.LLM_PACKED_EVALUATION)
+            trim_context: Trim resumes to their most relevant passages before the
+                LLM (defaults to config.CONTEXT_TRIMMING)
+            use_profile: Compile the job description once and evaluate every resume
+                against the profile (defaults to config.JOB_PROFILE_ENABLED)
+            required_skills: Hard skill requirements; resumes missing one skip the LLM
+                (see screen_resume)
+            dedup: Collapse near-duplicate resumes (defaults to config.DEDUP_ENABLED)
+        
         Returns:
-            List of screening results, sorted by final_score (descending)
+            List of screening results, sorted by final_score (descending); each
+            result's 'timings' covers the whole batch. A resume that is a
+            near-duplicate of an earlier one in the batch, or else of an indexed
+            resume, has 'duplicate_of' (that resume's ID) and 'duplicate_similarity';
+            'collapsed' marks results copied from the earlier resume in the batch.
         """
+        # Step 0: Collapse near-duplicates onto the first copy in the batch
+        duplicates = self._find_duplicates(resumes) if (config.DEDUP_ENABLED if dedup is None else dedup) else {}
+        originals = [resume for i, resume in enumerate(resumes)
+                     if duplicates.get(i, {}).get('index') is None]
+        
+        # Step 1: Semantic scores for every resume at once
+        profiles = self._profiles_for([job_description], use_profile)
+        semantic_scores = self.vector_store.calculate_semantic_scores(
+            [resume['text'] for resume in originals], job_description, batch_size=batch_size,
+            job_embedding=profiles[job_description]['job_embedding'] if profiles else None
+        )
+        
+        skills = self._skill_overlaps(
+            [resume['text'] for resume in originals], job_description,
+            self._required_skills(required_skills, profiles.get(job_description))
+        )
+        skip_reasons = [
+            self._llm_skip_reason(semantic_score, bounded, min_score, skill)
+            for semantic_score, skill in zip(semantic_scores, skills)
+        ]
+        to_evaluate = [i for i, reason in enumerate(skip_reasons) if not reason]
+        
+        # Step 2: Concurrent LLM evaluations for resumes whose outcome is still open
+        contexts = self._llm_contexts(
+            [originals[i]['text'] for i in to_evaluate], job_description, trim_context
+        )
+        contexts = dict(zip(to_evaluate, contexts)) if contexts else {}
+        self._count('llm_calls', len(to_evaluate))
+        llm_results = dict(zip(to_evaluate, self._evaluate_pairs(
+            [(contexts[i]['text'] if contexts else originals[i]['text'], job_description)
+             for i in to_evaluate],
+            [originals[i]['text'] for i in to_evaluate],
+            profiles, packed=packed
+        )))
+        
         results = []
         
-        for resume in resumes:
-            result = self.screen_resume(resume['text'], job_description)
+        for i, (resume, semantic_score) in enumerate(zip(originals, semantic_scores)):
+            if skip_reasons[i]:
+                result = self._skipped_result(semantic_score, skip_reasons[i], min_score, skills[i])
+            else:
+                result = self._build_result(semantic_score, llm_results[i], skills[i])
+                if contexts:
+                    result['context'] = self._context_summary(contexts[i])
+                if profiles:
+                    result['skill_match'] = result['llm_details'].pop('skill_match')
             result['resume_id'] = resume.get('id', 'unknown')
             results.append(result)
         
-        # Sort by final score (highest first)
-        results.sort(key=lambda x: x['final_score'], reverse=True)
+        if duplicates:
+            results = self._expand_duplicates(resumes, results, duplicates)
+        
+        # Sort by final score (highest first), candidates missing required skills last
+        results.sort(key=lambda x: (not x.get('skills_filtered'), x['final_score']), reverse=True)
+        
+        return results
+    
+    @metrics.timed('rank')
+    def rank_candidates(self, job_description: str, shortlist_k: int = None,
+                        final_k: int = None) -> List[Dict]:
+        """
+        Rank the indexed resumes for a job description (retrieve-then-rerank)
+        
+        Every indexed resume is scored by embedding similarity, and only the
+        top `shortlist_k` are sent to the LLM. Screened candidates are ranked
+        by final_score; the rest of the pool follows in semantic order,
+        marked with 'screened': False.
+        
+        Args:
+            job_description: The job description text
+            shortlist_k: Number of candidates evaluated by the LLM (defaults to config.RANK_SHORTLIST_K)
+            final_k: Number of results to return (defaults to the whole pool)
+        
+        Returns:
+            List of screening results, screened candidates first; near-duplicates
+            linked in the dedup index follow their original with 'collapsed',
+            'duplicate_of' and 'duplicate_similarity' set
+        """
+        shortlist_k = shortlist_k or config.RANK_SHORTLIST_K
+        
+        # Step 1: Score the whole pool by embedding similarity
+        pool = self.vector_store.score_indexed_resumes(job_description)
+        shortlist, tail = pool[:shortlist_k], pool[shortlist_k:]
+        texts = self.vector_store.resume_texts([match['id'] for match in shortlist])
+        for match in shortlist:
+            match['text'] = texts[match['id']]
+        
+        # Step 2: LLM evaluation of the shortlist only
+        contexts = self._llm_contexts([match['text'] for match in shortlist], job_description)
+        profiles = self._profiles_for([job_description])
+        self._count('llm_calls', len(shortlist))
+        llm_results = self._evaluate_pairs(
+            [(context['text'], job_description) for context in contexts] if contexts else
+            [(match['text'], job_description) for match in shortlist],
+            [match['text'] for match in shortlist],
+            profiles
+        )
+        
+        skills = self._skill_overlaps([match['text'] for match in shortlist], job_description)
+        
+        screened = []
+        for n, (match, llm_result) in enumerate(zip(shortlist, llm_results)):
+            result = self._build_result(match['similarity'], llm_result, skills[n])
+            if contexts:
+                result['context'] = self._context_summary(contexts[n])
+            if profiles:
+                result['skill_match'] = result['llm_details'].pop('skill_match')
+            result['resume_id'] = match['id']
+            result['metadata'] = match['metadata']
+            result['screened'] = True
+            screened.append(result)
+        screened.sort(key=lambda x: x['final_score'], reverse=True)
+        
+        # Step 3: Unscreened tail, in semantic order
+        unscreened = [
+            self._unscreened_result(match['id'], match['similarity'], match['metadata'])
+            for match in tail
+        ]
+        
+        ranking = self._expand_indexed_duplicates(screened + unscreened)
+        return ranking[:final_k] if final_k else ranking
+    
+    @metrics.timed('matrix')
+    def screen_matrix(self, resumes: List[Dict], jobs: List[Dict], top_k_per_job: int = None,
+                      top_k_per_candidate: int = None, bounded: bool = None,
+                      min_score: float = None) -> Dict:
+        """
+        Screen M resumes against N job descriptions in one pass
+        
+        Every resume and job is embedded once and the full M x N semantic
+        matrix comes from a single matrix product. Only the best pairs go to
+        the LLM: the top `top_k_per_job` resumes of each job and the top
+        `top_k_per_candidate` jobs of each resume (the union, if both are set).
+        
+        Args:
+            resumes: List of dictionaries with 'id', 'text' and optional 'metadata' keys
+            jobs: List of dictionaries with 'id' and 'text' keys
+            top_k_per_job: Resumes per job sent to the LLM (defaults to config.MATRIX_TOP_K_PER_JOB)
+            top_k_per_candidate: Jobs per resume sent to the LLM (defaults to config.MATRIX_TOP_K_PER_CANDIDATE)
+            bounded: Enable bounded evaluation for the selected pairs (see screen_resume)
+            min_score: Skip the LLM for pairs that cannot reach this final score
+        
+        Returns:
+            Dictionary containing:
+            - resume_ids / job_ids: Row and column labels
+            - semantic_scores: float32 array (M, N)
+            - final_scores: float32 array (M, N), NaN for pairs not screened
+            - rankings: {job_id: results ranked like rank_candidates}
+            - llm_calls: Number of LLM evaluations made
+            - timings: Seconds spent per stage (when config.METRICS_ENABLED)
+        """
+        if top_k_per_job is None:
+            top_k_per_job = config.MATRIX_TOP_K_PER_JOB
+        if top_k_per_candidate is None:
+            top_k_per_candidate = config.MATRIX_TOP_K_PER_CANDIDATE
+        
+        # Step 1: Full semantic matrix
+        semantic = self.vector_store.semantic_score_matrix(
+            [resume['text'] for resume in resumes], [job['text'] for job in jobs]
+        )
+        n_resumes, n_jobs = semantic.shape
+        
+        # Step 2: Pick the pairs worth an LLM call
+        selected = np.zeros(semantic.shape, dtype=bool)
+        if not top_k_per_job and not top_k_per_candidate:
+            selected[:] = True
+        if top_k_per_job and n_resumes:
+            k = min(top_k_per_job, n_resumes)
+            rows = np.argpartition(-semantic, k - 1, axis=0)[:k]
+            selected[rows, np.arange(n_jobs)] = True
+        if top_k_per_candidate and n_jobs:
+            k = min(top_k_per_candidate, n_jobs)
+            cols = np.argpartition(-semantic, k - 1, axis=1)[:, :k]
+            selected[np.arange(n_resumes)[:, None], cols] = True
+        
+        pairs = list(zip(*np.nonzero(selected)))
+        skills = {}
+        for j, job in enumerate(jobs):
+            rows = [i for i, col in pairs if col == j]
+            skills.update(zip(
+                [(i, j) for i in rows], self._skill_overlaps([resumes[i]['text'] for i in rows], job['text'])
+            ))
+        skip_reasons = {
+            (i, j): self._llm_skip_reason(float(semantic[i, j]), bounded, min_score, skills[(i, j)])
+            for i, j in pairs
+        }
+        to_evaluate = [pair for pair in pairs if not skip_reasons[pair]]
+        
+        # Step 3: Concurrent LLM evaluations for the selected pairs
+        contexts = {}
+        for j, job in enumerate(jobs):
+            rows = [i for i, col in to_evaluate if col == j]
+            job_contexts = self._llm_contexts([resumes[i]['text'] for i in rows], job['text'])
+            if job_contexts:
+                contexts.update(((i, j), context) for i, context in zip(rows, job_contexts))
+        profiles = self._profiles_for([job['text'] for job in jobs])
+        self._count('llm_calls', len(to_evaluate))
+        llm_results = dict(zip(to_evaluate, self._evaluate_pairs(
+            [(contexts[(i, j)]['text'] if contexts else resumes[i]['text'], jobs[j]['text'])
+             for i, j in to_evaluate],
+            [resumes[i]['text'] for i, _ in to_evaluate],
+            profiles
+        )))
+        
+        # Step 4: Score matrix and per-job rankings
+        final = np.full(semantic.shape, np.nan, dtype=np.float32)
+        rankings = {}
+        for j, job in enumerate(jobs):
+            screened, unscreened = [], []
+            for i in np.argsort(-semantic[:, j], kind='stable'):
+                resume = resumes[i]
+                semantic_score = float(semantic[i, j])
+                if not selected[i, j]:
+                    unscreened.append(self._unscreened_result(
+                        resume.get('id', 'unknown'), semantic_score, resume.get('metadata')
+                    ))
+                    continue
+                if skip_reasons[(i, j)]:
+                    result = self._skipped_result(
+                        semantic_score, skip_reasons[(i, j)], min_score, skills[(i, j)]
+                    )
+                else:
+                    result = self._build_result(semantic_score, llm_results[(i, j)], skills[(i, j)])
+                    if contexts:
+                        result['context'] = self._context_summary(contexts[(i, j)])
+                    if job['text'] in profiles:
+                        result['skill_match'] = result['llm_details'].pop('skill_match')
+                result['resume_id'] = resume.get('id', 'unknown')
+                result['metadata'] = resume.get('metadata')
+                result['screened'] = True
+                final[i, j] = result['final_score']
+                screened.append(result)
+            screened.sort(key=lambda x: x['final_score'], reverse=True)
+            rankings[job.get('id', j)] = screened + unscreened
+        
+        return {
+            'resume_ids': [resume.get('id', 'unknown') for resume in resumes],
+            'job_ids': [job.get('id', j) for j, job in enumerate(jobs)],
+            'semantic_scores': semantic,
+            'final_scores': final,
+            'rankings': rankings,
+            'llm_calls': len(to_evaluate)
+        }
+    
+    def compile_job(self, job_description: str, bypass_cache: bool = False) -> Optional[Dict]:
+        """
+        Compile a job description into a reusable requirements profile
+        
+        The LLM extracts required and nice-to-have skills, seniority and
+        education once per job description (cached on disk by its hash); the
+        job and skill embeddings are computed alongside. Later screenings
+        against the same job description reuse the profile.
+        
+        Args:
+            job_description: The job description text
+            bypass_cache: Recompile even if a profile is cached
+        
+        Returns:
+            Profile dictionary (see job_profile), or None if compilation failed
+        """
+        key = job_hash(job_description)
+        if not bypass_cache:
+            with self._profiles_lock:
+                if key in self._job_profiles:
+                    return self._job_profiles[key]
         
+        profile = self.llm_evaluator.compile_job_profile(job_description, bypass_cache=bypass_cache)
+        if profile is None:
+            return None
+        self._count('jobs_compiled')
+        profile = add_embeddings(profile, job_description, self.vector_store)
+        with self._profiles_lock:
+            self._job_profiles[key] = profile
+        return profile
+    
+    def _profiles_for(self, job_descriptions: List[str], use_profile: bool = None) -> Dict[str, Dict]:
+        """Compiled profiles by job description, or {} when profiles are off"""
+        if use_profile is None:
+            use_profile = config.JOB_PROFILE_ENABLED
+        if not use_profile:
+            return {}
+        profiles = {}
+        for job_description in set(job_descriptions):
+            profile = self.compile_job(job_description)
+            if profile is not None:
+                profiles[job_description] = profile
+        return profiles
+    
+    def _evaluate_pairs(self, pairs: List[Tuple[str, str]], resume_texts: List[str],
+                        profiles: Dict[str, Dict] = None, packed: bool = None) -> List[Dict]:
+        """
+        LLM evaluations of (resume text for the LLM, job description) pairs
+        
+        Pairs whose job description has a compiled profile are evaluated with
+        the profile prompt, and their skills are matched locally on the full
+        resume texts.
+        """
+        results = run_sync(self.llm_evaluator.evaluate_many(pairs, packed=packed, profiles=profiles))
+        for job_description, profile in (profiles or {}).items():
+            indices = [i for i, pair in enumerate(pairs) if pair[1] == job_description]
+            self._apply_skill_matches(
+                [resume_texts[i] for i in indices], [results[i] for i in indices], profile
+            )
         return results
     
+    def _find_duplicates(self, resumes: List[Dict]) -> Dict[int, Dict]:
+        """
+        Near-duplicate links of a batch, by position
+        
+        Each resume is compared with the earlier resumes of the batch and, if it
+        is the first copy, with the indexed resumes in self.dedup_index.
+        
+        Returns:
+            {position: {'duplicate_of', 'similarity', 'index'}} where 'index' is the
+            position of the earlier copy whose result is reused (None when only an
+            indexed original matched)
+        """
+        batch_index = DedupIndex(':memory:')
+        duplicates = {}
+        for i, resume in enumerate(resumes):
+            signature = batch_index.signature(resume['text'])
+            match = batch_index.find(signature)
+            if match:
+                first = int(match['duplicate_of'])
+                duplicates[i] = {'duplicate_of': resumes[first].get('id', 'unknown'),
+                                 'similarity': match['similarity'], 'index': first}
+                continue
+            if signature is not None:
+                batch_index.add(str(i), signature)
+            indexed = self.dedup_index.find(signature, exclude_id=resume.get('id')) if self.dedup_index else None
+            if indexed:
+                duplicates[i] = {**indexed, 'index': None}
+        batch_index.close()
+        return duplicates
+    
+    def _expand_duplicates(self, resumes: List[Dict], results: List[Dict],
+                           duplicates: Dict[int, Dict]) -> List[Dict]:
+        """Results for every resume of a batch from the results of its first copies"""
+        first_copies = iter(results)
+        expanded = []
+        for i, resume in enumerate(resumes):
+            link = duplicates.get(i)
+            if link and link['index'] is not None:
+                result = copy.deepcopy(expanded[link['index']])
+                result['resume_id'] = resume.get('id', 'unknown')
+                result['collapsed'] = True
+            else:
+                result = next(first_copies)
+            if link:
+                result['duplicate_of'] = link['duplicate_of']
+                result['duplicate_similarity'] = round(link['similarity'], 3)
+            expanded.append(result)
+        self._count('duplicates_collapsed', sum(link['index'] is not None for link in duplicates.values()))
+        return expanded
+    
+    def _expand_indexed_duplicates(self, ranking: List[Dict]) -> List[Dict]:
+        """
+        Ranking with a row for each indexed near-duplicate, right after its original
+        
+        Near-duplicates are linked in the dedup index instead of being stored in
+        the vector store; each gets a copy of its original's result.
+        """
+        links = self.dedup_index.duplicates_of([result['resume_id'] for result in ranking]) if self.dedup_index else {}
+        if not links:
+            return ranking
+        expanded = []
+        for result in ranking:
+            expanded.append(result)
+            for link in links.get(result['resume_id'], []):
+                duplicate = copy.deepcopy(result)
+                duplicate['resume_id'] = link['id']
+                duplicate['metadata'] = link['metadata']
+                duplicate['collapsed'] = True
+                duplicate['duplicate_of'] = result['resume_id']
+                duplicate['duplicate_similarity'] = round(link['similarity'], 3)
+                expanded.append(duplicate)
+        return expanded
+    
+    def _apply_skill_matches(self, resume_texts: List[str], llm_results: List[Dict], profile: Dict):
+        """Fill the skill fields of profile-based evaluations from the local skill match"""
+        for llm_result, match in zip(llm_results, match_skills(resume_texts, profile, self.vector_store)):
+            llm_result['matched_skills'] = match['matched_skills']
+            llm_result['missing_skills'] = match['missing_skills']
+            llm_result['skill_match'] = match
+    
+    def _required_skills(self, required_skills: List[str] = None, profile: Dict = None) -> List[str]:
+        """Hard skill requirements: the explicit list, else the profile's when filtering is on"""
+        if required_skills:
+            return required_skills
+        if config.SKILL_FILTER_REQUIRED and profile:
+            return profile['required_skills']
+        return None
+    
+    def _skill_overlaps(self, resume_texts: List[str], job_description: str,
+                        required_skills: List[str] = None) -> List[Optional[Dict]]:
+        """Taxonomy skill overlap per resume, or Nones when skill matching is off"""
+        if not config.SKILL_MATCHING_ENABLED and not required_skills:
+            return [None] * len(resume_texts)
+        matcher = get_skill_matcher()
+        return [matcher.overlap(text, job_description, required_skills) for text in resume_texts]
+    
+    def _llm_contexts(self, resume_texts: List[str], job_description: str,
+                      trim: bool = None) -> List[Dict]:
+        """Trimmed LLM contexts for resumes, or None when context trimming is off"""
+        if trim is None:
+            trim = config.CONTEXT_TRIMMING
+        if not trim or not resume_texts:
+            return None
+        return trim_contexts(resume_texts, job_description, self.vector_store)
+    
+    def _context_summary(self, context: Dict) -> Dict:
+        """Token counts of a trimmed context, as reported in screening results"""
+        return {key: value for key, value in context.items() if key != 'text'}
+    
+    def _unscreened_result(self, resume_id: str, semantic_score: float, metadata: Dict = None) -> Dict:
+        """Ranking entry for a candidate outside the LLM shortlist"""
+        return {
+            'resume_id': resume_id,
+            'metadata': metadata,
+            'final_score': None,
+            'semantic_score': round(semantic_score, 3),
+            'llm_score': None,
+            'llm_details': None,
+            'recommendation': "Not Screened - outside LLM shortlist",
+            'screened': False
+        }
+    
+    def _combine_scores(self, semantic_score: float, llm_score: float, skill: Dict = None) -> float:
+        """
+        Weighted final score
+        
+        With SKILL_MATCH_WEIGHT > 0 the skill overlap is a third component and
+        the weights in use are normalized to sum to 1; otherwise the score is
+        semantic_score * SEMANTIC_SEARCH_WEIGHT + llm_score * LLM_WEIGHT.
+        """
+        final_score = semantic_score * config.SEMANTIC_SEARCH_WEIGHT + llm_score * config.LLM_WEIGHT
+        if config.SKILL_MATCH_WEIGHT <= 0:
+            return final_score
+        total_weight = config.SEMANTIC_SEARCH_WEIGHT + config.LLM_WEIGHT
+        if skill is not None and skill['score'] is not None:
+            final_score += skill['score'] * config.SKILL_MATCH_WEIGHT
+            total_weight += config.SKILL_MATCH_WEIGHT
+        return final_score / total_weight
+    
+    def _weights(self) -> Dict:
+        weights = {
+            'semantic_search': config.SEMANTIC_SEARCH_WEIGHT,
+            'llm': config.LLM_WEIGHT
+        }
+        if config.SKILL_MATCH_WEIGHT > 0:
+            weights['skill_match'] = config.SKILL_MATCH_WEIGHT
+        return weights
+    
+    def _add_skill_fields(self, result: Dict, skill: Dict = None) -> Dict:
+        if skill is not None:
+            result['skill_score'] = round(skill['score'], 3) if skill['score'] is not None else None
+            result['skill_overlap'] = {key: value for key, value in skill.items() if key != 'score'}
+        return result
+    
+    def _build_result(self, semantic_score: float, llm_result: Dict, skill: Dict = None) -> Dict:
+        """Combine semantic, LLM and (optionally) skill scores into a screening result"""
+        llm_score = llm_result['score']
+        if llm_score is None:
+            return self._degraded_result(semantic_score, llm_result, skill)
+        
+        final_score = self._combine_scores(semantic_score, llm_score, skill)
+        
+        recommendation = self._generate_recommendation(final_score)
+        
+        return self._add_skill_fields({
+            'final_score': round(final_score, 3),
+            'semantic_score': round(semantic_score, 3),
+            'llm_score': round(llm_score, 3),
+            'llm_details': llm_result,
+            'recommendation': recommendation,
+            'llm_skipped': False,
+            'weights': self._weights()
+        }, skill)
+    
+    def _degraded_result(self, semantic_score: float, llm_result: Dict, skill: Dict = None) -> Dict:
+        """
+        Screening result for a resume whose LLM evaluation failed
+        
+        The final score leaves the LLM out (semantic score, plus the skill
+        overlap when it is weighted) and the result is flagged 'llm_degraded'.
+        """
+        self._count('llm_degraded')
+        final_score = semantic_score
+        if config.SKILL_MATCH_WEIGHT > 0 and skill is not None and skill['score'] is not None:
+            final_score = (
+                (semantic_score * config.SEMANTIC_SEARCH_WEIGHT + skill['score'] * config.SKILL_MATCH_WEIGHT)
+                / (config.SEMANTIC_SEARCH_WEIGHT + config.SKILL_MATCH_WEIGHT)
+            )
+        low, high = self._final_score_range(semantic_score, skill)
+        
+        return self._add_skill_fields({
+            'final_score': round(final_score, 3),
+            'final_score_range': [round(low, 3), round(high, 3)],
+            'semantic_score': round(semantic_score, 3),
+            'llm_score': None,
+            'llm_details': llm_result,
+            'recommendation': self._generate_recommendation(final_score),
+            'llm_skipped': False,
+            'llm_degraded': True,
+            'weights': self._weights()
+        }, skill)
+    
+    def _final_score_range(self, semantic_score: float, skill: Dict = None):
+        """Lowest and highest final score reachable for any LLM score in [0, 1]"""
+        return (self._combine_scores(semantic_score, 0.0, skill),
+                self._combine_scores(semantic_score, 1.0, skill))
+    
+    def _llm_skip_reason(self, semantic_score: float, bounded: bool = None,
+                         min_score: float = None, skill: Dict = None) -> str:
+        """Why the LLM call can be skipped for this semantic score, or None if it cannot"""
+        if skill is not None and skill['missing_required']:
+            return f"{MISSING_SKILLS_REASON}: {', '.join(skill['missing_required'])}"
+        if bounded is None:
+            bounded = config.BOUNDED_EVALUATION
+        if not bounded and min_score is None:
+            return None
+        
+        low, high = self._final_score_range(semantic_score, skill)
+        if min_score is not None and high < min_score:
+            return f"final score cannot reach the {min_score:.0%} cutoff"
+        # Buckets are contiguous, so equal end points mean the whole range shares one bucket
+        if self._generate_recommendation(low) == self._generate_recommendation(high):
+            return "recommendation is the same for any LLM score"
+        return None
+    
+    def _skipped_result(self, semantic_score: float, reason: str, min_score: float = None,
+                        skill: Dict = None) -> Dict:
+        """Screening result for a resume whose LLM evaluation was skipped"""
+        self._count('llm_calls_skipped')
+        low, high = self._final_score_range(semantic_score, skill)
+        # Report the midpoint, i.e. a neutral 0.5 LLM score (the evaluator's own default)
+        final_score = (low + high) / 2
+        
+        filtered = reason.startswith(MISSING_SKILLS_REASON)
+        if filtered:
+            recommendation = "Not Recommended - Missing required skills"
+        elif min_score is not None and high < min_score:
+            recommendation = "Not Recommended - Below cutoff"
+        else:
+            recommendation = self._generate_recommendation(final_score)
+        
+        return self._add_skill_fields({
+            'final_score': round(final_score, 3),
+            'final_score_range': [round(low, 3), round(high, 3)],
+            'semantic_score': round(semantic_score, 3),
+            'llm_score': None,
+            'llm_details': {
+                'score': None,
+                'reasoning': f"LLM evaluation skipped: {reason}",
+                'matched_skills': skill['matched_skills'] if skill else [],
+                'missing_skills': skill['missing_skills'] if skill else []
+            },
+            'recommendation': recommendation,
+            'llm_skipped': True,
+            'skills_filtered': filtered,
+            'weights': self._weights()
+        }, skill)
+    
+    def get_stats(self) -> Dict:
+        """Counters for LLM evaluations made and avoided, and the model requests behind them"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        evaluator_stats = self.llm_evaluator.get_stats()
+        stats['llm_requests'] = evaluator_stats['requests']
+        stats['llm_prompt_tokens'] = evaluator_stats['prompt_tokens']
+        stats['llm_completion_tokens'] = evaluator_stats['completion_tokens']
+        total = stats['llm_calls'] + stats['llm_calls_skipped']
+        stats['llm_skip_rate'] = stats['llm_calls_skipped'] / total if total else 0.0
+        return stats
+    
     def _generate_recommendation(self, score: float) -> str:
         """Generate recommendation based on final score"""
         if score >= 0.8:
@@ -99,10 +769,38 @@ class RAGResumeScreener:
         else:
             return "Not Recommended - Poor match"
     
-    def add_resume_to_index(self, resume_id: str, resume_text: str, metadata: Dict = None):
-        """Add a resume to the vector store for future searches"""
+    def add_resume_to_index(self, resume_id: str, resume_text: str, metadata: Dict = None) -> Optional[Dict]:
+        """
+        Add a resume to the vector store for future searches
+        
+        Returns:
+            {'duplicate_of', 'similarity'} when the resume is a near-duplicate of an
+            indexed one; it is then linked to the original instead of being embedded,
+            and rank_candidates lists it with the original's scores
+        """
+        dedup_index = self.dedup_index
+        if dedup_index is None:
+            self.vector_store.add_resume(resume_id, resume_text, metadata)
+            return None
+        
+        signature = dedup_index.signature(resume_text)
+        duplicate = dedup_index.find(signature, exclude_id=resume_id)
+        if duplicate:
+            # An earlier version of this resume may have been stored as an original
+            self.vector_store.delete_resumes([resume_id])
+            dedup_index.add(resume_id, signature, duplicate, metadata)
+            self._count('duplicates_collapsed')
+            return duplicate
         self.vector_store.add_resume(resume_id, resume_text, metadata)
+        # Indexed only once its vectors are stored, so copies never link to a missing resume
+        if signature is not None:
+            dedup_index.add(resume_id, signature)
+        return None
     
     def add_job_to_index(self, job_id: str, job_description: str, metadata: Dict = None):
         """Add a job description to the vector store"""
         self.vector_store.add_job_description(job_id, job_description, metadata)
+    
+    def top_jobs_for_resume(self, resume_text: str, top_k: int = 5) -> List[Dict]:
+        """Find the indexed job descriptions that best match a resume"""
+        return self.vector_store.top_jobs_for_resume(resume_text, top_k)
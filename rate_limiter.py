@@ -0,0 +1,91 @@
+"""
+Token-bucket rate limiting for concurrent LLM requests
+"""
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """A bucket holding up to `capacity` units, refilled continuously at `rate` units per second"""
+    
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.available = float(capacity)
+        self.updated_at = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+    
+    def take(self, amount: float):
+        """Remove `amount` units; callers check wait_time() first"""
+        self.available -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute plus tokens-per-minute limiter for LLM calls
+    
+    A request waits until both buckets can cover it, so a batch runs at the
+    speed of the quota instead of tripping 429s. A limit of 0 or None disables
+    that bucket.
+    """
+    
+    def __init__(self, requests_per_minute: float = None, tokens_per_minute: float = None):
+        self.request_bucket = (
+            TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+            if requests_per_minute else None
+        )
+        self.token_bucket = (
+            TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+            if tokens_per_minute else None
+        )
+        # Buckets may be shared by event loops running in different threads
+        self._lock = threading.Lock()
+    
+    def _try_acquire(self, tokens: int) -> float:
+        """Take one request and `tokens` tokens if possible; otherwise return seconds to wait"""
+        with self._lock:
+            wait = 0.0
+            if self.request_bucket:
+                wait = max(wait, self.request_bucket.wait_time(1))
+            if self.token_bucket:
+                wait = max(wait, self.token_bucket.wait_time(tokens))
+            if wait > 0:
+                return wait
+            if self.request_bucket:
+                self.request_bucket.take(1)
+            if self.token_bucket:
+                self.token_bucket.take(tokens)
+            return 0.0
+    
+    def try_acquire(self, tokens: int = 0) -> bool:
+        """Take one request of roughly `tokens` tokens only if it fits in the quota right now"""
+        return self._try_acquire(tokens) <= 0
+    
+    def acquire_blocking(self, tokens: int = 0):
+        """Synchronous version of acquire, sleeping the calling thread"""
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+    
+    async def acquire(self, tokens: int = 0):
+        """Wait until one request of roughly `tokens` tokens fits in the quota"""
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
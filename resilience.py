@@ -0,0 +1,418 @@
+"""
+Tail-latency control for LLM calls
+
+ResilientCaller wraps one model request with:
+- a per-attempt timeout and an overall deadline covering every retry
+- exponential backoff with full jitter, waiting at least as long as the
+  server's retry-after hint
+- optional hedging: when an attempt is slower than the recent p95 latency,
+  a duplicate request is sent and the first reply wins
+- a circuit breaker that fails fast while the API keeps failing
+
+Errors that retrying cannot fix (e.g. an invalid request) are raised as they
+are; everything else ends in LLMUnavailableError once the retries, the
+deadline or the breaker say so.
+"""
+import asyncio
+import collections
+import concurrent.futures
+import random
+import re
+import threading
+import time
+from typing import Callable, Optional, Tuple
+import config
+import metrics
+
+# HTTP statuses worth retrying (timeouts, rate limits, server errors)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# Exception class names used by the Google client libraries for the same conditions
+RETRYABLE_ERROR_NAMES = {
+    'ResourceExhausted', 'ServiceUnavailable', 'DeadlineExceeded', 'InternalServerError',
+    'TooManyRequests', 'GatewayTimeout', 'ServerError', 'RateLimitError'
+}
+
+_RETRY_DELAY_PATTERN = re.compile(
+    r'(?:retry[_ -]?delay|retry[_ -]?after|retry in)\W*(?:seconds\W*)?(\d+(?:\.\d+)?)\s*s?', re.IGNORECASE
+)
+
+
+class LLMUnavailableError(RuntimeError):
+    """The model could not be reached within the retry budget, or the circuit breaker is open"""
+    
+    def __init__(self, message: str, cause: Exception = None):
+        super().__init__(message)
+        self.cause = cause
+
+
+def status_code(error: Exception) -> Optional[int]:
+    """HTTP status carried by a client exception, if any"""
+    for attr in ('status_code', 'code', 'status'):
+        value = getattr(error, attr, None)
+        if callable(value):
+            try:
+                value = value()
+            except Exception:
+                continue
+        value = getattr(value, 'value', value)
+        if isinstance(value, int) and 100 <= value < 600:
+            return value
+    response = getattr(error, 'response', None)
+    value = getattr(response, 'status_code', None)
+    return value if isinstance(value, int) else None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed request is worth sending again"""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    # Programming and validation errors fail the same way every time
+    return not isinstance(error, (ValueError, TypeError, KeyError, AttributeError))
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait before retrying, if it said"""
+    value = getattr(error, 'retry_after', None)
+    if value is None:
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+        if headers is not None:
+            try:
+                value = headers.get('retry-after') or headers.get('Retry-After')
+            except Exception:
+                value = None
+    if value is not None:
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass
+    match = _RETRY_DELAY_PATTERN.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+    
+    After `failure_threshold` failed attempts in a row the breaker opens and
+    every call fails fast for `reset_seconds`. Then one probe request is let
+    through (half-open): success closes the breaker, failure opens it again.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int = None, reset_seconds: float = None):
+        self.failure_threshold = failure_threshold or config.LLM_BREAKER_FAILURE_THRESHOLD
+        self.reset_seconds = reset_seconds if reset_seconds is not None else config.LLM_BREAKER_RESET_SECONDS
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """Whether a request may be sent now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                metrics.count('circuit_breaker', transition='closed')
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or (
+                    self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                metrics.count('circuit_breaker', transition='open')
+    
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_seconds
+
+
+class LatencyTracker:
+    """Rolling window of successful request latencies"""
+    
+    def __init__(self, window: int = 200):
+        self.samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def add(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+    
+    def percentile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        """q-quantile of the window, or None with fewer than min_samples samples"""
+        with self._lock:
+            if len(self.samples) < max(min_samples, 1):
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ResilientCaller:
+    """Runs model requests with timeouts, jittered retries, hedging and a circuit breaker"""
+    
+    def __init__(self, max_retries: int = None, attempt_timeout: float = None,
+                 deadline: float = None, hedge: bool = None,
+                 breaker: CircuitBreaker = None, seed: int = None):
+        """
+        Args:
+            max_retries: Retries after the first attempt (defaults to config.LLM_MAX_RETRIES)
+            attempt_timeout: Seconds allowed per attempt (defaults to config.LLM_ATTEMPT_TIMEOUT_SECONDS)
+            deadline: Seconds allowed for all attempts together (defaults to config.LLM_CALL_DEADLINE_SECONDS)
+            hedge: Send a duplicate request when an attempt passes the recent p95
+                latency (defaults to config.LLM_HEDGE_ENABLED)
+            breaker: Circuit breaker to use (defaults to a new one from config)
+            seed: Seed for the backoff jitter
+        """
+        self.max_retries = max_retries if max_retries is not None else config.LLM_MAX_RETRIES
+        self.attempt_timeout = attempt_timeout or config.LLM_ATTEMPT_TIMEOUT_SECONDS
+        self.deadline = deadline or config.LLM_CALL_DEADLINE_SECONDS
+        self.hedge = config.LLM_HEDGE_ENABLED if hedge is None else hedge
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = LatencyTracker()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        # Synchronous attempts run here so a hung request cannot outlive its timeout for the caller
+        self._executor = None
+        self._executor_lock = threading.Lock()
+    
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's retry-after"""
+        cap = min(config.LLM_BACKOFF_MAX_SECONDS, config.LLM_BACKOFF_BASE_SECONDS * 2 ** attempt)
+        with self._rng_lock:
+            delay = self._rng.uniform(0, cap)
+        hint = retry_after(error)
+        return max(delay, hint) if hint is not None else delay
+    
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge:
+            return None
+        return self.latencies.percentile(config.LLM_HEDGE_PERCENTILE, config.LLM_HEDGE_MIN_SAMPLES)
+    
+    def _failed(self, error: Exception) -> bool:
+        """Record a failed attempt; returns whether it may be retried"""
+        if not is_retryable(error):
+            # The API answered, it just rejected this request
+            self.breaker.record_success()
+            return False
+        self.breaker.record_failure()
+        if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+            metrics.count('llm_timeouts')
+        return True
+    
+    def _unavailable(self, attempts: int, last_error: Exception) -> LLMUnavailableError:
+        metrics.count('llm_unavailable')
+        if last_error is None:
+            return LLMUnavailableError("LLM circuit breaker is open")
+        return LLMUnavailableError(
+            f"LLM call failed after {attempts} attempt(s): {last_error}", last_error
+        )
+    
+    # Synchronous calls
+    
+    def call(self, function: Callable, before_retry: Callable = None,
+             can_hedge: Callable[[], bool] = None):
+        """
+        Call function() (one model request) with retries
+        
+        Args:
+            function: Sends one model request and returns its reply
+            before_retry: Called (and may block) before each retry (e.g. rate limiting)
+            can_hedge: Whether a hedged duplicate may be sent right now (e.g. quota left)
+        
+        Raises:
+            LLMUnavailableError: When the retries or deadline run out, or the breaker is open
+        """
+        deadline = time.monotonic() + self.deadline
+        last_error = None
+        attempt = 0
+        while attempt <= self.max_retries:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.breaker.allow():
+                break
+            if attempt and before_retry is not None:
+                before_retry()
+            attempt += 1
+            try:
+                result = self._attempt(function, deadline, can_hedge)
+            except Exception as e:
+                if not self._failed(e):
+                    raise
+                last_error = e
+                delay = self._backoff(attempt - 1, e)
+                if attempt > self.max_retries or delay >= deadline - time.monotonic():
+                    break
+                metrics.count('llm_retries')
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+        raise self._unavailable(attempt, last_error)
+    
+    def _submit(self, function: Callable) -> Tuple[concurrent.futures.Future, threading.Event]:
+        """Run function() on the executor; the event is set once a thread picks it up"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=config.LLM_MAX_CONCURRENCY * 2, thread_name_prefix='llm-call'
+                    )
+        
+        started = threading.Event()
+        
+        def timed():
+            started.set()
+            start = time.perf_counter()
+            result = function()
+            self.latencies.add(time.perf_counter() - start)
+            return result
+        
+        return self._executor.submit(timed), started
+    
+    def _attempt(self, function: Callable, deadline: float, can_hedge: Callable = None):
+        first, started = self._submit(function)
+        # Threads of timed-out attempts stay busy until their request returns, so
+        # the attempt may queue; its timeout only starts once a thread runs it
+        if not started.wait(max(deadline - time.monotonic(), 0)):
+            first.cancel()
+            raise TimeoutError("No free thread to send the model request before the deadline")
+        start = time.monotonic()
+        timeout = min(self.attempt_timeout, deadline - start)
+        futures = [first]
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is not None and hedge_delay < timeout:
+            done, _ = concurrent.futures.wait(futures, timeout=hedge_delay)
+            if not done and (can_hedge is None or can_hedge()):
+                metrics.count('llm_hedges', outcome='sent')
+                futures.append(self._submit(function)[0])
+        
+        pending = set(futures)
+        last_error = None
+        while pending:
+            remaining = timeout - (time.monotonic() - start)
+            done, pending = concurrent.futures.wait(
+                pending, timeout=max(remaining, 0), return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is not first:
+                        metrics.count('llm_hedges', outcome='won')
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                last_error = future.exception()
+        if last_error is not None and not pending:
+            raise last_error
+        raise TimeoutError(f"No response from the model within {timeout:.1f}s")
+    
+    # Asynchronous calls
+    
+    async def acall(self, function: Callable, before_retry: Callable = None,
+                    can_hedge: Callable[[], bool] = None):
+        """
+        Async version of call
+        
+        Args:
+            function: Returns a new awaitable model request each time it is called
+            before_retry: Coroutine function awaited before each retry (e.g. rate limiting)
+            can_hedge: Whether a hedged duplicate may be sent right now (e.g. quota left)
+        
+        Raises:
+            LLMUnavailableError: When the retries or deadline run out, or the breaker is open
+        """
+        deadline = time.monotonic() + self.deadline
+        last_error = None
+        attempt = 0
+        while attempt <= self.max_retries:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.breaker.allow():
+                break
+            if attempt and before_retry is not None:
+                await before_retry()
+            attempt += 1
+            try:
+                result = await self._attempt_async(
+                    function, min(self.attempt_timeout, deadline - time.monotonic()), can_hedge
+                )
+            except Exception as e:
+                if not self._failed(e):
+                    raise
+                last_error = e
+                delay = self._backoff(attempt - 1, e)
+                if attempt > self.max_retries or delay >= deadline - time.monotonic():
+                    break
+                metrics.count('llm_retries')
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+        raise self._unavailable(attempt, last_error)
+    
+    async def _timed(self, function: Callable):
+        start = time.perf_counter()
+        result = await function()
+        self.latencies.add(time.perf_counter() - start)
+        return result
+    
+    async def _attempt_async(self, function: Callable, timeout: float, can_hedge: Callable = None):
+        start = time.monotonic()
+        first = asyncio.ensure_future(self._timed(function))
+        tasks = [first]
+        try:
+            hedge_delay = self._hedge_delay()
+            if hedge_delay is not None and hedge_delay < timeout:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                if not done and (can_hedge is None or can_hedge()):
+                    metrics.count('llm_hedges', outcome='sent')
+                    tasks.append(asyncio.ensure_future(self._timed(function)))
+            
+            pending = set(tasks)
+            last_error = None
+            while pending:
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            metrics.count('llm_hedges', outcome='won')
+                        return task.result()
+                    last_error = task.exception()
+            if last_error is not None and not pending:
+                raise last_error
+            raise TimeoutError(f"No response from the model within {timeout:.1f}s")
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
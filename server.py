@@ -0,0 +1,336 @@
+"""
+Async HTTP screening service
+
+Wraps one shared RAGResumeScreener for callers such as an ATS:
+- POST /screen  {"resume_text", "job_description", ...options}
+- POST /batch   {"resumes": [{"id", "text"}], "job_description", ...options}
+- POST /rank    {"job_description", "shortlist_k", "final_k"}
+- GET  /health  queue depth, capacity and LLM circuit breaker state
+- GET  /metrics Prometheus text (see metrics.py)
+
+Screening calls run on a thread pool of config.SERVER_WORKERS threads and
+share one embedding model, wrapped in a MicroBatchEncoder so concurrent
+requests are embedded together. Identical requests already in flight are
+coalesced onto the running one, and once config.SERVER_MAX_QUEUE requests
+are admitted new ones get 503 with a Retry-After header.
+
+Run with `python main.py serve` (or `python server.py`).
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import functools
+import json
+import threading
+from typing import Callable, Dict
+import numpy as np
+from aiohttp import web
+import config
+import metrics
+from llm_cache import content_hash
+from resilience import LLMUnavailableError
+from utils import clean_text
+
+# Request fields passed through to the screener, per endpoint
+SCREEN_OPTIONS = ('bounded', 'min_score', 'trim_context', 'use_profile', 'required_skills')
+BATCH_OPTIONS = SCREEN_OPTIONS + ('packed', 'dedup')
+RANK_OPTIONS = ('shortlist_k', 'final_k')
+TEXT_FIELDS = ('resume_text', 'job_description')
+
+# Expected type of each option: a check and its description for error messages
+OPTION_TYPES = {
+    'bounded': (lambda value: isinstance(value, bool), "a boolean"),
+    'trim_context': (lambda value: isinstance(value, bool), "a boolean"),
+    'use_profile': (lambda value: isinstance(value, bool), "a boolean"),
+    'packed': (lambda value: isinstance(value, bool), "a boolean"),
+    'dedup': (lambda value: isinstance(value, bool), "a boolean"),
+    'min_score': (lambda value: isinstance(value, (int, float)) and not isinstance(value, bool)
+                  and 0 <= value <= 1, "a number between 0 and 1"),
+    'required_skills': (lambda value: isinstance(value, list) and all(isinstance(skill, str) for skill in value),
+                        "a list of strings"),
+    'shortlist_k': (lambda value: isinstance(value, int) and not isinstance(value, bool) and value > 0,
+                    "a positive integer"),
+    'final_k': (lambda value: isinstance(value, int) and not isinstance(value, bool) and value > 0,
+                "a positive integer")
+}
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_response(data, status: int = 200, headers: Dict = None) -> web.Response:
+    return web.json_response(data, status=status, headers=headers,
+                             dumps=functools.partial(json.dumps, default=_json_default))
+
+
+def create_screener():
+    """RAGResumeScreener whose embedding model batches concurrent requests"""
+    from embedding_engine import MicroBatchEncoder, load_embedding_model
+    from rag_pipeline import RAGResumeScreener
+    from vector_store import VectorStore
+    
+    # The encoder wraps the configured model, so its embedding cache stays valid
+    vector_store = VectorStore(embedding_model=MicroBatchEncoder(load_embedding_model()),
+                               use_cache=config.EMBEDDING_CACHE_ENABLED)
+    return RAGResumeScreener(vector_store=vector_store)
+
+
+class ScreeningService:
+    """Admission control, request coalescing and the worker pool around one screener"""
+    
+    def __init__(self, screener, workers: int = None, max_queue: int = None):
+        """
+        Args:
+            screener: RAGResumeScreener shared by every request
+            workers: Screening calls run at once (defaults to config.SERVER_WORKERS)
+            max_queue: Admitted requests before 503s (defaults to config.SERVER_MAX_QUEUE)
+        """
+        self.screener = screener
+        self.workers = workers or config.SERVER_WORKERS
+        self.max_queue = max_queue or config.SERVER_MAX_QUEUE
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='screen'
+        )
+        # In-flight calls by request key; only touched from the event loop
+        self._in_flight = {}
+        self.admitted = 0
+        self.running = 0
+        self._running_lock = threading.Lock()
+        self.stats = {'requests': 0, 'coalesced': 0, 'rejected': 0, 'errors': 0}
+    
+    def queue_depth(self) -> int:
+        """Admitted requests still waiting for a worker"""
+        with self._running_lock:
+            return self.admitted - self.running
+    
+    def _run(self, function: Callable):
+        with self._running_lock:
+            self.running += 1
+        try:
+            return function()
+        finally:
+            with self._running_lock:
+                self.running -= 1
+    
+    def _finished(self, key: str, future: asyncio.Future):
+        self._in_flight.pop(key, None)
+        with self._running_lock:
+            self.admitted -= 1
+        if not future.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            future.exception()
+    
+    async def submit(self, key: str, function: Callable):
+        """
+        Run function() on the worker pool, or join an identical call in flight
+        
+        Raises:
+            web.HTTPServiceUnavailable: When the queue is full
+        """
+        self.stats['requests'] += 1
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            metrics.count('server_requests', outcome='coalesced')
+        else:
+            if self.admitted >= self.max_queue:
+                self.stats['rejected'] += 1
+                metrics.count('server_requests', outcome='rejected')
+                raise web.HTTPServiceUnavailable(
+                    text=json.dumps({'error': 'Server busy, retry later', 'queue_depth': self.queue_depth()}),
+                    content_type='application/json',
+                    headers={'Retry-After': '1'}
+                )
+            with self._running_lock:
+                self.admitted += 1
+            metrics.count('server_requests', outcome='admitted')
+            future = asyncio.get_running_loop().run_in_executor(self.executor, self._run, function)
+            future.add_done_callback(functools.partial(self._finished, key))
+            self._in_flight[key] = future
+        # A client that disconnects must not cancel the call shared with others
+        return await asyncio.shield(future)
+    
+    def health(self) -> Dict:
+        breaker = self.screener.llm_evaluator.resilience.breaker
+        encoder = self.screener.vector_store.embedding_model
+        with self._running_lock:
+            admitted, running = self.admitted, self.running
+        return {
+            'status': 'degraded' if breaker.is_open() else 'ok',
+            'queue_depth': admitted - running,
+            'running': running,
+            'workers': self.workers,
+            'capacity': self.max_queue,
+            'llm_circuit': breaker.state,
+            'encoder': dict(getattr(encoder, 'stats', None) or {}),
+            **self.stats
+        }
+    
+    def close(self):
+        self.executor.shutdown(wait=False)
+        encoder = self.screener.vector_store.embedding_model
+        if hasattr(encoder, 'close'):
+            encoder.close()
+
+
+# Application key of the ScreeningService shared by the handlers
+SERVICE_KEY = web.AppKey('service', ScreeningService)
+
+
+def request_key(endpoint: str, *parts) -> str:
+    """Key under which identical in-flight requests are coalesced"""
+    return content_hash(json.dumps([endpoint, *parts], sort_keys=True, default=str))
+
+
+def bad_request(message: str) -> web.HTTPBadRequest:
+    return web.HTTPBadRequest(text=json.dumps({'error': message}), content_type='application/json')
+
+
+async def read_json(request: web.Request, required: tuple) -> Dict:
+    try:
+        body = await request.json()
+    except (ValueError, UnicodeDecodeError):
+        raise bad_request('Body must be JSON')
+    if not isinstance(body, dict):
+        raise bad_request('Body must be a JSON object')
+    missing = [field for field in required if not body.get(field)]
+    if missing:
+        raise bad_request(f"Missing field(s): {', '.join(missing)}")
+    not_text = [field for field in required if field in TEXT_FIELDS and not isinstance(body[field], str)]
+    if not_text:
+        raise bad_request(f"Field(s) must be strings: {', '.join(not_text)}")
+    return body
+
+
+def options(body: Dict, names: tuple) -> Dict:
+    """
+    Screening options given in a request body
+    
+    Raises:
+        web.HTTPBadRequest: If an option has the wrong type, so that errors
+            raised while screening are never blamed on the client
+    """
+    kwargs = {name: body[name] for name in names if body.get(name) is not None}
+    for name, value in kwargs.items():
+        check, expected = OPTION_TYPES[name]
+        if not check(value):
+            raise bad_request(f"'{name}' must be {expected}")
+    return kwargs
+
+
+async def run_screening(service: ScreeningService, key: str, function: Callable) -> web.Response:
+    try:
+        result = await service.submit(key, function)
+    except web.HTTPException:
+        raise
+    except LLMUnavailableError as e:
+        return json_response({'error': str(e)}, status=503, headers={'Retry-After': '5'})
+    except Exception as e:
+        service.stats['errors'] += 1
+        print(f"Error handling request: {str(e)}")
+        return json_response({'error': 'Internal error'}, status=500)
+    return json_response(result)
+
+
+async def handle_screen(request: web.Request) -> web.Response:
+    service = request.app[SERVICE_KEY]
+    body = await read_json(request, ('resume_text', 'job_description'))
+    kwargs = options(body, SCREEN_OPTIONS)
+    key = request_key('screen', content_hash(clean_text(body['resume_text'])),
+                      content_hash(clean_text(body['job_description'])), kwargs)
+    return await run_screening(service, key, lambda: service.screener.screen_resume(
+        body['resume_text'], body['job_description'], **kwargs
+    ))
+
+
+async def handle_batch(request: web.Request) -> web.Response:
+    service = request.app[SERVICE_KEY]
+    body = await read_json(request, ('resumes', 'job_description'))
+    resumes = body['resumes']
+    if not isinstance(resumes, list) or not all(
+            isinstance(r, dict) and r.get('text') and isinstance(r['text'], str) for r in resumes):
+        return json_response({'error': "'resumes' must be a list of objects with 'text'"}, status=400)
+    if len(resumes) > config.SERVER_MAX_BATCH_RESUMES:
+        return json_response(
+            {'error': f"At most {config.SERVER_MAX_BATCH_RESUMES} resumes per batch"}, status=413
+        )
+    kwargs = options(body, BATCH_OPTIONS)
+    key = request_key('batch', [[r.get('id'), content_hash(clean_text(r['text']))] for r in resumes],
+                      content_hash(clean_text(body['job_description'])), kwargs)
+    return await run_screening(service, key, lambda: {'results': service.screener.batch_screen_resumes(
+        resumes, body['job_description'], **kwargs
+    )})
+
+
+async def handle_rank(request: web.Request) -> web.Response:
+    service = request.app[SERVICE_KEY]
+    body = await read_json(request, ('job_description',))
+    kwargs = options(body, RANK_OPTIONS)
+    key = request_key('rank', content_hash(clean_text(body['job_description'])), kwargs)
+    return await run_screening(service, key, lambda: {'results': service.screener.rank_candidates(
+        body['job_description'], **kwargs
+    )})
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    return json_response(request.app[SERVICE_KEY].health())
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(text=metrics.to_prometheus(), content_type='text/plain')
+
+
+def create_app(screener=None, workers: int = None, max_queue: int = None) -> web.Application:
+    """
+    Build the aiohttp application
+    
+    Args:
+        screener: RAGResumeScreener to serve (defaults to create_screener())
+        workers: Screening calls run at once (defaults to config.SERVER_WORKERS)
+        max_queue: Admitted requests before 503s (defaults to config.SERVER_MAX_QUEUE)
+    """
+    service = ScreeningService(screener or create_screener(), workers, max_queue)
+    app = web.Application(client_max_size=32 * 1024 * 1024)
+    app[SERVICE_KEY] = service
+    app.router.add_post('/screen', handle_screen)
+    app.router.add_post('/batch', handle_batch)
+    app.router.add_post('/rank', handle_rank)
+    app.router.add_get('/health', handle_health)
+    app.router.add_get('/metrics', handle_metrics)
+    
+    async def warmup(app):
+        load_times = await asyncio.get_running_loop().run_in_executor(
+            service.executor, service.screener.warmup
+        )
+        print("Loaded " + ", ".join(f"{name} in {seconds:.2f}s" for name, seconds in load_times.items()))
+    
+    async def shutdown(app):
+        service.close()
+    
+    app.on_startup.append(warmup)
+    app.on_cleanup.append(shutdown)
+    return app
+
+
+def serve(host: str = None, port: int = None, workers: int = None, max_queue: int = None):
+    """Run the service until interrupted"""
+    web.run_app(
+        create_app(workers=workers, max_queue=max_queue),
+        host=host or config.SERVER_HOST,
+        port=port or config.SERVER_PORT
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI Resume Screener HTTP service")
+    parser.add_argument("--host", default=None, help=f"Bind address (default: {config.SERVER_HOST})")
+    parser.add_argument("--port", type=int, default=None, help=f"Port (default: {config.SERVER_PORT})")
+    parser.add_argument("--workers", type=int, default=None, help="Screening calls run at once")
+    parser.add_argument("--max-queue", type=int, default=None, help="Admitted requests before 503s")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.max_queue)
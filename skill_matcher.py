@@ -0,0 +1,180 @@
+"""
+Local skill extraction with a multi-pattern (Aho-Corasick) automaton
+
+Skills and their aliases come from a JSON taxonomy file
+(config.SKILL_TAXONOMY_PATH) mapping each canonical skill name to a list of
+aliases, or to {"aliases": [...], "ambiguous": true} for names that are also
+common words ("Rust", "Swift"). Text is tokenized once and scanned in a
+single pass over its tokens, so extraction cost does not grow with the size
+of the taxonomy.
+"""
+import json
+import re
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+import config
+
+# Tokens keep the symbols used in skill names (c++, c#, .net, node.js)
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#.]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of text (trailing periods dropped)"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        token = token.rstrip('.')
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over token sequences"""
+    
+    def __init__(self, patterns: Dict[Tuple[str, ...], str]):
+        """
+        Args:
+            patterns: Token sequence -> value reported when it occurs
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        
+        for tokens, value in patterns.items():
+            state = 0
+            for token in tokens:
+                if token not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][token] = len(self._goto) - 1
+                state = self._goto[state][token]
+            self._output[state].append((len(tokens), value))
+        
+        # Breadth-first construction of failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+    
+    def iter_matches(self, tokens: List[str]) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, value) for every pattern occurrence in tokens"""
+        state = 0
+        for i, token in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, value in self._output[state]:
+                yield i + 1 - length, i + 1, value
+
+
+class SkillMatcher:
+    """Extracts canonical skills from text using a skill/alias taxonomy"""
+    
+    def __init__(self, taxonomy: Dict = None, taxonomy_path: str = None):
+        """
+        Args:
+            taxonomy: Canonical skill -> aliases, or -> {'aliases': [...], 'ambiguous': True}
+                (loaded from taxonomy_path if not given)
+            taxonomy_path: JSON taxonomy file (defaults to config.SKILL_TAXONOMY_PATH)
+        """
+        if taxonomy is None:
+            with open(taxonomy_path or config.SKILL_TAXONOMY_PATH, encoding='utf-8') as f:
+                taxonomy = json.load(f)
+        
+        # Values are (skill, ambiguous); only the bare name of an ambiguous
+        # skill needs context, its aliases are qualified enough on their own
+        patterns = {}
+        for skill, entry in taxonomy.items():
+            if isinstance(entry, dict):
+                aliases, ambiguous = entry.get('aliases', []), entry.get('ambiguous', False)
+            else:
+                aliases, ambiguous = entry, False
+            for alias in [skill] + list(aliases):
+                tokens = tuple(tokenize(alias))
+                if tokens:
+                    patterns.setdefault(tokens, (skill, ambiguous and alias == skill))
+        self.skills = list(taxonomy)
+        self._automaton = AhoCorasick(patterns)
+        self._context_words = {word.lower() for word in config.SKILL_CONTEXT_WORDS}
+    
+    def extract(self, text: str) -> List[str]:
+        """
+        Canonical skills mentioned in text, in order of first mention
+        
+        An ambiguous skill name counts only with another skill or a context
+        word (config.SKILL_CONTEXT_WORDS) within config.SKILL_CONTEXT_WINDOW
+        tokens, so "Rust, Go and Python" matches but "rust on the pipes" does not.
+        """
+        tokens = tokenize(text)
+        matches = list(self._automaton.iter_matches(tokens))
+        anchors = [start for start, _, (_, ambiguous) in matches if not ambiguous]
+        anchors += [i for i, token in enumerate(tokens) if token in self._context_words]
+        
+        window = config.SKILL_CONTEXT_WINDOW
+        found = {}
+        for start, _, (skill, ambiguous) in matches:
+            if ambiguous and not any(abs(anchor - start) <= window for anchor in anchors):
+                continue
+            found.setdefault(skill, None)
+        return list(found)
+    
+    def canonical(self, name: str) -> Optional[str]:
+        """Canonical skill for a skill name or alias, or None if it is not in the taxonomy"""
+        tokens = tokenize(name)
+        for start, end, (skill, _) in self._automaton.iter_matches(tokens):
+            if start == 0 and end == len(tokens):
+                return skill
+        return None
+    
+    def overlap(self, resume_text: str, job_description: str,
+                required_skills: List[str] = None) -> Dict:
+        """
+        Skill overlap between a resume and a job description
+        
+        Args:
+            resume_text: The candidate's resume text
+            job_description: The job description text
+            required_skills: Hard requirements (names or aliases); skills outside
+                the taxonomy are ignored
+        
+        Returns:
+            Dictionary containing:
+            - job_skills: Skills mentioned in the job description
+            - matched_skills / missing_skills: Job skills found / not found in the resume
+            - missing_required: Required skills not found in the resume
+            - score: Fraction of job skills found (None if the job mentions none)
+        """
+        resume_skills = set(self.extract(resume_text))
+        job_skills = self.extract(job_description)
+        required = [self.canonical(skill) for skill in required_skills or []]
+        
+        matched = [skill for skill in job_skills if skill in resume_skills]
+        return {
+            'job_skills': job_skills,
+            'matched_skills': matched,
+            'missing_skills': [skill for skill in job_skills if skill not in resume_skills],
+            'missing_required': [skill for skill in dict.fromkeys(required) if skill and skill not in resume_skills],
+            'score': len(matched) / len(job_skills) if job_skills else None
+        }
+
+
+_default_matcher = None
+_default_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """Shared SkillMatcher for config.SKILL_TAXONOMY_PATH, built on first use"""
+    global _default_matcher
+    if _default_matcher is None:
+        with _default_matcher_lock:
+            if _default_matcher is None:
+                _default_matcher = SkillMatcher()
+    return _default_matcher
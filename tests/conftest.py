@@ -0,0 +1,28 @@
+"""
+Shared test setup
+
+The top-level modules and benchmarks/fakes.py are made importable, and
+every on-disk store is pointed at the test's temporary directory.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+sys.path.insert(0, ROOT)
+
+import pytest
+import config
+
+
+@pytest.fixture(autouse=True)
+def isolated_paths(tmp_path, monkeypatch):
+    """Keep every on-disk store of a test in its own scratch directory"""
+    monkeypatch.setattr(config, 'VECTOR_DB_PATH', str(tmp_path / 'vector_db'))
+    monkeypatch.setattr(config, 'NUMPY_INDEX_PATH', str(tmp_path / 'vector_db_numpy'))
+    monkeypatch.setattr(config, 'EMBEDDING_CACHE_DIR', str(tmp_path / 'embeddings'))
+    monkeypatch.setattr(config, 'INGEST_CHECKPOINT_PATH', str(tmp_path / 'ingest_checkpoint.jsonl'))
+    monkeypatch.setattr(config, 'DEDUP_INDEX_PATH', str(tmp_path / 'dedup.sqlite3'))
+    monkeypatch.setattr(config, 'LLM_CACHE_PATH', str(tmp_path / 'llm_cache.sqlite3'))
+    monkeypatch.setattr(config, 'WORK_QUEUE_PATH', str(tmp_path / 'work_queue.sqlite3'))
+    return tmp_path
@@ -0,0 +1,57 @@
+"""Retrieval-based trimming of the resume text sent to the LLM"""
+import config
+from context_builder import OMISSION_MARKER, split_requirements, trim_context
+from fakes import FakeChatModel, FakeEmbeddingModel
+from llm_evaluator import LLMEvaluator
+from rag_pipeline import RAGResumeScreener
+from vector_store import VectorStore
+
+JOB = "Platform engineer\n- Operate Kubernetes clusters with Terraform\n- Five years of on-call experience"
+RELEVANT = " ".join(["Operated Kubernetes clusters with Terraform on-call"] * 10)
+# Passages of CONTEXT_PASSAGE_WORDS (60) words; only the middle one matches the job
+RESUME = "\n\n".join(
+    [" ".join(f"before{n}word{i}" for i in range(60)) for n in range(4)] + [RELEVANT]
+    + [" ".join(f"after{n}word{i}" for i in range(60)) for n in range(4)]
+)
+
+
+def make_store() -> VectorStore:
+    return VectorStore(embedding_model=FakeEmbeddingModel(64))
+
+
+def test_split_requirements_drops_bullets_and_short_lines():
+    assert split_requirements(JOB) == ["Operate Kubernetes clusters with Terraform", "Five years of on-call experience"]
+    assert split_requirements("Go dev") == ["Go dev"]
+
+
+def test_short_resumes_are_left_alone():
+    context = trim_context("Kubernetes and Terraform engineer", JOB, make_store())
+    assert context['text'] == "Kubernetes and Terraform engineer"
+    assert context['tokens_after'] == context['tokens_before']
+
+
+def test_long_resumes_keep_the_most_relevant_passages_in_order():
+    context = trim_context(RESUME, JOB, make_store(), token_budget=150)
+    assert context['text'] == f"{OMISSION_MARKER}\n{RELEVANT}\n{OMISSION_MARKER}"
+    assert context['tokens_after'] <= 150 < context['tokens_before']
+    assert (context['passages_kept'], context['passages_total']) == (1, 9)
+    
+    # A larger budget adds the next passages, still in resume order
+    text = trim_context(RESUME, JOB, make_store(), token_budget=400)['text']
+    pieces = [piece for piece in text.split('\n') if piece != OMISSION_MARKER]
+    assert RELEVANT in pieces and len(pieces) > 1
+    assert sorted(pieces, key=RESUME.index) == pieces
+
+
+def test_trimmed_screening_sends_fewer_prompt_tokens(monkeypatch):
+    monkeypatch.setattr(config, 'CONTEXT_TOKEN_BUDGET', 150)
+    full, trimmed = (
+        RAGResumeScreener(make_store(), LLMEvaluator(llm=FakeChatModel(latency=0, jitter=0), use_cache=False))
+        for _ in range(2)
+    )
+    full.screen_resume(RESUME, JOB)
+    result = trimmed.screen_resume(RESUME, JOB, trim_context=True)
+    
+    assert result['context']['tokens_after'] <= 150
+    assert 'text' not in result['context']
+    assert trimmed.get_stats()['llm_prompt_tokens'] < full.get_stats()['llm_prompt_tokens']
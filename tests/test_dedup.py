@@ -0,0 +1,126 @@
+"""Near-duplicate resumes: MinHash index, batches, indexing, ingestion, ranking and the work queue"""
+import pytest
+import config
+from dedup import DedupIndex
+from fakes import FakeChatModel, FakeEmbeddingModel
+from ingest import ingest_directory
+from llm_evaluator import LLMEvaluator
+from rag_pipeline import RAGResumeScreener
+from vector_store import VectorStore
+from work_queue import WorkQueue
+
+JOB = "Senior Python engineer with Django, PostgreSQL and AWS"
+RESUME_A = ("Jane Doe. Senior software engineer with eight years of Python and Django experience, "
+            "building REST APIs on PostgreSQL, deploying to AWS with Docker and Terraform, "
+            "mentoring junior developers and leading code reviews across three product teams.")
+RESUME_B = RESUME_A.replace("three product teams.", "three product teams. References on request.")
+RESUME_C = ("John Smith. Java developer focused on Spring Boot microservices, Kafka streaming, "
+            "Oracle databases and on-premise deployments for banking clients since 2012.")
+
+
+def make_screener() -> RAGResumeScreener:
+    evaluator = LLMEvaluator(llm=FakeChatModel(latency=0, jitter=0), use_cache=False)
+    return RAGResumeScreener(VectorStore(embedding_model=FakeEmbeddingModel(64)), evaluator)
+
+
+def test_near_copy_found_and_distinct_resume_not():
+    index = DedupIndex(':memory:')
+    index.add('a', index.signature(RESUME_A))
+    match = index.find(index.signature(RESUME_B))
+    assert match['duplicate_of'] == 'a' and match['similarity'] >= config.DEDUP_THRESHOLD
+    assert index.find(index.signature(RESUME_C)) is None
+    assert index.find(index.signature(RESUME_A), exclude_id='a') is None
+
+
+def test_ranking_lists_indexed_near_duplicates():
+    screener = make_screener()
+    assert screener.add_resume_to_index('a', RESUME_A, {'name': 'A'}) is None
+    assert screener.add_resume_to_index('b', RESUME_B, {'name': 'B'})['duplicate_of'] == 'a'
+    assert screener.add_resume_to_index('c', RESUME_C) is None
+    
+    ranking = screener.rank_candidates(JOB, shortlist_k=1)
+    assert sorted(result['resume_id'] for result in ranking) == ['a', 'b', 'c']
+    by_id = {result['resume_id']: result for result in ranking}
+    assert by_id['b']['collapsed'] and by_id['b']['duplicate_of'] == 'a'
+    assert by_id['b']['metadata'] == {'name': 'B'}
+    assert by_id['b']['final_score'] == by_id['a']['final_score']
+    assert [result['resume_id'] for result in ranking].index('b') == \
+        [result['resume_id'] for result in ranking].index('a') + 1
+    # The copy reused the original's evaluation
+    assert screener.llm_evaluator.get_stats()['requests'] == 1
+
+
+def test_failed_write_does_not_index_original(monkeypatch):
+    screener = make_screener()
+    
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+    
+    with monkeypatch.context() as patched:
+        patched.setattr(screener.vector_store, 'add_resumes', fail)
+        with pytest.raises(OSError):
+            screener.add_resume_to_index('a', RESUME_A)
+    
+    # The copy is stored as an original instead of being linked to the missing resume
+    assert screener.add_resume_to_index('b', RESUME_B) is None
+    assert [result['resume_id'] for result in screener.rank_candidates(JOB)] == ['b']
+
+
+def test_ingest_links_duplicates_after_writing_originals(tmp_path):
+    resumes = tmp_path / 'resumes'
+    resumes.mkdir()
+    (resumes / 'a.txt').write_text(RESUME_A)
+    (resumes / 'b.txt').write_text(RESUME_B)
+    (resumes / 'c.txt').write_text(RESUME_C)
+    screener = make_screener()
+    
+    summary = ingest_directory(str(resumes), screener.vector_store, workers=1)
+    assert (summary['files_ingested'], summary['duplicates_collapsed']) == (2, 1)
+    assert summary['duplicates'][0]['duplicate_of'] == 'a.txt'
+    ranking = screener.rank_candidates(JOB)
+    assert sorted(result['resume_id'] for result in ranking) == ['a.txt', 'b.txt', 'c.txt']
+    assert {result['resume_id']: result for result in ranking}['b.txt']['metadata'] == {'source': 'b.txt'}
+
+
+def test_batch_screens_each_near_duplicate_once():
+    screener = make_screener()
+    resumes = [{'id': 'a', 'text': RESUME_A}, {'id': 'b', 'text': RESUME_B}, {'id': 'c', 'text': RESUME_C}]
+    results = {result['resume_id']: result for result in screener.batch_screen_resumes(resumes, JOB)}
+    
+    assert screener.llm_evaluator.get_stats()['requests'] == 2
+    assert results['b']['collapsed'] and results['b']['duplicate_of'] == 'a'
+    assert results['b']['final_score'] == results['a']['final_score']
+    assert 'duplicate_of' not in results['a'] and 'duplicate_of' not in results['c']
+    
+    screener = make_screener()
+    assert 'b' in {result['resume_id'] for result in screener.batch_screen_resumes(resumes, JOB, dedup=False)}
+    assert screener.llm_evaluator.get_stats()['requests'] == 3
+
+
+def test_work_queue_copies_the_first_copys_result():
+    queue = WorkQueue()
+    added = queue.enqueue([{'id': 'a', 'text': RESUME_A}, {'id': 'b', 'text': RESUME_B},
+                           {'id': 'c', 'text': RESUME_C}], JOB, batch_id='batch')
+    assert (added['added'], added['duplicates']) == (3, 1)
+    
+    claim = queue.claim('worker')
+    assert [task['resume_id'] for task in claim['tasks']] == ['a', 'c']
+    tasks = {task['resume_id']: task for task in claim['tasks']}
+    assert queue.complete('worker', tasks['a']['id'], {'resume_id': 'a', 'final_score': 0.7})
+    assert queue.complete('worker', tasks['c']['id'], {'resume_id': 'c', 'final_score': 0.4})
+    
+    results = {result['resume_id']: result for result in queue.results('batch')}
+    assert results['b']['final_score'] == 0.7
+    assert results['b']['collapsed'] and results['b']['duplicate_of'] == 'a'
+    assert queue.claim('worker') is None
+    queue.close()
+
+
+def test_work_queue_screens_duplicates_of_a_failed_task():
+    queue = WorkQueue()
+    queue.enqueue([{'id': 'a', 'text': RESUME_A}, {'id': 'b', 'text': RESUME_B}], JOB, batch_id='batch')
+    task = queue.claim('worker')['tasks'][0]
+    assert queue.fail('worker', task['id'], "boom", attempts=1, max_attempts=1) == 'failed'
+    
+    assert [task['resume_id'] for task in queue.claim('worker')['tasks']] == ['b']
+    queue.close()
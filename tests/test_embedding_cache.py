@@ -0,0 +1,51 @@
+"""Persistent embedding cache"""
+import numpy as np
+from embedding_cache import EmbeddingCache
+from fakes import FakeEmbeddingModel
+
+TEXTS = ["Python developer", "Java developer", "Python developer", "Data engineer"]
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.model = FakeEmbeddingModel(16)
+        self.texts = []
+    
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        return self.model.encode(texts)
+
+
+def test_encodes_each_text_once_and_reuses_vectors_across_instances(tmp_path):
+    encoder = CountingEncoder()
+    vectors = EmbeddingCache('model', str(tmp_path)).encode(TEXTS, encoder)
+    assert encoder.texts == ["Python developer", "Java developer", "Data engineer"]
+    np.testing.assert_array_equal(vectors, FakeEmbeddingModel(16).encode(TEXTS))
+    
+    cache = EmbeddingCache('model', str(tmp_path))
+    np.testing.assert_array_equal(cache.encode(TEXTS[::-1] + ["Go developer"], encoder),
+                                  FakeEmbeddingModel(16).encode(TEXTS[::-1] + ["Go developer"]))
+    assert encoder.texts[3:] == ["Go developer"]
+    assert cache.stats() == {'hits': 4, 'misses': 1, 'entries': 4}
+
+
+def test_models_have_separate_caches(tmp_path):
+    EmbeddingCache('model-a', str(tmp_path)).encode(TEXTS, CountingEncoder())
+    encoder = CountingEncoder()
+    EmbeddingCache('model-b', str(tmp_path)).encode(TEXTS[:1], encoder)
+    assert encoder.texts == TEXTS[:1]
+
+
+def test_orphan_rows_from_a_failed_append_are_overwritten(tmp_path):
+    cache = EmbeddingCache('model', str(tmp_path))
+    cache.encode(TEXTS[:1], CountingEncoder())
+    # Rows written to the vector file but never committed to the index
+    with open(cache.vectors_path, 'ab') as f:
+        f.write(np.ones((2, 16), dtype=np.float32).tobytes()[:-3])
+    
+    cache = EmbeddingCache('model', str(tmp_path))
+    cache.encode(TEXTS[1:2], CountingEncoder())
+    encoder = CountingEncoder()
+    vectors = EmbeddingCache('model', str(tmp_path)).encode(TEXTS[:2], encoder)
+    assert encoder.texts == []
+    np.testing.assert_array_equal(vectors, FakeEmbeddingModel(16).encode(TEXTS[:2]))
@@ -0,0 +1,59 @@
+"""Drift of the optimised embedding engines from full-precision PyTorch"""
+import numpy as np
+import pytest
+import config
+from embedding_engine import ENGINES, check_engine_parity, engine_drift, load_embedding_model
+from fakes import FakeEmbeddingModel
+
+
+class NoisyModel:
+    """Wraps a model and perturbs its embeddings"""
+    
+    def __init__(self, model, noise: float):
+        self.model = model
+        self.noise = noise
+    
+    def encode(self, texts, batch_size: int = 32, normalize_embeddings: bool = False, **kwargs):
+        vectors = self.model.encode(texts, batch_size=batch_size)
+        vectors = vectors + np.random.RandomState(0).normal(0, self.noise, vectors.shape).astype(np.float32)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+def test_identical_engine_has_no_drift():
+    model = FakeEmbeddingModel(dimension=64)
+    drift = engine_drift(model, model, ["python developer", "java developer"])
+    assert np.allclose(drift, 0.0, atol=1e-6)
+    assert check_engine_parity(model, "fake", reference=model)['mean_drift'] < 1e-6
+
+
+def test_excessive_drift_raises():
+    reference = FakeEmbeddingModel(dimension=64)
+    with pytest.raises(ValueError, match="drifts"):
+        check_engine_parity(NoisyModel(reference, noise=1.0), "noisy", reference=reference)
+
+
+def test_small_drift_within_limit():
+    reference = FakeEmbeddingModel(dimension=64)
+    result = check_engine_parity(NoisyModel(reference, noise=0.01), "noisy", reference=reference)
+    assert result['mean_drift'] <= config.EMBEDDING_MAX_DRIFT
+
+
+@pytest.fixture(scope="module")
+def torch_model():
+    try:
+        return load_embedding_model(config.EMBEDDING_MODEL, "torch")
+    except Exception as exc:
+        pytest.skip(f"embedding model unavailable: {exc}")
+
+
+@pytest.mark.parametrize("engine", [engine for engine in ENGINES if engine != "torch"])
+def test_engine_parity(engine, torch_model):
+    if engine == "onnx":
+        pytest.importorskip("onnxruntime")
+    try:
+        model = load_embedding_model(config.EMBEDDING_MODEL, engine)
+    except Exception as exc:
+        pytest.skip(f"{engine} engine unavailable: {exc}")
+    check_engine_parity(model, engine, reference=torch_model)
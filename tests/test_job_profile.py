@@ -0,0 +1,60 @@
+"""Job description profiles compiled once and reused across resumes"""
+from fakes import FakeChatModel, FakeEmbeddingModel
+from job_profile import match_skills, normalize_profile
+from llm_evaluator import LLMEvaluator
+from rag_pipeline import RAGResumeScreener
+from synthetic import generate_job_description, generate_resumes
+from vector_store import VectorStore
+
+JOB = generate_job_description(2)
+RESUMES = generate_resumes(5, 200, seed=2)
+
+
+def make_screener(llm: FakeChatModel) -> RAGResumeScreener:
+    return RAGResumeScreener(VectorStore(embedding_model=FakeEmbeddingModel(64)),
+                             LLMEvaluator(llm=llm, use_cache=True))
+
+
+def test_normalize_profile_cleans_the_llm_reply():
+    profile = normalize_profile({
+        'title': 'Data Engineer',
+        'required_skills': ['Python', ' python ', 'SQL', ''],
+        'nice_to_have_skills': ['sql', 'Airflow'],
+        'min_years_experience': '5',
+        'education': None
+    })
+    assert profile == {
+        'title': 'Data Engineer',
+        'required_skills': ['Python', 'SQL'],
+        'nice_to_have_skills': ['Airflow'],
+        'seniority': '',
+        'min_years_experience': 5.0,
+        'education': ''
+    }
+    assert normalize_profile({'required_skills': 'Python', 'min_years_experience': 'five'})['min_years_experience'] is None
+
+
+def test_skills_are_matched_by_name_without_the_llm():
+    screener = make_screener(FakeChatModel(latency=0, jitter=0))
+    profile = normalize_profile({'required_skills': ['Django', 'Kubernetes'], 'nice_to_have_skills': ['Redis']})
+    profile['skill_embeddings'] = screener.vector_store.embed(['Django', 'Kubernetes', 'Redis'])
+    
+    match = match_skills(["Built Django services backed by Redis"], profile, screener.vector_store)[0]
+    assert match['matched_skills'] == ['Django']
+    assert match['missing_skills'] == ['Kubernetes']
+    assert match['nice_to_have_matched'] == ['Redis']
+    assert match['required_coverage'] == 0.5
+
+
+def test_job_is_compiled_once_and_reused():
+    llm = FakeChatModel(latency=0, jitter=0)
+    results = make_screener(llm).batch_screen_resumes(RESUMES, JOB, use_profile=True, dedup=False)
+    assert llm.requests == 1 + len(RESUMES)
+    assert all('skill_match' in result and 'skill_match' not in result['llm_details'] for result in results)
+    
+    # The profile is cached on disk, and the evaluations with it
+    screener = make_screener(llm)
+    screener.batch_screen_resumes(RESUMES, JOB, use_profile=True, dedup=False)
+    screener.screen_resume(RESUMES[0]['text'], "  " + JOB, use_profile=True)
+    assert llm.requests == 1 + len(RESUMES)
+    assert screener.get_stats()['jobs_compiled'] == 1
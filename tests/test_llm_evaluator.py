@@ -0,0 +1,119 @@
+"""Concurrent, packed and cached LLM evaluation with the fake chat model"""
+import json
+import time
+import config
+import llm_cache
+from fakes import FakeChatModel, FakeMessage, _stable_score
+from llm_cache import LLMCache
+from llm_evaluator import LLMEvaluator
+from rate_limiter import RateLimiter
+from synthetic import generate_job_description, generate_resumes
+from utils import run_sync
+
+JOB = generate_job_description(1)
+RESUMES = [resume['text'] for resume in generate_resumes(8, 200, seed=1)]
+
+
+def test_evaluate_many_runs_concurrently_and_keeps_order():
+    llm = FakeChatModel(latency=0.2, jitter=0)
+    evaluator = LLMEvaluator(llm=llm, max_concurrency=8, use_cache=False)
+    
+    start = time.perf_counter()
+    results = run_sync(evaluator.evaluate_many([(resume, JOB) for resume in RESUMES]))
+    assert time.perf_counter() - start < 0.2 * len(RESUMES) / 2
+    assert llm.requests == len(RESUMES)
+    assert results == [evaluator.evaluate_match(resume, JOB) for resume in RESUMES]
+
+
+def test_rate_limiter_holds_requests_and_tokens_to_the_quota():
+    limiter = RateLimiter(requests_per_minute=3)
+    assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+    
+    limiter = RateLimiter(tokens_per_minute=600)
+    assert limiter.try_acquire(500)
+    assert not limiter.try_acquire(200)
+    assert limiter.try_acquire(90)
+    
+    # One request per second: the second acquire waits for the refill
+    limiter = RateLimiter(requests_per_minute=60)
+    for _ in range(60):
+        limiter.acquire_blocking()
+    start = time.perf_counter()
+    run_sync(limiter.acquire())
+    assert 0.5 < time.perf_counter() - start < 2
+
+
+def test_cached_evaluations_skip_the_model_across_evaluators():
+    llm = FakeChatModel(latency=0, jitter=0)
+    first = LLMEvaluator(llm=llm, use_cache=True).evaluate_match(RESUMES[0], JOB)
+    
+    evaluator = LLMEvaluator(llm=llm, use_cache=True)
+    assert evaluator.evaluate_match("  " + RESUMES[0].replace(" ", "  "), JOB) == first
+    assert run_sync(evaluator.evaluate_many([(RESUMES[0], JOB)])) == [first]
+    assert llm.requests == 1
+    assert evaluator.cache.stats()['hits'] == 2
+    
+    evaluator.evaluate_match(RESUMES[0], JOB, bypass_cache=True)
+    evaluator.evaluate_match(RESUMES[0], JOB + " Remote.")
+    assert llm.requests == 3
+
+
+def test_cache_key_depends_on_the_model_and_temperature(monkeypatch):
+    llm = FakeChatModel(latency=0, jitter=0)
+    evaluator = LLMEvaluator(llm=llm, use_cache=True)
+    evaluator.evaluate_match(RESUMES[0], JOB)
+    monkeypatch.setattr(config, 'TEMPERATURE', config.TEMPERATURE + 0.5)
+    evaluator.evaluate_match(RESUMES[0], JOB)
+    assert llm.requests == 2
+
+
+def test_cache_evicts_expired_and_oldest_entries(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: now[0])
+    cache = LLMCache(str(tmp_path / 'cache.sqlite3'), max_entries=2, max_age_days=1)
+    for n, key in enumerate(['a', 'b', 'c']):
+        now[0] += 1
+        cache.set(key, {'score': n})
+    cache.evict()
+    assert cache.get('a') is None
+    assert cache.get('c') == {'score': 2}
+    
+    now[0] += 86400 + 1
+    assert cache.get('c') is None
+    cache.evict()
+    assert cache.stats()['entries'] == 0
+
+
+class DroppingChatModel(FakeChatModel):
+    """Leaves the last resume out of every packed reply"""
+    
+    def _reply(self, messages) -> FakeMessage:
+        reply = super()._reply(messages)
+        content = json.loads(reply.content)
+        if isinstance(content, list):
+            reply.content = json.dumps(content[:-1])
+        return reply
+
+
+def test_packed_evaluation_groups_resumes_per_request(monkeypatch):
+    monkeypatch.setattr(config, 'LLM_PACKED_MAX_RESUMES', 3)
+    llm = FakeChatModel(latency=0, jitter=0)
+    evaluator = LLMEvaluator(llm=llm, use_cache=False)
+    results = run_sync(evaluator.evaluate_many([(resume, JOB) for resume in RESUMES], packed=True))
+    
+    assert llm.requests == evaluator.get_stats()['packed_requests'] == 3
+    assert all(result['score'] is not None and result['reasoning'] for result in results)
+    # The fake scores each packed resume by its own text
+    assert [result['score'] for result in results] == [_stable_score(resume) for resume in RESUMES]
+
+
+def test_packed_evaluation_retries_resumes_missing_from_the_reply(monkeypatch):
+    monkeypatch.setattr(config, 'LLM_PACKED_MAX_RESUMES', 4)
+    llm = DroppingChatModel(latency=0, jitter=0)
+    evaluator = LLMEvaluator(llm=llm, use_cache=False)
+    results = run_sync(evaluator.evaluate_packed(RESUMES, JOB))
+    
+    assert evaluator.get_stats()['packed_fallbacks'] == 2
+    assert llm.requests == 2 + 2
+    assert results[3] == evaluator.evaluate_match(RESUMES[3], JOB)
+    assert all(result['score'] is not None for result in results)
@@ -0,0 +1,81 @@
+"""Stage timings, counters and their exports"""
+import asyncio
+import json
+import config
+import metrics
+from fakes import FakeChatModel, FakeEmbeddingModel
+from llm_evaluator import LLMEvaluator
+from rag_pipeline import RAGResumeScreener
+from vector_store import VectorStore
+
+
+def test_histogram_quantiles_are_bucket_upper_bounds():
+    histogram = metrics.Histogram(buckets=(0.1, 1.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.05, 0.05, 0.5, 5.0):
+        histogram.observe(value)
+    assert (histogram.quantile(0.5), histogram.quantile(0.75), histogram.quantile(1.0)) == (0.1, 1.0, float('inf'))
+    assert (histogram.count, histogram.sum) == (4, 5.6)
+
+
+def test_prometheus_and_json_exports():
+    registry = metrics.MetricsRegistry()
+    registry.inc('llm_cache', 2, result='hit')
+    registry.inc('llm_cache', result='miss')
+    registry.observe('stage_seconds', 0.02, stage='embed')
+    
+    text = registry.to_prometheus()
+    assert text.count("# TYPE resume_screener_llm_cache_total counter") == 1
+    assert 'resume_screener_llm_cache_total{result="hit"} 2' in text
+    assert 'resume_screener_stage_seconds_bucket{stage="embed",le="0.025"} 1' in text
+    assert 'resume_screener_stage_seconds_count{stage="embed"} 1' in text
+    
+    data = json.loads(json.dumps(registry.to_dict()))
+    assert {'name': 'llm_cache', 'labels': {'result': 'miss'}, 'value': 1} in data['counters']
+    assert data['histograms'][0]['p50_le'] == 0.025
+
+
+def test_timings_follow_each_request_and_nest():
+    async def request(stage: str):
+        with metrics.collect_timings() as timings:
+            metrics.observe(stage, 1.0)
+            await asyncio.sleep(0)
+            metrics.observe(stage, 1.0)
+        return timings.as_dict()
+    
+    async def both():
+        return await asyncio.gather(request('a'), request('b'))
+    
+    first, second = asyncio.run(both())
+    assert (first['a'], second['b']) == (2.0, 2.0)
+    assert 'b' not in first and 'a' not in second
+    
+    with metrics.collect_timings() as outer:
+        with metrics.collect_timings():
+            metrics.observe('embed', 0.5)
+    assert outer.as_dict()['embed'] == 0.5
+
+
+def test_screening_results_carry_timings_and_count_llm_usage():
+    metrics.REGISTRY.reset()
+    evaluator = LLMEvaluator(llm=FakeChatModel(latency=0, jitter=0), use_cache=False)
+    screener = RAGResumeScreener(VectorStore(embedding_model=FakeEmbeddingModel(32)), evaluator)
+    result = screener.screen_resume("Python developer", "Python engineer")
+    
+    assert {'llm_call', 'total'} <= set(result['timings'])
+    counters = metrics.REGISTRY.counters
+    assert counters[('llm_requests', ())] == 1
+    assert counters[('llm_tokens', (('kind', 'prompt'),))] > 0
+    assert metrics.REGISTRY.histograms[('request_seconds', (('operation', 'screen'),))].count == 1
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr(config, 'METRICS_ENABLED', False)
+    registry = metrics.MetricsRegistry()
+    monkeypatch.setattr(metrics, 'REGISTRY', registry)
+    
+    with metrics.span('embed'), metrics.collect_timings() as timings:
+        metrics.count('llm_requests')
+    assert timings.as_dict() is None
+    assert metrics.timed('screen')(lambda: {})() == {}
+    assert registry.counters == {} and registry.histograms == {}
@@ -0,0 +1,185 @@
+"""NumpyCollection: add, delete, compact and reopening from disk"""
+import os
+import sqlite3
+import numpy as np
+import pytest
+from numpy_index import NumpyCollection
+
+
+def unit_vectors(n: int, dimension: int = 16, seed: int = 0) -> np.ndarray:
+    vectors = np.random.RandomState(seed).normal(size=(n, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture(params=['float16', 'int8'])
+def dtype(request):
+    return request.param
+
+
+def test_add_and_query(tmp_path, dtype):
+    collection = NumpyCollection(str(tmp_path / 'c'), 'c', dtype)
+    vectors = unit_vectors(5)
+    ids = [f"r{i}" for i in range(5)]
+    collection.add(ids, vectors, documents=[f"doc {i}" for i in range(5)],
+                   metadatas=[{'resume_id': f"r{i}", 'chunk': 0} for i in range(5)])
+    
+    result = collection.query(vectors[[3]], n_results=2)
+    assert result['ids'][0][0] == 'r3'
+    assert result['distances'][0][0] == pytest.approx(0.0, abs=0.02)
+    assert result['documents'][0][0] == 'doc 3'
+    assert result['metadatas'][0][0] == {'resume_id': 'r3', 'chunk': 0}
+    
+    # Existing ids are ignored, as in Chroma
+    collection.add(['r3'], unit_vectors(1, seed=9))
+    assert collection.count() == 5
+    assert collection.query(vectors[[3]], n_results=1)['ids'][0] == ['r3']
+
+
+def test_delete_and_where(tmp_path):
+    collection = NumpyCollection(str(tmp_path / 'c'), 'c')
+    vectors = unit_vectors(6)
+    collection.add([f"r{i}" for i in range(6)], vectors,
+                   metadatas=[{'resume_id': f"r{i // 2}"} for i in range(6)])
+    
+    collection.delete(ids=['r0'])
+    collection.delete(where={'resume_id': 'r2'})
+    assert collection.count() == 3
+    assert collection.get()['ids'] == ['r1', 'r2', 'r3']
+    assert 'r0' not in collection.query(vectors[[0]], n_results=6)['ids'][0]
+    assert collection.get(where={'resume_id': {'$in': ['r0', 'r1']}})['ids'] == ['r1', 'r2', 'r3']
+
+
+def test_compact_keeps_live_entries(tmp_path, dtype):
+    collection = NumpyCollection(str(tmp_path / 'c'), 'c', dtype)
+    vectors = unit_vectors(8)
+    collection.add([f"r{i}" for i in range(8)], vectors, documents=[f"doc {i}" for i in range(8)])
+    before = collection.get(ids=['r5', 'r7'], include=['embeddings'])['embeddings']
+    
+    collection.delete(ids=['r0', 'r2', 'r4', 'r6'])
+    collection.compact()
+    assert collection.count() == 4
+    assert collection.get()['ids'] == ['r1', 'r3', 'r5', 'r7']
+    assert os.path.getsize(collection.vectors_path) == 4 * 16 * np.dtype(dtype).itemsize
+    assert np.allclose(collection.get(ids=['r5', 'r7'], include=['embeddings'])['embeddings'], before)
+    assert collection.query(vectors[[5]], n_results=1)['ids'][0] == ['r5']
+    
+    collection.add(['r8'], unit_vectors(1, seed=3))
+    assert collection.get()['ids'][-1] == 'r8'
+
+
+def test_reopen(tmp_path, dtype):
+    directory = str(tmp_path / 'c')
+    collection = NumpyCollection(directory, 'c', dtype)
+    vectors = unit_vectors(4)
+    collection.add(['a', 'b', 'c', 'd'], vectors, documents=['A', 'B', 'C', 'D'])
+    collection.delete(ids=['b'])
+    
+    reopened = NumpyCollection(directory, 'c', 'float16' if dtype == 'int8' else 'int8')
+    assert reopened.dtype == np.dtype(dtype)  # kept from creation
+    assert reopened.dimension == 16
+    assert reopened.get()['ids'] == ['a', 'c', 'd']
+    assert reopened.query(vectors[[2]], n_results=1)['documents'][0] == ['C']
+
+
+def test_reopen_drops_unindexed_rows(tmp_path):
+    """Rows appended to the vector file without their records (a crash) are cut off"""
+    directory = str(tmp_path / 'c')
+    collection = NumpyCollection(directory, 'c', 'float16')
+    collection.add(['a1', 'a2'], unit_vectors(2))
+    with open(collection.vectors_path, 'ab') as f:
+        f.write(unit_vectors(3, seed=5).astype(np.float16).tobytes())
+    
+    reopened = NumpyCollection(directory, 'c')
+    assert os.path.getsize(reopened.vectors_path) == 2 * 16 * 2
+    vectors = unit_vectors(1, seed=7)
+    reopened.add(['b1'], vectors)
+    assert reopened.query(vectors, n_results=1)['ids'][0] == ['b1']
+
+
+class FailingCommit:
+    """Connection proxy whose commit fails, like a crash before the records are renumbered"""
+    
+    def __init__(self, conn):
+        self._conn = conn
+    
+    def commit(self):
+        raise sqlite3.OperationalError("disk I/O error")
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def compacted_collection(directory: str, dtype: str) -> NumpyCollection:
+    collection = NumpyCollection(directory, 'c', dtype)
+    collection.add([f"r{i}" for i in range(6)], unit_vectors(6), documents=[f"doc {i}" for i in range(6)])
+    collection.delete(ids=['r0', 'r1', 'r3'])
+    return collection
+
+
+def assert_consistent(collection: NumpyCollection):
+    vectors = unit_vectors(6)
+    assert collection.get()['ids'] == ['r2', 'r4', 'r5']
+    for i in (2, 4, 5):
+        result = collection.query(vectors[[i]], n_results=1)
+        assert result['ids'][0] == [f"r{i}"]
+        assert result['documents'][0] == [f"doc {i}"]
+        assert result['distances'][0][0] == pytest.approx(0.0, abs=0.02)
+    assert not [name for name in os.listdir(collection.directory) if '.gen' in name]
+
+
+def test_compact_failing_before_commit_keeps_old_layout(tmp_path, dtype):
+    directory = str(tmp_path / 'c')
+    collection = compacted_collection(directory, dtype)
+    conn = collection._conn
+    collection._conn = FailingCommit(conn)
+    with pytest.raises(sqlite3.OperationalError):
+        collection.compact()
+    collection._conn = conn
+    
+    assert collection.generation == 0
+    assert_consistent(collection)
+    assert_consistent(NumpyCollection(directory, 'c'))
+
+
+def test_compact_interrupted_after_commit_is_finished_on_open(tmp_path, dtype, monkeypatch):
+    directory = str(tmp_path / 'c')
+    collection = compacted_collection(directory, dtype)
+    
+    def crash(*args):
+        raise OSError("crashed before renaming")
+    
+    with monkeypatch.context() as patched:
+        patched.setattr(os, 'replace', crash)
+        with pytest.raises(OSError):
+            collection.compact()  # the records are committed; the new files stay staged
+    assert any('.gen1' in name for name in os.listdir(directory))
+    
+    reopened = NumpyCollection(directory, 'c')
+    assert reopened.generation == 1
+    assert os.path.getsize(reopened.vectors_path) == 3 * 16 * np.dtype(dtype).itemsize
+    assert_consistent(reopened)
+    assert_consistent(collection)
+
+
+def test_failed_rename_is_retried_on_next_read(tmp_path, dtype, monkeypatch):
+    collection = compacted_collection(str(tmp_path / 'c'), dtype)
+    
+    def crash(*args):
+        raise OSError("rename failed")
+    
+    with monkeypatch.context() as patched:
+        patched.setattr(os, 'replace', crash)
+        with pytest.raises(OSError):
+            collection.compact()
+    assert_consistent(collection)
+
+
+def test_uncommitted_generation_files_are_discarded(tmp_path, dtype):
+    directory = str(tmp_path / 'c')
+    collection = compacted_collection(directory, dtype)
+    with open(collection.vectors_path + ".gen1", 'wb') as f:
+        f.write(b'\0' * 64)
+    
+    reopened = NumpyCollection(directory, 'c')
+    assert reopened.get()['ids'] == ['r2', 'r4', 'r5']
+    assert not os.path.exists(collection.vectors_path + ".gen1")
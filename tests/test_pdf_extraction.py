@@ -0,0 +1,46 @@
+"""PDF extraction budgets: pages, characters and the SIGALRM timeout"""
+import signal
+import time
+import pytest
+import utils
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, 'setitimer'), reason="needs SIGALRM")
+
+
+def slow_pages(seconds: float, pages: int = 50, swallow: bool = False):
+    def iter_pages(pdf_input, max_pages=None):
+        for i in range(pages):
+            try:
+                time.sleep(seconds)
+            except BaseException:
+                # Like a PDF library's bare except around its page parser
+                if not swallow:
+                    raise
+            yield f"page {i}"
+    return iter_pages
+
+
+def test_timeout_stops_extraction(monkeypatch):
+    monkeypatch.setattr(utils, 'iter_pdf_pages', slow_pages(0.05))
+    result = utils.extract_pdf_text(b'', max_pages=0, max_chars=0, timeout=0.2)
+    assert not result['ok']
+    assert result['error'].startswith("Timed out")
+    time.sleep(0.3)  # no alarm is left to fire after the call
+
+
+def test_swallowed_alarm_still_times_out(monkeypatch):
+    monkeypatch.setattr(utils, 'iter_pdf_pages', slow_pages(0.05, swallow=True))
+    result = utils.extract_pdf_text(b'', max_pages=0, max_chars=0, timeout=0.2)
+    assert result['error'].startswith("Timed out")
+    assert result['pages'] < 10
+    time.sleep(0.3)
+
+
+def test_page_and_character_limits(monkeypatch):
+    monkeypatch.setattr(utils, 'iter_pdf_pages', slow_pages(0, pages=5))
+    result = utils.extract_pdf_text(b'', max_pages=2, max_chars=0, timeout=5)
+    assert (result['text'], result['pages'], result['truncated']) == ("page 0\npage 1", 2, True)
+    result = utils.extract_pdf_text(b'', max_pages=0, max_chars=9, timeout=5)
+    assert (result['text'], result['truncated']) == ("page 0\npa", True)
+    result = utils.extract_pdf_text(b'', max_pages=0, max_chars=7, timeout=5)
+    assert (result['text'], result['truncated']) == ("page 0", True)
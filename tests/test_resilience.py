@@ -0,0 +1,133 @@
+"""Retries, the circuit breaker and degraded results, against benchmarks/fakes.FakeChatModel"""
+import time
+import pytest
+import config
+from fakes import FakeChatModel, FakeEmbeddingModel, FakeMessage
+from llm_evaluator import LLMEvaluator
+from rag_pipeline import RAGResumeScreener
+from resilience import CircuitBreaker, LLMUnavailableError, ResilientCaller
+from vector_store import VectorStore
+
+MESSAGES = [FakeMessage("Evaluate the resume."), FakeMessage("Python developer with 5 years of Django")]
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(config, 'LLM_BACKOFF_BASE_SECONDS', 0.01)
+    monkeypatch.setattr(config, 'LLM_BACKOFF_MAX_SECONDS', 0.02)
+
+
+def failing_once(llm: FakeChatModel):
+    """Request function whose first call hits the model's injected error"""
+    def request():
+        try:
+            return llm.invoke(MESSAGES)
+        finally:
+            llm.error_rate = 0.0
+    return request
+
+
+def test_retry_waits_for_retry_after():
+    llm = FakeChatModel(latency=0, jitter=0, error_rate=1.0, error_status=429, retry_after=0.3)
+    caller = ResilientCaller(max_retries=2, attempt_timeout=5, deadline=10, hedge=False, seed=0)
+    start = time.monotonic()
+    reply = caller.call(failing_once(llm))
+    assert reply.content
+    assert llm.requests == 2
+    assert time.monotonic() - start >= 0.3
+
+
+def test_retry_after_beyond_deadline_gives_up():
+    llm = FakeChatModel(latency=0, jitter=0, error_rate=1.0, error_status=429, retry_after=30)
+    caller = ResilientCaller(max_retries=3, attempt_timeout=1, deadline=2, hedge=False, seed=0)
+    start = time.monotonic()
+    with pytest.raises(LLMUnavailableError):
+        caller.call(failing_once(llm))
+    assert llm.requests == 1
+    assert time.monotonic() - start < 1
+
+
+def test_non_retryable_error_is_raised():
+    llm = FakeChatModel(latency=0, jitter=0, error_rate=1.0, error_status=400)
+    caller = ResilientCaller(max_retries=3, attempt_timeout=1, deadline=5, hedge=False, seed=0)
+    with pytest.raises(RuntimeError) as raised:
+        caller.call(lambda: llm.invoke(MESSAGES))
+    assert not isinstance(raised.value, LLMUnavailableError)
+    assert llm.requests == 1
+
+
+def test_breaker_opens_then_half_open_probe_closes_it():
+    llm = FakeChatModel(latency=0, jitter=0, error_rate=1.0, error_status=503)
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.3)
+    caller = ResilientCaller(max_retries=5, attempt_timeout=1, deadline=5, hedge=False, breaker=breaker, seed=0)
+    
+    with pytest.raises(LLMUnavailableError):
+        caller.call(lambda: llm.invoke(MESSAGES))
+    assert breaker.state == CircuitBreaker.OPEN
+    assert llm.requests == 2
+    
+    # Open: fails fast without reaching the model
+    with pytest.raises(LLMUnavailableError, match="circuit breaker"):
+        caller.call(lambda: llm.invoke(MESSAGES))
+    assert llm.requests == 2
+    
+    time.sleep(0.35)
+    llm.error_rate = 0.0
+    assert caller.call(lambda: llm.invoke(MESSAGES)).content
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert llm.requests == 3
+
+
+def test_failed_half_open_probe_reopens_breaker():
+    llm = FakeChatModel(latency=0, jitter=0, error_rate=1.0, error_status=503)
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.2)
+    caller = ResilientCaller(max_retries=0, attempt_timeout=1, deadline=5, hedge=False, breaker=breaker, seed=0)
+    with pytest.raises(LLMUnavailableError):
+        caller.call(lambda: llm.invoke(MESSAGES))
+    
+    time.sleep(0.25)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_attempt_timeout():
+    llm = FakeChatModel(latency=0.5, jitter=0)
+    caller = ResilientCaller(max_retries=0, attempt_timeout=0.1, deadline=5, hedge=False, seed=0)
+    with pytest.raises(LLMUnavailableError) as raised:
+        caller.call(lambda: llm.invoke(MESSAGES))
+    assert isinstance(raised.value.cause, TimeoutError)
+
+
+def make_screener(llm: FakeChatModel, caller: ResilientCaller) -> RAGResumeScreener:
+    evaluator = LLMEvaluator(llm=llm, use_cache=False, resilience=caller)
+    return RAGResumeScreener(VectorStore(embedding_model=FakeEmbeddingModel(64)), evaluator)
+
+
+def test_unavailable_llm_gives_degraded_result(monkeypatch):
+    monkeypatch.setattr(config, 'SKILL_MATCH_WEIGHT', 0.0)
+    llm = FakeChatModel(latency=0, jitter=0, error_rate=1.0, error_status=503)
+    caller = ResilientCaller(max_retries=1, attempt_timeout=1, deadline=5, hedge=False, seed=0)
+    screener = make_screener(llm, caller)
+    
+    result = screener.screen_resume("Python developer, Django and PostgreSQL", "Senior Python engineer",
+                                    bounded=False, trim_context=False, use_profile=False)
+    assert result['llm_degraded'] is True
+    assert result['llm_score'] is None
+    assert result['final_score'] == result['semantic_score']
+    low, high = result['final_score_range']
+    assert low <= result['final_score'] <= high
+    assert screener.get_stats()['llm_degraded'] == 1
+
+
+def test_unavailable_llm_raises_without_degrading(monkeypatch):
+    monkeypatch.setattr(config, 'LLM_DEGRADE_ON_FAILURE', False)
+    llm = FakeChatModel(latency=0, jitter=0, error_rate=1.0, error_status=503)
+    caller = ResilientCaller(max_retries=0, attempt_timeout=1, deadline=5, hedge=False, seed=0)
+    with pytest.raises(LLMUnavailableError):
+        make_screener(llm, caller).screen_resume(
+            "Python developer", "Senior Python engineer", bounded=False, trim_context=False, use_profile=False
+        )
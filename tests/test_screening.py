@@ -0,0 +1,119 @@
+"""Single, batch, rank and matrix screening with the fake models"""
+import numpy as np
+import config
+from fakes import FakeChatModel, FakeEmbeddingModel
+from llm_evaluator import LLMEvaluator
+from rag_pipeline import RAGResumeScreener
+from synthetic import generate_job_description, generate_resumes
+from vector_store import VectorStore
+
+JOB = generate_job_description(0)
+RESUMES = generate_resumes(6, 300, seed=0)
+
+
+def make_screener(**evaluator_options) -> RAGResumeScreener:
+    evaluator = LLMEvaluator(llm=FakeChatModel(latency=0, jitter=0), use_cache=False, **evaluator_options)
+    return RAGResumeScreener(VectorStore(embedding_model=FakeEmbeddingModel(64)), evaluator)
+
+
+def test_single_and_batch_scores_match():
+    screener = make_screener()
+    # Indexed resumes must not leak into the score of the one being screened
+    screener.add_resume_to_index('other', RESUMES[5]['text'])
+    batch = {result['resume_id']: result for result in screener.batch_screen_resumes(RESUMES[:5], JOB, dedup=False)}
+    for resume in RESUMES[:5]:
+        single = screener.screen_resume(resume['text'], JOB)
+        assert single['semantic_score'] == batch[resume['id']]['semantic_score']
+        assert single['final_score'] == batch[resume['id']]['final_score']
+
+
+def test_batch_results_are_ranked_and_independent_of_the_embedding_batch_size():
+    screener = make_screener()
+    results = screener.batch_screen_resumes(RESUMES, JOB, batch_size=2, dedup=False)
+    assert sorted(result['resume_id'] for result in results) == sorted(resume['id'] for resume in RESUMES)
+    assert [result['final_score'] for result in results] == sorted((result['final_score'] for result in results), reverse=True)
+    
+    semantic = dict(zip(
+        [resume['id'] for resume in RESUMES],
+        screener.vector_store.calculate_semantic_scores([resume['text'] for resume in RESUMES], JOB, batch_size=64)
+    ))
+    for result in results:
+        assert result['semantic_score'] == round(semantic[result['resume_id']], 3)
+        assert not result['llm_skipped']
+
+
+def test_ranking_sends_only_the_shortlist_to_the_llm():
+    screener = make_screener()
+    for resume in RESUMES:
+        screener.add_resume_to_index(resume['id'], resume['text'])
+    requests = screener.llm_evaluator.llm.requests
+    
+    ranking = screener.rank_candidates(JOB, shortlist_k=3)
+    assert screener.llm_evaluator.llm.requests - requests == 3
+    screened, unscreened = ranking[:3], ranking[3:]
+    assert all(result['screened'] for result in screened)
+    assert [result['final_score'] for result in screened] == sorted((result['final_score'] for result in screened), reverse=True)
+    assert not any(result['screened'] for result in unscreened)
+    assert [result['semantic_score'] for result in unscreened] == sorted((result['semantic_score'] for result in unscreened), reverse=True)
+    assert min(result['semantic_score'] for result in screened) >= max(result['semantic_score'] for result in unscreened)
+    assert sorted(result['resume_id'] for result in ranking) == sorted(resume['id'] for resume in RESUMES)
+    
+    assert [result['resume_id'] for result in screener.rank_candidates(JOB, shortlist_k=3, final_k=2)] == \
+        [result['resume_id'] for result in ranking[:2]]
+
+
+def test_min_score_skips_the_llm_for_resumes_that_cannot_reach_it():
+    screener = make_screener()
+    results = screener.batch_screen_resumes(RESUMES, JOB, min_score=0.99, dedup=False)
+    assert screener.llm_evaluator.llm.requests == 0
+    for result in results:
+        assert result['llm_skipped'] and result['llm_score'] is None
+        assert result['recommendation'] == "Not Recommended - Below cutoff"
+        low, high = result['final_score_range']
+        assert low <= result['final_score'] <= high < 0.99
+
+
+def test_bounded_evaluation_keeps_every_recommendation(monkeypatch):
+    # A small LLM weight narrows the final score range enough to skip calls
+    monkeypatch.setattr(config, 'SEMANTIC_SEARCH_WEIGHT', 0.9)
+    monkeypatch.setattr(config, 'LLM_WEIGHT', 0.1)
+    resumes = generate_resumes(20, 300, seed=1)
+    
+    full = {result['resume_id']: result for result in make_screener().batch_screen_resumes(resumes, JOB, dedup=False)}
+    screener = make_screener()
+    bounded = screener.batch_screen_resumes(resumes, JOB, bounded=True, dedup=False)
+    skipped = [result for result in bounded if result['llm_skipped']]
+    assert skipped
+    assert screener.llm_evaluator.llm.requests == len(resumes) - len(skipped)
+    assert screener.get_stats()['llm_calls_skipped'] == len(skipped)
+    for result in bounded:
+        assert result['recommendation'] == full[result['resume_id']]['recommendation']
+
+
+def test_matrix_screens_the_top_pairs_of_each_job():
+    jobs = [{'id': f"job{j}", 'text': generate_job_description(j)} for j in range(3)]
+    screener = make_screener()
+    matrix = screener.screen_matrix(RESUMES, jobs, top_k_per_job=2, top_k_per_candidate=0)
+    
+    semantic = matrix['semantic_scores']
+    assert semantic.shape == (len(RESUMES), len(jobs))
+    for j, job in enumerate(jobs):
+        expected = screener.vector_store.calculate_semantic_scores([resume['text'] for resume in RESUMES], job['text'])
+        assert np.allclose(semantic[:, j], expected, atol=1e-5)
+    
+    screened = ~np.isnan(matrix['final_scores'])
+    assert (screened.sum(axis=0) == 2).all()
+    assert matrix['llm_calls'] == screener.llm_evaluator.llm.requests == 2 * len(jobs)
+    for j, job in enumerate(jobs):
+        assert set(np.flatnonzero(screened[:, j])) == set(np.argsort(-semantic[:, j])[:2])
+        ranking = matrix['rankings'][job['id']]
+        assert [result['screened'] for result in ranking] == [True, True] + [False] * (len(RESUMES) - 2)
+
+
+def test_matrix_top_k_per_candidate_adds_each_resumes_best_job():
+    jobs = [{'id': f"job{j}", 'text': generate_job_description(j)} for j in range(3)]
+    matrix = make_screener().screen_matrix(RESUMES, jobs, top_k_per_job=1, top_k_per_candidate=1)
+    screened = ~np.isnan(matrix['final_scores'])
+    best_jobs = np.argmax(matrix['semantic_scores'], axis=1)
+    assert screened[np.arange(len(RESUMES)), best_jobs].all()
+    assert screened.any(axis=0).all()
@@ -0,0 +1,60 @@
+"""Request validation and error statuses of the HTTP service"""
+import asyncio
+from aiohttp.test_utils import TestClient, TestServer
+from fakes import FakeChatModel, FakeEmbeddingModel
+from llm_evaluator import LLMEvaluator
+from rag_pipeline import RAGResumeScreener
+from server import create_app
+from vector_store import VectorStore
+
+RESUME = "Python developer with 5 years of Django and PostgreSQL"
+JOB = "Senior Python engineer"
+
+
+def make_screener() -> RAGResumeScreener:
+    evaluator = LLMEvaluator(llm=FakeChatModel(latency=0, jitter=0), use_cache=False)
+    return RAGResumeScreener(VectorStore(embedding_model=FakeEmbeddingModel(64)), evaluator)
+
+
+def post(screener, path: str, body) -> tuple:
+    """Status and JSON body of one POST to a fresh app"""
+    async def request():
+        app = create_app(screener)
+        app.on_startup.clear()
+        async with TestClient(TestServer(app)) as client:
+            response = await client.post(path, json=body)
+            return response.status, await response.json()
+    return asyncio.run(request())
+
+
+def test_screen_ok():
+    status, body = post(make_screener(), '/screen', {'resume_text': RESUME, 'job_description': JOB,
+                                                     'bounded': False, 'min_score': 0.2})
+    assert status == 200
+    assert 0 <= body['final_score'] <= 1
+
+
+def test_wrong_option_types_are_rejected():
+    screener = make_screener()
+    for name, value in (('bounded', 'yes'), ('min_score', 'high'), ('min_score', 2), ('min_score', True),
+                        ('required_skills', 'python'), ('required_skills', [1])):
+        status, body = post(screener, '/screen', {'resume_text': RESUME, 'job_description': JOB, name: value})
+        assert status == 400
+        assert body['error'].startswith(f"'{name}' must be")
+    status, body = post(screener, '/rank', {'job_description': JOB, 'shortlist_k': 0})
+    assert (status, body['error']) == (400, "'shortlist_k' must be a positive integer")
+    status, body = post(screener, '/screen', {'resume_text': ['a'], 'job_description': JOB})
+    assert status == 400
+    status, body = post(screener, '/batch', {'resumes': [{'text': 5}], 'job_description': JOB})
+    assert status == 400
+
+
+def test_screening_errors_are_internal():
+    screener = make_screener()
+    
+    def broken(*args, **kwargs):
+        raise ValueError("internal detail")
+    
+    screener.screen_resume = broken
+    status, body = post(screener, '/screen', {'resume_text': RESUME, 'job_description': JOB})
+    assert (status, body) == (500, {'error': 'Internal error'})
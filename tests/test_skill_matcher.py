@@ -0,0 +1,62 @@
+"""Taxonomy skill extraction and overlap"""
+import config
+from fakes import FakeChatModel, FakeEmbeddingModel
+from llm_evaluator import LLMEvaluator
+from rag_pipeline import RAGResumeScreener
+from skill_matcher import SkillMatcher
+from vector_store import VectorStore
+
+TAXONOMY = {
+    'Python': ['python3'],
+    'Apache Spark': ['spark', 'pyspark'],
+    'C++': ['cpp'],
+    'Node.js': ['nodejs', 'node js'],
+    'Rust': {'aliases': ['rustlang'], 'ambiguous': True}
+}
+
+
+def test_extracts_canonical_skills_in_order_of_first_mention():
+    matcher = SkillMatcher(TAXONOMY)
+    assert matcher.extract("Node JS and C++ services, PySpark jobs, more python3.") == ['Node.js', 'C++', 'Apache Spark', 'Python']
+    assert matcher.extract("Sparkling water") == []
+
+
+def test_ambiguous_names_need_context_but_their_aliases_do_not():
+    matcher = SkillMatcher(TAXONOMY)
+    assert matcher.extract("Languages: Python, Rust") == ['Python', 'Rust']
+    assert matcher.extract("Rust developer") == ['Rust']
+    assert matcher.extract("Removed rust from the pipes") == []
+    assert matcher.extract("Removed rust from the pipes, then " + "word " * config.SKILL_CONTEXT_WINDOW + "Python") == ['Python']
+    assert matcher.extract("Wrote rustlang crates") == ['Rust']
+    assert matcher.canonical("rust") == 'Rust'
+
+
+def test_shipped_taxonomy_has_no_bare_ambiguous_aliases():
+    matcher = SkillMatcher()
+    for word in ("ts", "rust", "swift", "ruby", "excel"):
+        assert matcher.extract(f"I {word} at things") == [], word
+    assert matcher.extract("Skills: Swift, Ruby, TypeScript") == ['Swift', 'Ruby', 'TypeScript']
+
+
+def test_overlap_reports_matched_missing_and_required_skills():
+    matcher = SkillMatcher(TAXONOMY)
+    overlap = matcher.overlap("Python and Spark pipelines", "Python, Spark and C++ required", ['cpp', 'python', 'COBOL'])
+    assert overlap['job_skills'] == ['Python', 'Apache Spark', 'C++']
+    assert overlap['matched_skills'] == ['Python', 'Apache Spark']
+    assert overlap['missing_skills'] == ['C++']
+    assert overlap['missing_required'] == ['C++']
+    assert overlap['score'] == 2 / 3
+
+
+def test_results_only_carry_skills_when_matching_is_enabled(monkeypatch):
+    evaluator = LLMEvaluator(llm=FakeChatModel(latency=0, jitter=0), use_cache=False)
+    screener = RAGResumeScreener(VectorStore(embedding_model=FakeEmbeddingModel(32)), evaluator)
+    resume, job = "Python developer, Django and AWS", "Python and Kubernetes engineer"
+    
+    result = screener.screen_resume(resume, job)
+    assert result.get('skill_score') is None and result.get('skill_overlap') is None
+    
+    monkeypatch.setattr(config, 'SKILL_MATCHING_ENABLED', True)
+    result = screener.screen_resume(resume, job)
+    assert result['skill_score'] == 0.5
+    assert result['skill_overlap']['missing_skills'] == ['Kubernetes']
@@ -0,0 +1,57 @@
+"""Resume chunks in the vector store"""
+import pytest
+import config
+import metrics
+from fakes import FakeEmbeddingModel
+from vector_store import VectorStore
+
+LONG_RESUME = "SUMMARY\nPython developer\n\nEXPERIENCE\n" + "\n".join(
+    f"- Project {i}: Django services on AWS" for i in range(2000)
+)
+
+
+@pytest.fixture(params=['numpy', 'chroma'])
+def vector_store(request, monkeypatch):
+    monkeypatch.setattr(config, 'VECTOR_BACKEND', request.param)
+    return VectorStore(embedding_model=FakeEmbeddingModel(32))
+
+
+def test_ranking_pool_marks_truncation_and_texts_are_fetched_by_id(vector_store):
+    vector_store.add_resume('long', LONG_RESUME, {'name': 'Long'})
+    vector_store.add_resume('short', "EXPERIENCE\nJava developer\nSpring Boot")
+    
+    matches = {match['id']: match for match in vector_store.score_indexed_resumes("Python developer")}
+    assert matches['long']['metadata'] == {'name': 'Long', 'truncated': True}
+    assert matches['short']['metadata'] == {}
+    assert all('text' not in match for match in matches.values())
+    assert vector_store.resume_texts(['short', 'long']) == {
+        'long': LONG_RESUME,
+        'short': "EXPERIENCE\nJava developer\nSpring Boot"
+    }
+    assert all('resume_text' not in match['metadata'] for match in vector_store.semantic_search("Python", 2))
+
+
+def test_truncation_is_counted_not_printed(vector_store, capsys):
+    metrics.REGISTRY.reset()
+    vector_store.add_resume('long', LONG_RESUME)
+    vector_store.add_resume('short', "Java developer")
+    assert metrics.REGISTRY.counters[('resumes_truncated', ())] == 1
+    assert capsys.readouterr().out == ""
+
+
+def test_ranking_pool_is_cached_until_the_collection_changes(vector_store, monkeypatch):
+    vector_store.add_resume('a', "Python developer with Django")
+    calls = []
+    get = type(vector_store.collection).get
+    monkeypatch.setattr(type(vector_store.collection), 'get',
+                        lambda self, *args, **kwargs: calls.append(kwargs) or get(self, *args, **kwargs))
+    
+    vector_store.score_indexed_resumes("Python developer")
+    vector_store.score_indexed_resumes("Java developer")
+    assert len(calls) == 1
+    assert 'documents' not in calls[0]['include']
+    
+    vector_store.add_resume('b', "Java developer with Spring")
+    assert {match['id'] for match in vector_store.score_indexed_resumes("Java developer")} == {'a', 'b'}
+    vector_store.delete_resumes(['a'])
+    assert [match['id'] for match in vector_store.score_indexed_resumes("Java developer")] == ['b']
@@ -0,0 +1,132 @@
+"""WorkQueue leases, retries and the worker loop"""
+import time
+import pytest
+import config
+from fakes import FakeChatModel, FakeEmbeddingModel
+from llm_evaluator import LLMEvaluator
+from rag_pipeline import RAGResumeScreener
+from resilience import ResilientCaller
+from vector_store import VectorStore
+from work_queue import DONE, FAILED, LEASED, PENDING, WorkQueue, run_worker
+
+JOB = "Senior Python engineer: Django, PostgreSQL, AWS"
+
+
+def resumes(n: int):
+    return [{'id': f"r{i}", 'text': f"Resume {i}: {i} years of Python, Django and skill{i}"} for i in range(n)]
+
+
+@pytest.fixture
+def work_queue():
+    queue = WorkQueue()
+    yield queue
+    queue.close()
+
+
+def task_rows(queue: WorkQueue):
+    return queue._conn.execute("SELECT resume_id, status, attempts, lease_owner FROM tasks ORDER BY id").fetchall()
+
+
+def test_enqueue_is_idempotent(work_queue):
+    added = work_queue.enqueue(resumes(3), JOB, batch_id='b', options={'dedup': False})
+    assert (added['added'], added['total']) == (3, 3)
+    again = work_queue.enqueue(resumes(4), JOB, batch_id='b', options={'dedup': False})
+    assert (again['added'], again['skipped'], again['total']) == (1, 3, 4)
+
+
+def test_claim_leases_each_task_once(work_queue):
+    work_queue.enqueue(resumes(3), JOB, batch_id='b', options={'dedup': False})
+    claim = work_queue.claim('w1', limit=2)
+    assert [task['resume_id'] for task in claim['tasks']] == ['r0', 'r1']
+    assert claim['options'] == {'dedup': False}
+    assert [task['resume_id'] for task in work_queue.claim('w2', limit=5)['tasks']] == ['r2']
+    assert work_queue.claim('w3') is None
+    assert work_queue.has_work('b')
+
+
+def test_expired_lease_is_claimed_again(work_queue):
+    work_queue.enqueue(resumes(1), JOB, batch_id='b', options={'dedup': False})
+    task = work_queue.claim('w1', lease_seconds=0.05)['tasks'][0]
+    assert work_queue.claim('w2') is None
+    time.sleep(0.1)
+    
+    reclaimed = work_queue.claim('w2')['tasks'][0]
+    assert reclaimed['id'] == task['id']
+    assert reclaimed['attempts'] == 2
+    # The first worker lost its lease: its result and failure are ignored
+    assert not work_queue.complete('w1', task['id'], {'resume_id': 'r0', 'final_score': 0.1})
+    assert work_queue.fail('w1', task['id'], "late", attempts=1) == PENDING
+    assert task_rows(work_queue)[0][1:] == (LEASED, 2, 'w2')
+    assert work_queue.complete('w2', task['id'], {'resume_id': 'r0', 'final_score': 0.7})
+    assert work_queue.results('b') == [{'resume_id': 'r0', 'final_score': 0.7}]
+    assert not work_queue.has_work('b')
+
+
+def test_renew_keeps_lease(work_queue):
+    work_queue.enqueue(resumes(1), JOB, batch_id='b', options={'dedup': False})
+    task = work_queue.claim('w1', lease_seconds=0.1)['tasks'][0]
+    time.sleep(0.05)
+    assert work_queue.renew('w1', [task['id']], lease_seconds=60) == 1
+    assert work_queue.renew('w2', [task['id']], lease_seconds=60) == 0
+    time.sleep(0.1)
+    assert work_queue.claim('w2') is None
+
+
+def test_expired_lease_after_last_attempt_fails(work_queue):
+    work_queue.enqueue(resumes(1), JOB, batch_id='b', options={'dedup': False})
+    work_queue.claim('w1', lease_seconds=0.05, max_attempts=1)
+    time.sleep(0.1)
+    assert work_queue.claim('w2', max_attempts=1) is None
+    assert task_rows(work_queue)[0][1] == FAILED
+    assert work_queue.results('b') == [{'resume_id': 'r0', 'error': 'Lease expired'}]
+
+
+def test_failed_attempt_retries_after_delay(work_queue):
+    work_queue.enqueue(resumes(1), JOB, batch_id='b', options={'dedup': False})
+    task = work_queue.claim('w1')['tasks'][0]
+    assert work_queue.fail('w1', task['id'], "boom", task['attempts'], max_attempts=2, retry_delay=0.1) == PENDING
+    assert work_queue.claim('w1') is None  # still backing off
+    time.sleep(0.15)
+    
+    task = work_queue.claim('w1')['tasks'][0]
+    assert task['attempts'] == 2
+    assert work_queue.fail('w1', task['id'], "boom", task['attempts'], max_attempts=2, retry_delay=0) == FAILED
+    assert work_queue.claim('w1') is None
+    assert not work_queue.has_work('b')
+    
+    assert work_queue.retry_failed('b') == 1
+    assert work_queue.claim('w1')['tasks'][0]['attempts'] == 1
+
+
+def make_screener(llm: FakeChatModel):
+    caller = ResilientCaller(max_retries=0, attempt_timeout=1, deadline=5, hedge=False, seed=0)
+    evaluator = LLMEvaluator(llm=llm, use_cache=False, resilience=caller)
+    return RAGResumeScreener(VectorStore(embedding_model=FakeEmbeddingModel(64)), evaluator)
+
+
+def test_worker_retries_degraded_results(work_queue, monkeypatch):
+    monkeypatch.setattr(config, 'WORK_QUEUE_RETRY_DELAY_SECONDS', 0)
+    monkeypatch.setattr(config, 'WORK_QUEUE_POLL_SECONDS', 0.01)
+    monkeypatch.setattr(config, 'LLM_BREAKER_FAILURE_THRESHOLD', 100)
+    work_queue.enqueue(resumes(4), JOB, batch_id='b', options={'dedup': False})
+    llm = FakeChatModel(latency=0, jitter=0, error_rate=1.0)
+    
+    def screener_factory():
+        screener = make_screener(llm)
+        original = screener.batch_screen_resumes
+        
+        def batch_screen_resumes(*args, **kwargs):
+            try:
+                return original(*args, **kwargs)
+            finally:
+                llm.error_rate = 0.0  # the model recovers after the first group
+        
+        screener.batch_screen_resumes = batch_screen_resumes
+        return screener
+    
+    counts = run_worker('w1', batch_id='b', screener_factory=screener_factory)
+    assert counts == {'done': 4, 'retried': 4, 'failed': 0, 'duplicates': 0}
+    assert all(row[1:3] == (DONE, 2) for row in task_rows(work_queue))
+    results = work_queue.results('b')
+    assert len(results) == 4
+    assert not any(result.get('llm_degraded') for result in results)
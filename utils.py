@@ -1,8 +1,54 @@
 """
 Utility functions for text processing and PDF parsing
 """
-import PyPDF2
-from typing import Optional
+import asyncio
+import concurrent.futures
+import contextvars
+import io
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+import config
+import metrics
+
+
+# Lines treated as resume section headings (compared lower-cased, without a trailing colon)
+SECTION_HEADINGS = {
+    'summary', 'professional summary', 'profile', 'objective', 'about me',
+    'experience', 'work experience', 'professional experience', 'employment history',
+    'education', 'skills', 'technical skills', 'core competencies', 'projects',
+    'certifications', 'publications', 'awards', 'languages', 'volunteer experience',
+    'interests', 'references'
+}
+
+
+def iter_pdf_pages(pdf_input, max_pages: int = None) -> Iterator[str]:
+    """
+    Yield the text of a PDF one page at a time
+    
+    Args:
+        pdf_input: Path to PDF file (str), file-like object, or raw PDF bytes
+        max_pages: Stop after this many pages
+    
+    Yields:
+        Text of each page
+    """
+    if isinstance(pdf_input, bytes):
+        pdf_input = io.BytesIO(pdf_input)
+    if isinstance(pdf_input, str):
+        with open(pdf_input, 'rb') as file:
+            yield from iter_pdf_pages(file, max_pages)
+        return
+    
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(pdf_input)
+    for page_number, page in enumerate(pdf_reader.pages):
+        if max_pages is not None and page_number >= max_pages:
+            return
+        yield page.extract_text() or ""
 
 
 def extract_text_from_pdf(pdf_input) -> Optional[str]:
@@ -11,37 +57,182 @@ def extract_text_from_pdf(pdf_input) -> Optional[str]:
     
     Args:
         pdf_input: Path to PDF file (str) or file-like object (Streamlit upload)
-        
+    
     Returns:
         Extracted text as string, or None if error
     """
     try:
-        text = ""
-        # Handle both file paths and file-like objects (Streamlit uploads)
-        if isinstance(pdf_input, str):
-            # File path
-            with open(pdf_input, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-        else:
-            # File-like object (Streamlit upload)
-            pdf_reader = PyPDF2.PdfReader(pdf_input)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text.strip()
+        return "\n".join(iter_pdf_pages(pdf_input)).strip()
     except Exception as e:
         print(f"Error extracting text from PDF: {str(e)}")
         return None
 
 
+class ExtractionTimeout(BaseException):
+    """
+    Raised when PDF extraction exceeds its time budget
+    
+    Derives from BaseException so the PDF library's own `except Exception`
+    recovery code cannot swallow it.
+    """
+
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+
+def extract_pdf_text(pdf_input, max_pages: int = None, max_chars: int = None,
+                     timeout: float = None) -> Dict:
+    """
+    Extract text from a PDF within page, character and time budgets
+    
+    Pages are read one at a time and reading stops as soon as a budget is
+    used up. The timeout is enforced with SIGALRM, which only works in the
+    main thread of a process on POSIX systems (e.g. a worker process); use
+    extract_pdf_text_isolated from other threads.
+    
+    Args:
+        pdf_input: Path to PDF file (str), file-like object, or raw PDF bytes
+        max_pages: Maximum pages to read (defaults to config.PDF_MAX_PAGES)
+        max_chars: Maximum characters to keep (defaults to config.PDF_MAX_CHARS)
+        timeout: Wall-clock limit in seconds (defaults to config.PDF_TIMEOUT_SECONDS)
+    
+    Returns:
+        Dictionary with 'ok', 'text', 'pages', 'truncated', 'error' and 'elapsed_seconds'
+    """
+    max_pages = max_pages if max_pages is not None else config.PDF_MAX_PAGES
+    max_chars = max_chars if max_chars is not None else config.PDF_MAX_CHARS
+    timeout = timeout if timeout is not None else config.PDF_TIMEOUT_SECONDS
+    
+    use_alarm = bool(timeout) and hasattr(signal, 'setitimer') \
+        and threading.current_thread() is threading.main_thread()
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        # One-shot, so no second alarm can interrupt the handlers below
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    
+    start = time.perf_counter()
+    parts = []
+    chars = 0
+    pages = 0
+    truncated = False
+    error = None
+    try:
+        try:
+            # Read one page past the limit to tell whether the document was cut short
+            for page_text in iter_pdf_pages(pdf_input, max_pages + 1 if max_pages else None):
+                # The alarm fires once; a bare except in the PDF library may have swallowed it
+                if use_alarm and time.perf_counter() - start > timeout:
+                    raise ExtractionTimeout()
+                if (max_pages and pages == max_pages) or (max_chars and chars >= max_chars):
+                    truncated = True
+                    break
+                pages += 1
+                if max_chars and chars + len(page_text) > max_chars:
+                    parts.append(page_text[:max(0, max_chars - chars)])
+                    truncated = True
+                    break
+                parts.append(page_text)
+                chars += len(page_text) + 1
+        finally:
+            # Cancelled inside the outer try, so an alarm due right now is still caught below
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except ExtractionTimeout:
+        error = f"Timed out after {timeout}s ({pages} pages read)"
+    except Exception as e:
+        error = f"Error extracting text from PDF: {str(e)}"
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous_handler)
+    
+    text = "\n".join(parts).strip() if error is None else None
+    elapsed = time.perf_counter() - start
+    metrics.observe('pdf_extract', elapsed)
+    metrics.count('pdf_extract', outcome='ok' if error is None and text else 'failed')
+    return {
+        'ok': error is None and bool(text),
+        'text': text,
+        'pages': pages,
+        'truncated': truncated,
+        'error': error if error is not None else (None if text else "No extractable text"),
+        'elapsed_seconds': round(elapsed, 3)
+    }
+
+
+def _extract_pdf_text_worker(connection, pdf_input, max_pages, max_chars):
+    connection.send(extract_pdf_text(pdf_input, max_pages, max_chars, timeout=0))
+    connection.close()
+
+
+def extract_pdf_text_isolated(pdf_input, max_pages: int = None, max_chars: int = None,
+                              timeout: float = None) -> Dict:
+    """
+    Run extract_pdf_text in a separate process, killing it if it runs past the timeout
+    
+    Safe to call from any thread (e.g. a Streamlit session), and a PDF that
+    hangs or exhausts memory cannot take the caller down with it.
+    
+    Args:
+        pdf_input: Path to PDF file (str), file-like object, or raw PDF bytes
+        max_pages: Maximum pages to read (defaults to config.PDF_MAX_PAGES)
+        max_chars: Maximum characters to keep (defaults to config.PDF_MAX_CHARS)
+        timeout: Wall-clock limit in seconds (defaults to config.PDF_TIMEOUT_SECONDS)
+    
+    Returns:
+        Same structure as extract_pdf_text
+    """
+    timeout = timeout if timeout is not None else config.PDF_TIMEOUT_SECONDS
+    if not isinstance(pdf_input, (str, bytes)):
+        pdf_input = pdf_input.read()
+    
+    start = time.perf_counter()
+    # Spawn rather than fork: the caller may hold model threads and locks
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_extract_pdf_text_worker,
+        args=(sender, pdf_input, max_pages, max_chars),
+        daemon=True
+    )
+    process.start()
+    sender.close()
+    
+    try:
+        if receiver.poll(timeout or None):
+            result = receiver.recv()
+            # The worker's own metrics die with it, so record the extraction here
+            metrics.observe('pdf_extract', time.perf_counter() - start)
+            metrics.count('pdf_extract', outcome='ok' if result['ok'] else 'failed')
+            return result
+        error = f"Timed out after {timeout}s"
+    except EOFError:
+        error = f"Extraction process exited with code {process.exitcode}"
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+    
+    metrics.observe('pdf_extract', time.perf_counter() - start)
+    metrics.count('pdf_extract', outcome='failed')
+    return {
+        'ok': False,
+        'text': None,
+        'pages': 0,
+        'truncated': False,
+        'error': error,
+        'elapsed_seconds': round(time.perf_counter() - start, 3)
+    }
+
+
 def clean_text(text: str) -> str:
     """
     Clean and normalize text
     
     Args:
         text: Raw text to clean
-        
+    
     Returns:
         Cleaned text
     """
@@ -50,13 +241,91 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
+def _is_section_heading(line: str) -> bool:
+    """Whether a line looks like a resume section heading"""
+    line = line.strip().rstrip(':').strip()
+    if not line or len(line.split()) > 4:
+        return False
+    return line.lower() in SECTION_HEADINGS or (line.isupper() and any(c.isalpha() for c in line))
+
+
+def split_into_chunks(text: str, chunk_size: int, stride: int, max_chunks: int = None) -> List[Dict]:
+    """
+    Split text into section-aware windows of words
+    
+    The text is first split at section headings; each section is then cut
+    into windows of `chunk_size` words starting every `stride` words. Chunks
+    never cross a section boundary, and sections too short to stand alone
+    are merged into the next one.
+    
+    Args:
+        text: Text to split
+        chunk_size: Words per chunk
+        stride: Words between chunk starts (at most chunk_size, so no words are skipped)
+        max_chunks: Maximum number of chunks to return
+    
+    Returns:
+        List of dictionaries with 'text', 'word_start' and 'word_end' keys
+        (word offsets into the whitespace-split text)
+    """
+    stride = max(1, min(stride, chunk_size))
+    
+    # Word offsets where sections start
+    words = []
+    boundaries = [0]
+    for line in text.splitlines():
+        if _is_section_heading(line) and words:
+            boundaries.append(len(words))
+        words.extend(line.split())
+    boundaries.append(len(words))
+    
+    sections = []
+    section_start = 0
+    for boundary in boundaries[1:]:
+        if boundary - section_start >= chunk_size // 4 or boundary == len(words):
+            if boundary > section_start:
+                sections.append((section_start, boundary))
+            section_start = boundary
+    
+    chunks = []
+    for section_start, section_end in sections:
+        for start in range(section_start, section_end, stride):
+            end = min(start + chunk_size, section_end)
+            chunks.append({
+                'text': ' '.join(words[start:end]),
+                'word_start': start,
+                'word_end': end
+            })
+            if end == section_end:
+                break
+    
+    return chunks[:max_chunks] if max_chunks else chunks
+
+
+def join_chunks(chunks: List[Dict]) -> str:
+    """
+    Rebuild text from (possibly overlapping) chunks made by split_into_chunks
+    
+    Args:
+        chunks: Dictionaries with 'text' and 'word_start' keys
+    
+    Returns:
+        The covered text with whitespace normalized
+    """
+    words = []
+    for chunk in sorted(chunks, key=lambda c: c['word_start']):
+        chunk_words = chunk['text'].split()
+        words.extend(chunk_words[max(0, len(words) - chunk['word_start']):])
+    return ' '.join(words)
+
+
 def read_text_file(file_path: str) -> Optional[str]:
     """
     Read text from a file
     
     Args:
         file_path: Path to the text file
-        
+    
     Returns:
         File contents as string, or None if error
     """
@@ -66,3 +335,66 @@ def read_text_file(file_path: str) -> Optional[str]:
     except Exception as e:
         print(f"Error reading file: {str(e)}")
         return None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for LLM quota accounting (~4 characters per token)
+    
+    Args:
+        text: Text to measure
+    
+    Returns:
+        Estimated number of tokens
+    """
+    return max(1, len(text) // 4)
+
+
+def run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code
+    
+    Args:
+        coro: Coroutine to run
+    
+    Returns:
+        The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Already inside an event loop (e.g. a notebook): run on a helper thread,
+    # in a copy of this context so per-request state (e.g. metrics timings) follows
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(contextvars.copy_context().run, asyncio.run, coro).result()
+
+
+def process_memory_mb() -> Optional[float]:
+    """
+    Resident memory of the current process in MB
+    
+    Uses psutil when installed, then /proc (Linux), then the peak RSS from
+    the resource module.
+    
+    Returns:
+        Memory in MB, or None if it cannot be determined
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return None
@@ -1,77 +1,517 @@
 """
 Vector Store Management for Resume Embeddings
+
+chromadb and sentence_transformers are imported on first use, so importing
+this module (and printing CLI help) stays fast.
 """
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict
+import contextlib
+import os
+import threading
+import time
+from typing import List, Dict, Optional, Tuple
+import numpy as np
 import config
+import metrics
+from dedup import DedupIndex
+from embedding_cache import EmbeddingCache
+from embedding_engine import cache_namespace, load_embedding_model
+from utils import join_chunks, split_into_chunks
+
+
+# Metadata fields added to each stored resume chunk (resume_text is on the first chunk only)
+CHUNK_METADATA_KEYS = ('parent_id', 'chunk_index', 'chunk_count', 'word_start', 'word_end', 'resume_text')
+
+
+def aggregate_chunk_scores(similarities: np.ndarray, parent_index: np.ndarray, n_parents: int,
+                           method: str = None, top_n: int = None) -> np.ndarray:
+    """
+    Aggregate chunk-level similarities into one score per parent document
+    
+    Args:
+        similarities: Array of shape (n_chunks,) or (n_chunks, n_queries)
+        parent_index: Parent position (0..n_parents-1) of each chunk
+        n_parents: Number of parent documents
+        method: "max" or "top_n_mean" (defaults to config.CHUNK_AGGREGATION)
+        top_n: Chunks averaged per parent for "top_n_mean" (defaults to config.CHUNK_TOP_N)
+    
+    Returns:
+        Array of shape (n_parents,) or (n_parents, n_queries)
+    """
+    method = method or config.CHUNK_AGGREGATION
+    top_n = top_n or config.CHUNK_TOP_N
+    
+    if method == "max":
+        scores = np.full((n_parents,) + similarities.shape[1:], -np.inf, dtype=np.float32)
+        np.maximum.at(scores, parent_index, similarities)
+        return scores
+    
+    if method != "top_n_mean":
+        raise ValueError(f"Unknown chunk aggregation method: {method}")
+    
+    if similarities.ndim == 2:
+        return np.stack([
+            aggregate_chunk_scores(similarities[:, j], parent_index, n_parents, method, top_n)
+            for j in range(similarities.shape[1])
+        ], axis=1)
+    
+    # Sort by parent, then by similarity (descending) within each parent
+    order = np.lexsort((-similarities, parent_index))
+    sorted_parents = parent_index[order]
+    group_starts = np.searchsorted(sorted_parents, np.arange(n_parents))
+    keep = np.arange(len(order)) - group_starts[sorted_parents] < top_n
+    
+    sums = np.bincount(sorted_parents[keep], weights=similarities[order][keep], minlength=n_parents)
+    counts = np.bincount(sorted_parents[keep], minlength=n_parents)
+    return (sums / np.maximum(counts, 1)).astype(np.float32)
+
+
+def _is_legacy_job_entry(doc_id: str, metadata: Dict) -> bool:
+    """Job description stored in the resume collection by older versions (ids 'job_*', no chunk metadata)"""
+    return doc_id.startswith('job_') and 'parent_id' not in metadata
 
 
 class VectorStore:
-    """Manages vector embeddings and semantic search"""
+    """
+    Manages vector embeddings and semantic search
     
-    def __init__(self):
-        self.embedding_model = SentenceTransformer(config.EMBEDDING_MODEL)
-        self.client = chromadb.PersistentClient(
-            path=config.VECTOR_DB_PATH,
-            settings=Settings(anonymized_telemetry=False)
-        )
-        self.collection = self.client.get_or_create_collection(
-            name=config.COLLECTION_NAME,
+    One instance can be shared by many threads: lazy initialization, model
+    inference and index writes are serialized by locks.
+    """
+    
+    def __init__(self, embedding_model=None, use_cache: bool = None):
+        """
+        Args:
+            embedding_model: Model to use instead of config.EMBEDDING_MODEL (anything
+                with a SentenceTransformer-style encode(), e.g. a local fake for
+                benchmarks). Models with a true `thread_safe` attribute are called
+                without the encode lock.
+            use_cache: Use the embedding cache, which is keyed by the configured
+                model (defaults to config.EMBEDDING_CACHE_ENABLED without an injected
+                model; pass True for a wrapper around the configured model)
+        """
+        # Heavy resources are created on first use (see warmup)
+        self._embedding_model = embedding_model
+        self._client = None
+        self._collection = None
+        self._job_collection = None
+        self._dedup_index = None
+        # Cached by _resume_pool for score_indexed_resumes
+        self._pool = None
+        self.load_times = {}
+        self._init_lock = threading.RLock()
+        # Fast tokenizers are not safe to call from several threads at once
+        self._encode_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        if use_cache is None:
+            use_cache = config.EMBEDDING_CACHE_ENABLED and embedding_model is None
+        self.embedding_cache = EmbeddingCache(cache_namespace()) if use_cache else None
+    
+    @property
+    def embedding_model(self):
+        """SentenceTransformer model for config.EMBEDDING_ENGINE, loaded on first use"""
+        if self._embedding_model is None:
+            with self._init_lock:
+                if self._embedding_model is None:
+                    start = time.perf_counter()
+                    self._embedding_model = load_embedding_model()
+                    self.load_times['embedding_model'] = time.perf_counter() - start
+        return self._embedding_model
+    
+    @property
+    def client(self):
+        """Persistent vector database client (per config.VECTOR_BACKEND), opened on first use"""
+        if self._client is None:
+            with self._init_lock:
+                if self._client is None:
+                    start = time.perf_counter()
+                    if config.VECTOR_BACKEND == "numpy":
+                        from numpy_index import NumpyClient
+                        self._client = NumpyClient(config.NUMPY_INDEX_PATH)
+                        self.load_times['numpy_index'] = time.perf_counter() - start
+                        return self._client
+                    import chromadb
+                    from chromadb.config import Settings
+                    self._client = chromadb.PersistentClient(
+                        path=config.VECTOR_DB_PATH,
+                        settings=Settings(anonymized_telemetry=False)
+                    )
+                    self.load_times['chroma_client'] = time.perf_counter() - start
+        return self._client
+    
+    @property
+    def collection(self):
+        """Resume collection, opened on first use"""
+        if self._collection is None:
+            with self._init_lock:
+                if self._collection is None:
+                    self._collection = self._open_collection(config.RESUME_COLLECTION_NAME)
+        return self._collection
+    
+    @property
+    def job_collection(self):
+        """Job description collection, opened on first use"""
+        if self._job_collection is None:
+            with self._init_lock:
+                if self._job_collection is None:
+                    self._job_collection = self._open_collection(config.JOB_COLLECTION_NAME)
+        return self._job_collection
+    
+    @property
+    def dedup_index(self):
+        """Near-duplicate index of the stored resumes (None when config.DEDUP_ENABLED is off), opened on first use"""
+        if self._dedup_index is None and config.DEDUP_ENABLED:
+            with self._init_lock:
+                if self._dedup_index is None:
+                    self._dedup_index = DedupIndex()
+        return self._dedup_index
+    
+    def _open_collection(self, name: str):
+        return self.client.get_or_create_collection(
+            name=name,
             metadata={"hnsw:space": "cosine"}
         )
     
-    def add_resume(self, resume_id: str, resume_text: str, metadata: Dict = None):
-        """Add a resume to the vector store"""
-        embedding = self.embedding_model.encode(resume_text).tolist()
-        
-        self.collection.add(
-            ids=[resume_id],
-            embeddings=[embedding],
-            documents=[resume_text],
-            metadatas=[metadata or {}]
+    def warmup(self):
+        """Load the embedding model and open the collection now instead of on first use"""
+        with self._encode_lock:
+            self.embedding_model.encode(["warmup"])
+        self.collection.count()
+        return dict(self.load_times)
+    
+    def embed(self, texts: List[str], batch_size: int = None) -> np.ndarray:
+        """
+        Embed texts as unit-length float32 vectors
+        
+        Texts embedded before (in any process) are read from the embedding
+        cache; only new texts go through the model, in one batched call.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Texts per encode batch (defaults to config.EMBEDDING_BATCH_SIZE)
+        
+        Returns:
+            Array of shape (len(texts), dimension)
+        """
+        def encode(new_texts: List[str]) -> np.ndarray:
+            model = self.embedding_model
+            with contextlib.nullcontext() if getattr(model, 'thread_safe', False) else self._encode_lock:
+                return model.encode(
+                    new_texts,
+                    batch_size=batch_size or config.EMBEDDING_BATCH_SIZE,
+                    normalize_embeddings=True
+                )
+        
+        with metrics.span('embed'):
+            if self.embedding_cache is None:
+                return np.asarray(encode(texts), dtype=np.float32)
+            return self.embedding_cache.encode(texts, encode)
+    
+    def chunk_resume(self, resume_text: str) -> List[Dict]:
+        """
+        Split a resume into section-aware chunks that fit the embedding model's input
+        
+        The model truncates long inputs, so a whole-resume embedding only
+        reflects its first page; chunking keeps the rest searchable.
+        """
+        chunks = split_into_chunks(
+            resume_text,
+            chunk_size=config.RESUME_CHUNK_SIZE,
+            stride=config.RESUME_CHUNK_STRIDE,
+            max_chunks=config.RESUME_MAX_CHUNKS
         )
+        return chunks or [{'text': resume_text, 'word_start': 0, 'word_end': 0}]
+    
+    def embed_resumes(self, resume_texts: List[str], batch_size: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Chunk resumes and embed every chunk in one batched call
+        
+        Returns:
+            Tuple of (chunk embeddings, parent index of each chunk into resume_texts)
+        """
+        chunk_texts = []
+        parent_index = []
+        for i, resume_text in enumerate(resume_texts):
+            for chunk in self.chunk_resume(resume_text):
+                chunk_texts.append(chunk['text'])
+                parent_index.append(i)
+        
+        return self.embed(chunk_texts, batch_size=batch_size), np.asarray(parent_index, dtype=np.int64)
+    
+    def add_resume(self, resume_id: str, resume_text: str, metadata: Dict = None):
+        """Add a resume to the vector store (one entry per chunk, sharing a parent_id)"""
+        self.add_resumes([{'id': resume_id, 'text': resume_text, 'metadata': metadata}])
+    
+    def add_resumes(self, resumes: List[Dict], batch_size: int = None) -> int:
+        """
+        Add many resumes to the vector store
+        
+        All chunks are embedded in one batched pass and written with
+        `collection.add` calls of at most `batch_size` entries. The original
+        text is kept in the first chunk's metadata for LLM evaluation; resumes
+        longer than config.RESUME_MAX_CHUNKS chunks are searchable by their
+        first chunks only, are marked 'truncated' and are counted in the
+        'resumes_truncated' metric.
+        
+        Args:
+            resumes: List of dictionaries with 'id', 'text' and optional 'metadata' keys
+            batch_size: Entries per collection.add call (defaults to config.INGEST_ADD_BATCH_SIZE)
+        
+        Returns:
+            Number of chunks written
+        """
+        if not resumes:
+            return 0
+        batch_size = batch_size or config.INGEST_ADD_BATCH_SIZE
+        
+        ids, documents, metadatas = [], [], []
+        for resume in resumes:
+            chunks = self.chunk_resume(resume['text'])
+            resume_metadata = dict(resume.get('metadata') or {})
+            if 0 < chunks[-1]['word_end'] < len(resume['text'].split()):
+                resume_metadata['truncated'] = True
+                metrics.count('resumes_truncated')
+            for i, chunk in enumerate(chunks):
+                ids.append(f"{resume['id']}#chunk{i}")
+                documents.append(chunk['text'])
+                metadatas.append({
+                    **resume_metadata,
+                    'parent_id': resume['id'],
+                    'chunk_index': i,
+                    'chunk_count': len(chunks),
+                    'word_start': chunk['word_start'],
+                    'word_end': chunk['word_end'],
+                    **({'resume_text': resume['text']} if i == 0 else {})
+                })
+        embeddings = self.embed(documents)
+        
+        with self._write_lock, metrics.span('vector_write'):
+            # Replace any chunks from a previous version of these resumes
+            self.collection.delete(where={'parent_id': {'$in': [resume['id'] for resume in resumes]}})
+            
+            for start in range(0, len(ids), batch_size):
+                end = start + batch_size
+                self.collection.add(
+                    ids=ids[start:end],
+                    embeddings=embeddings[start:end].tolist(),
+                    documents=documents[start:end],
+                    metadatas=metadatas[start:end]
+                )
+            self._pool = None
+        
+        return len(ids)
+    
+    def delete_resumes(self, resume_ids: List[str]):
+        """Remove every chunk of some resumes"""
+        if not resume_ids:
+            return
+        with self._write_lock:
+            self.collection.delete(where={'parent_id': {'$in': list(resume_ids)}})
+            self._pool = None
     
     def add_job_description(self, job_id: str, job_description: str, metadata: Dict = None):
-        """Add a job description to the vector store"""
-        embedding = self.embedding_model.encode(job_description).tolist()
-        
-        self.collection.add(
-            ids=[f"job_{job_id}"],
-            embeddings=[embedding],
-            documents=[job_description],
-            metadatas=[metadata or {}]
-        )
+        """Add a job description to the job collection (kept apart from resumes)"""
+        embedding = self.embed([job_description])[0].tolist()
+        
+        with self._write_lock:
+            self.job_collection.upsert(
+                ids=[job_id],
+                embeddings=[embedding],
+                documents=[job_description],
+                metadatas=[{**(metadata or {}), 'job_id': job_id}]
+            )
+    
+    def top_jobs_for_resume(self, resume_text: str, top_k: int = 5) -> List[Dict]:
+        """
+        Find the indexed job descriptions that best match a resume
+        
+        Every chunk of the resume queries the job collection; a job's score
+        is its best chunk similarity.
+        
+        Returns:
+            List of matches with 'id', 'text', 'similarity' and 'metadata',
+            sorted by similarity (highest first)
+        """
+        job_count = self.job_collection.count()
+        if job_count == 0:
+            return []
+        
+        chunk_embeddings, _ = self.embed_resumes([resume_text])
+        with metrics.span('vector_query'):
+            results = self.job_collection.query(
+                query_embeddings=chunk_embeddings.tolist(),
+                n_results=min(top_k, job_count)
+            )
+        
+        best = {}
+        for chunk_position in range(len(results['ids'])):
+            for i, job_id in enumerate(results['ids'][chunk_position]):
+                similarity = 1 - results['distances'][chunk_position][i]
+                if job_id not in best or similarity > best[job_id]['similarity']:
+                    best[job_id] = {
+                        'id': job_id,
+                        'text': results['documents'][chunk_position][i],
+                        'similarity': similarity,
+                        'metadata': (results['metadatas'][chunk_position][i] if results['metadatas'] else None) or {}
+                    }
+        
+        return sorted(best.values(), key=lambda match: match['similarity'], reverse=True)[:top_k]
     
     def semantic_search(self, query_text: str, top_k: int = 5) -> List[Dict]:
         """
-        Perform semantic search on resumes/job descriptions
+        Perform semantic search on indexed resumes
         Returns list of matches with scores
+        
+        Resume chunks are collapsed to their parent resume: each match has the
+        parent id and the text and similarity of its best-matching chunk.
         """
-        query_embedding = self.embedding_model.encode(query_text).tolist()
+        query_embedding = self.embed([query_text])[0].tolist()
         
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k
-        )
+        with metrics.span('vector_query'):
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=min(top_k * config.RESUME_MAX_CHUNKS, max(self.collection.count(), 1))
+            )
         
         matches = []
+        seen = set()
         if results['ids'] and len(results['ids'][0]) > 0:
             for i in range(len(results['ids'][0])):
+                metadata = results['metadatas'][0][i] if results['metadatas'] else None
+                metadata = metadata or {}
+                if _is_legacy_job_entry(results['ids'][0][i], metadata):
+                    continue
+                parent_id = metadata.get('parent_id', results['ids'][0][i])
+                if parent_id in seen:
+                    continue
+                seen.add(parent_id)
+                
                 # Convert distance to similarity score (1 - distance for cosine similarity)
                 distance = results['distances'][0][i]
                 similarity = 1 - distance  # Cosine distance to similarity
                 
                 matches.append({
-                    'id': results['ids'][0][i],
+                    'id': parent_id,
                     'text': results['documents'][0][i],
                     'similarity': similarity,
-                    'metadata': results['metadatas'][0][i] if results['metadatas'] else {}
+                    'metadata': {k: v for k, v in metadata.items() if k not in CHUNK_METADATA_KEYS}
                 })
+                if len(matches) == top_k:
+                    break
         
         return matches
     
+    def _resume_pool(self) -> Optional[Dict]:
+        """
+        Unit chunk embeddings of every indexed resume, grouped by parent
+        
+        Cached between calls and rebuilt after a write through this store, or
+        when the collection's size changes (e.g. another process ingested).
+        Chunk texts are not kept; see resume_texts.
+        
+        Returns:
+            Dictionary with 'embeddings', 'parent_index', 'parent_ids' and
+            'metadata' (per parent), or None when no resume is indexed
+        """
+        count = self.collection.count()
+        pool = self._pool
+        if pool is not None and pool['count'] == count:
+            return pool['data']
+        
+        with metrics.span('vector_get'):
+            results = self.collection.get(include=['embeddings', 'metadatas'])
+        
+        indices = []
+        parent_index = []
+        parent_ids = []
+        parent_positions = {}
+        parent_metadata = []
+        for i, doc_id in enumerate(results['ids']):
+            metadata = (results['metadatas'][i] if results['metadatas'] else None) or {}
+            if _is_legacy_job_entry(doc_id, metadata):
+                continue
+            parent_id = metadata.get('parent_id', doc_id)
+            if parent_id not in parent_positions:
+                parent_positions[parent_id] = len(parent_ids)
+                parent_ids.append(parent_id)
+                parent_metadata.append({k: v for k, v in metadata.items() if k not in CHUNK_METADATA_KEYS})
+            indices.append(i)
+            parent_index.append(parent_positions[parent_id])
+        
+        data = None
+        if indices:
+            embeddings = np.asarray(results['embeddings'], dtype=np.float32)[indices]
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+            data = {
+                'embeddings': embeddings,
+                'parent_index': np.asarray(parent_index),
+                'parent_ids': parent_ids,
+                'metadata': parent_metadata
+            }
+        self._pool = {'count': count, 'data': data}
+        return data
+    
+    def score_indexed_resumes(self, job_description: str) -> List[Dict]:
+        """
+        Score every indexed resume against a job description
+        
+        Scores the whole pool exactly (one matrix-vector product over the
+        stored chunk embeddings, aggregated per resume) rather than through
+        the approximate index. Use resume_texts for the text of the matches
+        that need it.
+        
+        Returns:
+            List of matches with 'id', 'similarity' and 'metadata', sorted by
+            similarity (highest first)
+        """
+        pool = self._resume_pool()
+        if pool is None:
+            return []
+        
+        job_embedding = self.embed([job_description])[0]
+        similarities = aggregate_chunk_scores(
+            pool['embeddings'] @ job_embedding, pool['parent_index'], len(pool['parent_ids'])
+        )
+        return [
+            {
+                'id': pool['parent_ids'][position],
+                'similarity': float(similarities[position]),
+                'metadata': dict(pool['metadata'][position])
+            }
+            for position in np.argsort(-similarities)
+        ]
+    
+    def resume_texts(self, resume_ids: List[str]) -> Dict[str, str]:
+        """
+        Indexed resumes as they were added, by ID
+        
+        The text is stored with each resume's first chunk; resumes indexed
+        before that are rebuilt from their chunks (whitespace normalized).
+        """
+        if not resume_ids:
+            return {}
+        results = self.collection.get(ids=[f"{resume_id}#chunk0" for resume_id in resume_ids],
+                                      include=['metadatas'])
+        texts = {}
+        for metadata in results['metadatas'] or []:
+            if metadata and 'resume_text' in metadata:
+                texts[metadata['parent_id']] = metadata['resume_text']
+        
+        missing = [resume_id for resume_id in resume_ids if resume_id not in texts]
+        if missing:
+            chunks = {}
+            results = self.collection.get(where={'parent_id': {'$in': missing}}, include=['documents', 'metadatas'])
+            for document, metadata in zip(results['documents'], results['metadatas']):
+                chunks.setdefault(metadata['parent_id'], []).append(
+                    {'text': document, 'word_start': metadata.get('word_start', 0)}
+                )
+            texts.update((resume_id, join_chunks(resume_chunks)) for resume_id, resume_chunks in chunks.items())
+            # Whole-resume entries from before chunking
+            missing = [resume_id for resume_id in missing if resume_id not in texts]
+            if missing:
+                results = self.collection.get(ids=missing, include=['documents'])
+                texts.update(zip(results['ids'], results['documents']))
+        return texts
+    
     def calculate_semantic_score(self, resume_text: str, job_description: str) -> float:
         """
         Calculate semantic similarity score between resume and job description
@@ -83,21 +523,80 @@ class VectorStore:
             # Use the best match score
             return matches[0]['similarity']
         else:
-            # If no matches, calculate direct similarity
-            resume_embedding = self.embedding_model.encode(resume_text)
-            job_embedding = self.embedding_model.encode(job_description)
-            
-            # Cosine similarity
-            import numpy as np
-            similarity = np.dot(resume_embedding, job_embedding) / (
-                np.linalg.norm(resume_embedding) * np.linalg.norm(job_embedding)
-            )
-            return float(similarity)
+            # If no matches, calculate direct (chunk-aggregated) similarity
+            return self.calculate_semantic_scores([resume_text], job_description)[0]
     
-    def clear_collection(self):
-        """Clear all documents from the collection"""
-        self.client.delete_collection(name=config.COLLECTION_NAME)
-        self.collection = self.client.get_or_create_collection(
-            name=config.COLLECTION_NAME,
-            metadata={"hnsw:space": "cosine"}
+    def calculate_semantic_scores(self, resume_texts: List[str], job_description: str,
+                                  batch_size: int = None, job_embedding: np.ndarray = None) -> List[float]:
+        """
+        Calculate semantic similarity scores for many resumes against one job description
+        
+        The job description is encoded once, the chunks of all resumes are
+        encoded in batched `encode` calls, and every cosine similarity comes
+        from a single matrix-vector product, aggregated per resume.
+        
+        Args:
+            resume_texts: List of resume texts
+            job_description: The job description text
+            batch_size: Number of chunks per encode batch (defaults to config.EMBEDDING_BATCH_SIZE)
+            job_embedding: Precomputed unit-length embedding of the job description
+        
+        Returns:
+            List of scores between 0 and 1, in the same order as resume_texts
+        """
+        if not resume_texts:
+            return []
+        
+        if job_embedding is None:
+            job_embedding = self.embed([job_description])[0]
+        chunk_embeddings, parent_index = self.embed_resumes(resume_texts, batch_size=batch_size)
+        
+        # Rows are unit vectors, so the dot product is the cosine similarity
+        similarities = aggregate_chunk_scores(
+            chunk_embeddings @ job_embedding, parent_index, len(resume_texts)
         )
+        return similarities.astype(float).tolist()
+    
+    def semantic_score_matrix(self, resume_texts: List[str], job_descriptions: List[str],
+                              batch_size: int = None) -> np.ndarray:
+        """
+        Semantic similarity of every resume against every job description
+        
+        Each resume and each job description is embedded once; all chunk
+        similarities come from a single matrix product and are aggregated
+        per resume.
+        
+        Args:
+            resume_texts: List of M resume texts
+            job_descriptions: List of N job description texts
+            batch_size: Number of chunks per encode batch (defaults to config.EMBEDDING_BATCH_SIZE)
+        
+        Returns:
+            float32 array of shape (M, N)
+        """
+        if not resume_texts or not job_descriptions:
+            return np.zeros((len(resume_texts), len(job_descriptions)), dtype=np.float32)
+        
+        job_embeddings = self.embed(job_descriptions, batch_size=batch_size)
+        chunk_embeddings, parent_index = self.embed_resumes(resume_texts, batch_size=batch_size)
+        
+        return aggregate_chunk_scores(
+            chunk_embeddings @ job_embeddings.T, parent_index, len(resume_texts)
+        ).astype(np.float32)
+    
+    def clear_collection(self):
+        """Clear all resumes and job descriptions"""
+        # Make sure both collections exist before deleting them
+        self.collection, self.job_collection
+        with self._write_lock:
+            self.client.delete_collection(name=config.RESUME_COLLECTION_NAME)
+            self.client.delete_collection(name=config.JOB_COLLECTION_NAME)
+            self._collection = self._open_collection(config.RESUME_COLLECTION_NAME)
+            self._job_collection = self._open_collection(config.JOB_COLLECTION_NAME)
+            self._pool = None
+        # Links to originals that are no longer stored would drop their next copies
+        dedup_index = self.dedup_index
+        if dedup_index is None and os.path.exists(config.DEDUP_INDEX_PATH):
+            dedup_index = DedupIndex()
+        if dedup_index is not None:
+            dedup_index.clear()
@@ -0,0 +1,630 @@
+"""
+Durable work queue for large batch screenings
+
+A batch is a job description plus one task per resume, stored in SQLite so
+it survives crashes. Worker processes claim small groups of tasks under a
+time-limited lease, screen them with batch_screen_resumes and write each
+result as soon as it is done. A worker that dies simply lets its lease
+expire and the tasks are claimed again; failed tasks are retried after a
+delay until they reach the attempt limit.
+
+Resumes can be given as text or as file paths, which the workers extract
+themselves (so PDF parsing is spread over the workers too).
+
+Near-duplicate resumes (see dedup.py) are detected across the whole batch:
+text resumes are fingerprinted at enqueue time and file resumes by the
+worker that extracts them. A duplicate task waits for the first copy and
+receives a copy of its result instead of being screened.
+"""
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import config
+from dedup import MinHasher, bucket_keys, estimate_similarity
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+WAITING = 'waiting'  # Near-duplicate waiting for the result of its first copy
+
+# Window used for the recent throughput in status()
+THROUGHPUT_WINDOW_SECONDS = 60
+
+
+class WorkQueue:
+    """
+    SQLite-backed queue of resume screening tasks
+    
+    Safe to use from several processes at once: claims run in an IMMEDIATE
+    transaction, so two workers never lease the same task.
+    """
+    
+    def __init__(self, path: str = None):
+        self.path = path or config.WORK_QUEUE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        # Autocommit mode; multi-statement updates open their own transactions
+        self._conn = sqlite3.connect(self.path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS batches ("
+            "id TEXT PRIMARY KEY, job_description TEXT NOT NULL, options TEXT NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, batch_id TEXT NOT NULL, resume_id TEXT NOT NULL, "
+            "resume_text TEXT, source_path TEXT, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "available_at REAL NOT NULL DEFAULT 0, lease_owner TEXT, lease_expires REAL, "
+            "result TEXT, error TEXT, claimed_at REAL, completed_at REAL, "
+            "UNIQUE (batch_id, resume_id))"
+        )
+        # Columns added after the first release, for queues created before them
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        for column, definition in (('fingerprinted', "INTEGER NOT NULL DEFAULT 0"),
+                                   ('duplicate_of', "INTEGER"), ('similarity', "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {definition}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (status, available_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_batch ON tasks (batch_id, status)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_duplicate_of ON tasks (duplicate_of)")
+        # LSH buckets of the first copy of each resume, per batch
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS task_signatures (task_id INTEGER PRIMARY KEY, signature BLOB NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS task_buckets (batch_id TEXT NOT NULL, bucket TEXT NOT NULL, "
+            "task_id INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS task_buckets_bucket ON task_buckets (batch_id, bucket)")
+        self._hasher = None
+    
+    def close(self):
+        self._conn.close()
+    
+    def enqueue(self, resumes: List[Dict], job_description: str, batch_id: str = None,
+                options: Dict = None) -> Dict:
+        """
+        Add a batch (or more resumes to an existing batch)
+        
+        Resumes already in the batch (same id) are left as they are, so
+        enqueueing the same input again only adds what is new. Resumes given
+        as text are fingerprinted here, unless options has 'dedup': False.
+        
+        Args:
+            resumes: Dictionaries with 'id' and either 'text' or 'path'
+            job_description: The job description text
+            batch_id: Batch to create or extend (a new id is generated if omitted)
+            options: Keyword arguments for batch_screen_resumes (e.g. {'bounded': True})
+        
+        Returns:
+            Dictionary with 'batch_id', 'added', 'skipped' (ids already in the batch),
+            'duplicates' (near-duplicates among the added resumes) and 'total'
+        """
+        batch_id = batch_id or uuid.uuid4().hex[:12]
+        now = time.time()
+        dedup = (options or {}).get('dedup', config.DEDUP_ENABLED)
+        signatures = {
+            str(resume['id']): self.signature(resume['text'])
+            for resume in resumes if dedup and resume.get('text')
+        }
+        duplicates = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT job_description FROM batches WHERE id = ?", (batch_id,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute(
+                        "INSERT INTO batches (id, job_description, options, created_at) VALUES (?, ?, ?, ?)",
+                        (batch_id, job_description, json.dumps(options or {}), now)
+                    )
+                elif row[0] != job_description:
+                    raise ValueError(f"Batch '{batch_id}' already exists with a different job description")
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO tasks (batch_id, resume_id, resume_text, source_path, status) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(batch_id, str(resume['id']), resume.get('text'), resume.get('path'), PENDING)
+                     for resume in resumes]
+                )
+                added = self._conn.total_changes - before
+                if signatures:
+                    unfingerprinted = self._conn.execute(
+                        "SELECT id, resume_id FROM tasks WHERE batch_id = ? AND fingerprinted = 0 "
+                        "AND resume_text IS NOT NULL ORDER BY id", (batch_id,)
+                    ).fetchall()
+                    for task_id, resume_id in unfingerprinted:
+                        if resume_id in signatures:
+                            duplicates += self._link_duplicate(batch_id, task_id, signatures[resume_id]) is not None
+                total = self._conn.execute(
+                    "SELECT COUNT(*) FROM tasks WHERE batch_id = ?", (batch_id,)
+                ).fetchone()[0]
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return {'batch_id': batch_id, 'added': added, 'skipped': len(resumes) - added,
+                'duplicates': duplicates, 'total': total}
+    
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of a resume text (None when it has no words)"""
+        if self._hasher is None:
+            self._hasher = MinHasher()
+        return self._hasher.signature(text)
+    
+    def _link_duplicate(self, batch_id: str, task_id: int, signature: Optional[np.ndarray]) -> Optional[Dict]:
+        """
+        Link a task to an earlier near-duplicate in its batch, or record it as a first copy
+        
+        Runs inside the caller's transaction. A linked task is set to waiting,
+        or done straight away if the first copy already has its result.
+        
+        Returns:
+            {'task_id', 'similarity'} of the first copy, or None
+        """
+        self._conn.execute("UPDATE tasks SET fingerprinted = 1 WHERE id = ?", (task_id,))
+        if signature is None:
+            return None
+        keys = bucket_keys(signature, config.DEDUP_BANDS)
+        candidates = self._conn.execute(
+            f"SELECT s.task_id, s.signature FROM task_signatures s JOIN tasks t ON t.id = s.task_id "
+            f"WHERE t.status != ? AND s.task_id IN (SELECT task_id FROM task_buckets "
+            f"WHERE batch_id = ? AND bucket IN ({','.join('?' * len(keys))}))",
+            (FAILED, batch_id, *keys)
+        ).fetchall()
+        best = None
+        for candidate_id, blob in candidates:
+            similarity = estimate_similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if similarity >= config.DEDUP_THRESHOLD and (best is None or similarity > best['similarity']):
+                best = {'task_id': candidate_id, 'similarity': similarity}
+        
+        if best is None:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO task_signatures (task_id, signature) VALUES (?, ?)",
+                (task_id, signature.tobytes())
+            )
+            self._conn.executemany(
+                "INSERT INTO task_buckets (batch_id, bucket, task_id) VALUES (?, ?, ?)",
+                [(batch_id, key, task_id) for key in keys]
+            )
+            return None
+        self._conn.execute(
+            "UPDATE tasks SET status = ?, duplicate_of = ?, similarity = ?, lease_owner = NULL WHERE id = ?",
+            (WAITING, best['task_id'], best['similarity'], task_id)
+        )
+        self._copy_result_to_duplicates(best['task_id'])
+        return best
+    
+    def _copy_result_to_duplicates(self, task_id: int):
+        """Finish the waiting duplicates of a task that is done (inside a transaction)"""
+        row = self._conn.execute(
+            "SELECT resume_id, result FROM tasks WHERE id = ? AND status = ?", (task_id, DONE)
+        ).fetchone()
+        if row is None:
+            return
+        original_id, original_result = row[0], json.loads(row[1])
+        waiting = self._conn.execute(
+            "SELECT id, resume_id, similarity FROM tasks WHERE duplicate_of = ? AND status = ?",
+            (task_id, WAITING)
+        ).fetchall()
+        now = time.time()
+        for duplicate_id, resume_id, similarity in waiting:
+            result = dict(original_result, resume_id=resume_id, collapsed=True,
+                          duplicate_of=original_id, duplicate_similarity=round(similarity, 3))
+            self._conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = NULL, completed_at = ? WHERE id = ?",
+                (DONE, json.dumps(result, default=float), now, duplicate_id)
+            )
+    
+    def _release_duplicates_of_failed(self):
+        """Send duplicates of tasks that gave up back to the queue to be screened themselves"""
+        self._conn.execute(
+            "UPDATE tasks SET status = ?, duplicate_of = NULL, similarity = NULL, available_at = 0 "
+            "WHERE status = ? AND duplicate_of IN (SELECT id FROM tasks WHERE status = ?)",
+            (PENDING, WAITING, FAILED)
+        )
+    
+    def fingerprint(self, worker_id: str, task_id: int, text: str) -> Optional[Dict]:
+        """
+        Fingerprint a leased task once its text is known (for resumes given as paths)
+        
+        Returns:
+            {'task_id', 'similarity'} of the earlier copy the task now waits for
+            (its lease is released), or None if it is a first copy to screen
+        """
+        signature = self.signature(text)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT batch_id FROM tasks WHERE id = ? AND status = ? AND lease_owner = ?",
+                    (task_id, LEASED, worker_id)
+                ).fetchone()
+                link = self._link_duplicate(row[0], task_id, signature) if row else None
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return link
+    
+    def claim(self, worker_id: str, limit: int = None, lease_seconds: float = None,
+              batch_id: str = None, max_attempts: int = None) -> Optional[Dict]:
+        """
+        Lease up to `limit` runnable tasks of one batch
+        
+        Runnable tasks are pending ones whose retry delay has passed and
+        leased ones whose lease expired. Expired tasks that already used up
+        their attempts are marked failed instead.
+        
+        Returns:
+            {'batch_id', 'job_description', 'options', 'tasks': [...]}, or None
+            when nothing is runnable
+        """
+        limit = limit or config.WORK_QUEUE_CLAIM_SIZE
+        lease_seconds = lease_seconds or config.WORK_QUEUE_LEASE_SECONDS
+        max_attempts = max_attempts or config.WORK_QUEUE_MAX_ATTEMPTS
+        now = time.time()
+        batch_filter, batch_args = ("AND batch_id = ?", (batch_id,)) if batch_id else ("", ())
+        
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE tasks SET status = ?, error = COALESCE(error, 'Lease expired'), "
+                    "lease_owner = NULL, completed_at = ? "
+                    "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                    (FAILED, now, LEASED, now, max_attempts)
+                )
+                self._release_duplicates_of_failed()
+                first = self._conn.execute(
+                    f"SELECT batch_id FROM tasks WHERE ((status = ? AND available_at <= ?) "
+                    f"OR (status = ? AND lease_expires < ?)) {batch_filter} ORDER BY id LIMIT 1",
+                    (PENDING, now, LEASED, now, *batch_args)
+                ).fetchone()
+                if first is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                rows = self._conn.execute(
+                    "SELECT id, resume_id, resume_text, source_path, attempts, fingerprinted FROM tasks "
+                    "WHERE batch_id = ? AND ((status = ? AND available_at <= ?) OR (status = ? AND lease_expires < ?)) "
+                    "ORDER BY id LIMIT ?",
+                    (first[0], PENDING, now, LEASED, now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE tasks SET status = ?, lease_owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, claimed_at = ? WHERE id = ?",
+                    [(LEASED, worker_id, now + lease_seconds, now, row[0]) for row in rows]
+                )
+                job_description, options = self._conn.execute(
+                    "SELECT job_description, options FROM batches WHERE id = ?", (first[0],)
+                ).fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        
+        return {
+            'batch_id': first[0],
+            'job_description': job_description,
+            'options': json.loads(options),
+            'tasks': [
+                {'id': row[0], 'resume_id': row[1], 'text': row[2], 'path': row[3], 'attempts': row[4] + 1,
+                 'fingerprinted': bool(row[5])}
+                for row in rows
+            ]
+        }
+    
+    def renew(self, worker_id: str, task_ids: List[int], lease_seconds: float = None) -> int:
+        """Extend the leases this worker still holds; returns how many were extended"""
+        lease_seconds = lease_seconds or config.WORK_QUEUE_LEASE_SECONDS
+        with self._lock:
+            cursor = self._conn.executemany(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                [(time.time() + lease_seconds, task_id, LEASED, worker_id) for task_id in task_ids]
+            )
+            return cursor.rowcount
+    
+    def complete(self, worker_id: str, task_id: int, result: Dict) -> bool:
+        """
+        Store a task's result, and a copy of it for each waiting near-duplicate
+        
+        Returns:
+            False if the lease was lost (e.g. it expired and another worker took
+            the task), in which case the result is discarded
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "UPDATE tasks SET status = ?, result = ?, error = NULL, lease_owner = NULL, completed_at = ? "
+                    "WHERE id = ? AND status = ? AND lease_owner = ?",
+                    (DONE, json.dumps(result, default=float), time.time(), task_id, LEASED, worker_id)
+                )
+                completed = cursor.rowcount == 1
+                if completed:
+                    self._copy_result_to_duplicates(task_id)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return completed
+    
+    def fail(self, worker_id: str, task_id: int, error: str, attempts: int,
+             max_attempts: int = None, retry_delay: float = None) -> str:
+        """
+        Record a failed attempt: retry later, or give up after max_attempts
+        
+        Returns:
+            The task's new status (pending or failed)
+        """
+        max_attempts = max_attempts or config.WORK_QUEUE_MAX_ATTEMPTS
+        retry_delay = retry_delay if retry_delay is not None else config.WORK_QUEUE_RETRY_DELAY_SECONDS
+        status = FAILED if attempts >= max_attempts else PENDING
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE tasks SET status = ?, error = ?, lease_owner = NULL, available_at = ?, "
+                    "completed_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                    (status, error, now + retry_delay * attempts, now if status == FAILED else None,
+                     task_id, LEASED, worker_id)
+                )
+                if status == FAILED:
+                    self._release_duplicates_of_failed()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return status
+    
+    def retry_failed(self, batch_id: str = None) -> int:
+        """Give failed tasks a fresh set of attempts; returns how many were reset"""
+        batch_filter, batch_args = ("AND batch_id = ?", (batch_id,)) if batch_id else ("", ())
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE tasks SET status = ?, attempts = 0, available_at = 0, completed_at = NULL "
+                f"WHERE status = ? {batch_filter}",
+                (PENDING, FAILED, *batch_args)
+            )
+            return cursor.rowcount
+    
+    def has_work(self, batch_id: str = None) -> bool:
+        """Whether any task is pending, leased or waiting (i.e. the batch is not finished)"""
+        batch_filter, batch_args = ("AND batch_id = ?", (batch_id,)) if batch_id else ("", ())
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT 1 FROM tasks WHERE status IN (?, ?, ?) {batch_filter} LIMIT 1",
+                (PENDING, LEASED, WAITING, *batch_args)
+            ).fetchone()
+        return row is not None
+    
+    def status(self, batch_id: str = None) -> List[Dict]:
+        """
+        Progress of each batch (or one batch)
+        
+        Returns:
+            List of dictionaries with task counts per status ('waiting' tasks are
+            near-duplicates waiting for their first copy, 'duplicates' counts all
+            linked tasks), the number of tasks completed per second overall and
+            over the last minute, and an ETA in seconds for the remaining tasks
+        """
+        batch_filter, batch_args = ("WHERE b.id = ?", (batch_id,)) if batch_id else ("", ())
+        now = time.time()
+        with self._lock:
+            batches = self._conn.execute(
+                f"SELECT b.id, b.created_at, "
+                f"SUM(t.status = ?), SUM(t.status = ?), SUM(t.status = ?), SUM(t.status = ?), COUNT(t.id), "
+                f"MIN(t.claimed_at), MAX(t.completed_at), SUM(t.status = ? AND t.completed_at >= ?), "
+                f"SUM(t.status = ?), COUNT(t.duplicate_of) "
+                f"FROM batches b LEFT JOIN tasks t ON t.batch_id = b.id {batch_filter} "
+                f"GROUP BY b.id ORDER BY b.created_at",
+                (PENDING, LEASED, DONE, FAILED, DONE, now - THROUGHPUT_WINDOW_SECONDS, WAITING, *batch_args)
+            ).fetchall()
+        
+        report = []
+        for (bid, created_at, pending, leased, done, failed, total,
+             first_claimed, last_completed, recent, waiting, duplicates) in batches:
+            pending, leased, done, failed = pending or 0, leased or 0, done or 0, failed or 0
+            waiting = waiting or 0
+            elapsed = (last_completed - first_claimed) if first_claimed and last_completed else 0.0
+            rate = done / elapsed if elapsed > 0 else 0.0
+            window = min(THROUGHPUT_WINDOW_SECONDS, now - first_claimed) if first_claimed else 0.0
+            recent_rate = (recent or 0) / window if window > 0 else 0.0
+            remaining = pending + leased + waiting
+            eta_rate = recent_rate or rate
+            report.append({
+                'batch_id': bid,
+                'created_at': created_at,
+                'total': total,
+                'pending': pending,
+                'leased': leased,
+                'done': done,
+                'failed': failed,
+                'waiting': waiting,
+                'duplicates': duplicates,
+                'progress': (done + failed) / total if total else 1.0,
+                'tasks_per_second': round(rate, 2),
+                'recent_tasks_per_second': round(recent_rate, 2),
+                'eta_seconds': round(remaining / eta_rate) if remaining and eta_rate else None
+            })
+        return report
+    
+    def results(self, batch_id: str) -> List[Dict]:
+        """
+        Finished results of a batch, ranked like batch_screen_resumes
+        
+        Failed tasks are included at the end with 'error' set.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT resume_id, status, result, error FROM tasks WHERE batch_id = ? AND status IN (?, ?)",
+                (batch_id, DONE, FAILED)
+            ).fetchall()
+        results, failed = [], []
+        for resume_id, status, result, error in rows:
+            if status == DONE:
+                results.append(json.loads(result))
+            else:
+                failed.append({'resume_id': resume_id, 'error': error})
+        results.sort(key=lambda x: (not x.get('skills_filtered'), x['final_score']), reverse=True)
+        return results + failed
+
+
+def _load_resume_text(task: Dict) -> str:
+    if task['text'] is not None:
+        return task['text']
+    from ingest import extract_resume_file
+    _, extraction = extract_resume_file(task['path'])
+    if not extraction['ok']:
+        raise ValueError(extraction['error'])
+    return extraction['text']
+
+
+def _heartbeat(work_queue: WorkQueue, worker_id: str, task_ids: List[int], stop: threading.Event):
+    # Renew at a third of the lease so a slow group (e.g. LLM retries) keeps its tasks
+    interval = config.WORK_QUEUE_LEASE_SECONDS / 3
+    while not stop.wait(interval):
+        work_queue.renew(worker_id, task_ids)
+
+
+def run_worker(worker_id: str = None, queue_path: str = None, batch_id: str = None,
+               screener_factory: Callable = None, exit_when_empty: bool = True) -> Dict:
+    """
+    Claim and screen tasks until the queue is drained
+    
+    Args:
+        worker_id: Lease owner name (defaults to host:pid)
+        queue_path: Queue database (defaults to config.WORK_QUEUE_PATH)
+        batch_id: Only work on this batch
+        screener_factory: Zero-argument function returning the screener to use
+            (defaults to RAGResumeScreener)
+        exit_when_empty: Return once no task is pending or leased; otherwise keep
+            polling for new batches
+    
+    Returns:
+        Counts of tasks done, retried and failed by this worker, and of tasks
+        it linked to an earlier near-duplicate
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    work_queue = WorkQueue(queue_path)
+    if screener_factory is None:
+        from rag_pipeline import RAGResumeScreener
+        screener_factory = RAGResumeScreener
+    screener = screener_factory()
+    counts = {'done': 0, 'retried': 0, 'failed': 0, 'duplicates': 0}
+    
+    while True:
+        claim = work_queue.claim(worker_id, batch_id=batch_id)
+        if claim is None:
+            if exit_when_empty and not work_queue.has_work(batch_id):
+                break
+            time.sleep(config.WORK_QUEUE_POLL_SECONDS)
+            continue
+        
+        tasks = claim['tasks']
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=_heartbeat, args=(work_queue, worker_id, [task['id'] for task in tasks], stop), daemon=True
+        )
+        heartbeat.start()
+        try:
+            resumes, errors = [], {}
+            dedup = claim['options'].get('dedup', config.DEDUP_ENABLED)
+            for task in tasks:
+                try:
+                    text = _load_resume_text(task)
+                except Exception as e:
+                    errors[task['id']] = str(e)
+                    continue
+                if dedup and not task['fingerprinted'] and work_queue.fingerprint(worker_id, task['id'], text):
+                    counts['duplicates'] += 1
+                    continue
+                resumes.append({'id': task['resume_id'], 'text': text, 'task': task})
+            
+            if resumes:
+                try:
+                    results = screener.batch_screen_resumes(
+                        [{'id': r['id'], 'text': r['text']} for r in resumes],
+                        claim['job_description'], **claim['options']
+                    )
+                except Exception as e:
+                    errors.update((r['task']['id'], f"Screening failed: {str(e)}") for r in resumes)
+                    results = []
+                by_id = {result['resume_id']: result for result in results}
+                for resume in resumes:
+                    task = resume['task']
+                    result = by_id.get(resume['id'])
+                    if result is None:
+                        continue
+                    # A degraded (semantic-only) result is retried while attempts remain
+                    if result.get('llm_degraded') and task['attempts'] < config.WORK_QUEUE_MAX_ATTEMPTS:
+                        errors[task['id']] = result['llm_details'].get('error', 'LLM evaluation failed')
+                        continue
+                    if work_queue.complete(worker_id, task['id'], result):
+                        counts['done'] += 1
+            
+            for task in tasks:
+                if task['id'] in errors:
+                    status = work_queue.fail(worker_id, task['id'], errors[task['id']], task['attempts'])
+                    counts['failed' if status == FAILED else 'retried'] += 1
+        finally:
+            stop.set()
+    
+    work_queue.close()
+    return counts
+
+
+def _worker_process(index: int, queue_path: str, batch_id: str, screener_factory: Callable,
+                    exit_when_empty: bool, threads: Optional[int]):
+    if threads:
+        # Share the cores between workers instead of every process using all of them
+        config.EMBEDDING_THREADS = threads
+    counts = run_worker(f"{socket.gethostname()}:{os.getpid()}", queue_path, batch_id,
+                        screener_factory, exit_when_empty)
+    print(f"  worker {index}: {counts['done']} done, {counts['duplicates']} near-duplicates, "
+          f"{counts['retried']} retried, {counts['failed']} failed")
+
+
+def run_workers(n: int = None, queue_path: str = None, batch_id: str = None,
+                screener_factory: Callable = None, exit_when_empty: bool = True):
+    """
+    Run n worker processes (defaults to one per CPU) until the queue is drained
+    
+    Each process loads its own models; embedding threads are split between
+    the workers unless config.EMBEDDING_THREADS is set.
+    """
+    n = n or os.cpu_count()
+    threads = config.EMBEDDING_THREADS or max(1, (os.cpu_count() or 1) // n)
+    if n == 1:
+        _worker_process(0, queue_path, batch_id, screener_factory, exit_when_empty, threads)
+        return
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_worker_process,
+                        args=(i, queue_path, batch_id, screener_factory, exit_when_empty, threads))
+        for i in range(n)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Leases of interrupted tasks expire and the tasks are picked up by the next run
+        for process in processes:
+            process.terminate()
+        raise